@@ -0,0 +1,48 @@
+"""
+Apply bulk stock adjustments (e.g. a full-store cycle count) from a CSV file
+
+Usage:
+    python adjust_stock.py counts.csv [--chunk-size 5000] [--dry-run]
+
+Columns: product_id or name; quantity (counted stock) or quantity_change
+(added to the current stock); optional reason.
+
+Counted quantities are turned into changes inside sp_batch_update_stock, from
+the stock under the row lock, so sales made while the count runs are respected.
+"""
+import argparse
+import json
+from utils.db_helper import get_db_connection
+from services.stock_adjustment_service import StockAdjustmentService
+
+
+def main():
+    """Read the adjustments, apply them in set-based chunks and print timings"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('csv_file')
+    parser.add_argument('--chunk-size', type=int, help='Products per sp_batch_update_stock call')
+    parser.add_argument('--dry-run', action='store_true', help='Validate and report without writing')
+    args = parser.parse_args()
+
+    mode, adjustments = StockAdjustmentService.read_file(args.csv_file)
+    conn = get_db_connection()
+    try:
+        report = StockAdjustmentService.apply(
+            conn, adjustments, mode=mode, chunk_size=args.chunk_size, dry_run=args.dry_run
+        )
+    finally:
+        conn.close()
+
+    print(f"{'Validated' if args.dry_run else 'Applied'} {report['applied']} product changes "
+          f"from {report['total']} lines ({mode} mode): {report['unchanged']} unchanged, {report['failed']} failed")
+    print(f"  load {report['load_ms']:.0f} ms, write {report['write_ms']:.0f} ms in {report['calls']} calls, "
+          f"total {report['elapsed_ms']:.0f} ms")
+    if report.get('moved_since_load'):
+        print(f"  {report['moved_since_load']} counted products had stock movements since loading; "
+              f"their changes were recomputed at write time")
+    if report['errors']:
+        print(json.dumps(report['errors'], indent=2))
+
+
+if __name__ == '__main__':
+    main()
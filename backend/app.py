@@ -4,24 +4,51 @@ import pyodbc
 import os
 import config
 from utils.db_helper import setup_database_connection, test_database_connection
+from utils.replica import setup_replica_routing
+from utils.profiler import setup_request_profiling
+from utils.json_provider import FastJSONProvider
+from utils.compression import setup_response_compression
+from utils.deadline import setup_request_deadlines
+from utils.admission import setup_admission_control
 from controllers.product_controller import product_bp
 from controllers.category_controller import category_bp
 from controllers.purchase_controller import purchase_bp
 from controllers.sale_controller import sale_bp
 from controllers.dashboard_controller import dashboard_bp
+from controllers.admin_controller import admin_bp
+from controllers.change_controller import change_bp
+from services.low_stock_alert_service import LowStockAlertService
+from services.job_scheduler_service import JobSchedulerService
 
 # Initialize Flask app
 app = Flask(__name__)
 
+# Serialize responses with the fast JSON provider (Decimal/datetime aware)
+app.json = FastJSONProvider(app)
+
 # Enable CORS for all routes with appropriate configuration
 CORS(app, 
      origins=["http://localhost:5173", "http://localhost:5174"],
      methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"], 
-     allow_headers=["Content-Type", "Authorization", "X-Requested-With"],
+     allow_headers=["Content-Type", "Authorization", "X-Requested-With", config.PROFILE_HEADER],
+     expose_headers=["X-Profile-Id", "ETag", "Last-Modified", "Retry-After"],
      supports_credentials=True)
 
+# Set up request profiling before the database handlers so connection time is included
+setup_request_profiling(app)
+
+# Admit or shed requests per route class before they take a database connection
+setup_admission_control(app)
+
+# Start each request's deadline before any query runs
+setup_request_deadlines(app)
+
 # Set up database connection handlers
 setup_database_connection(app)
+setup_replica_routing(app)
+
+# Compress large responses
+setup_response_compression(app)
 
 # Register blueprints
 app.register_blueprint(product_bp, url_prefix=f'{config.API_PREFIX}/products')
@@ -29,6 +56,16 @@ app.register_blueprint(category_bp, url_prefix=f'{config.API_PREFIX}/categories'
 app.register_blueprint(purchase_bp, url_prefix=f'{config.API_PREFIX}/purchases')
 app.register_blueprint(sale_bp, url_prefix=f'{config.API_PREFIX}/sales')
 app.register_blueprint(dashboard_bp, url_prefix=f'{config.API_PREFIX}/dashboard')
+app.register_blueprint(admin_bp, url_prefix=f'{config.API_PREFIX}/admin')
+app.register_blueprint(change_bp, url_prefix=f'{config.API_PREFIX}/changes')
+
+# Deliver low-stock alerts queued by the database outside of sale transactions
+if config.LOW_STOCK_ALERTS_ENABLED:
+    LowStockAlertService.start()
+
+# Precompute reports and run maintenance jobs on their cron schedules
+if config.JOB_SCHEDULER_ENABLED:
+    JobSchedulerService.start(app)
 
 # Test database connection route
 @app.route('/test-connection')
@@ -53,7 +90,9 @@ def home():
             "categories": f"{config.API_PREFIX}/categories",
             "purchases": f"{config.API_PREFIX}/purchases",
             "sales": f"{config.API_PREFIX}/sales",
-            "dashboard": f"{config.API_PREFIX}/dashboard"
+            "dashboard": f"{config.API_PREFIX}/dashboard",
+            "admin": f"{config.API_PREFIX}/admin",
+            "changes": f"{config.API_PREFIX}/changes"
         }
     })
 
@@ -64,7 +103,7 @@ def after_request(response):
     # This prevents duplication with Flask-CORS
     if 'Access-Control-Allow-Origin' not in response.headers:
         response.headers.add('Access-Control-Allow-Origin', '*')
-        response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,X-Requested-With')
+        response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,X-Requested-With,' + config.PROFILE_HEADER)
         response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
         response.headers.add('Access-Control-Allow-Credentials', 'true')
     return response
@@ -75,7 +114,7 @@ def after_request(response):
 def handle_options(path=''):
     response = app.make_response('')
     response.headers.add('Access-Control-Allow-Origin', '*')
-    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,X-Requested-With')
+    response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization,X-Requested-With,' + config.PROFILE_HEADER)
     response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
     response.headers.add('Access-Control-Allow-Credentials', 'true')
     return response
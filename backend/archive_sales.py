@@ -0,0 +1,43 @@
+"""
+Move sales older than the archive horizon from sale into sale_archive
+
+Usage:
+    python archive_sales.py [--days 365] [--batch-size 5000]
+
+Archived sales are added to the sale_rollup_daily totals, so all-time reports
+stay complete. Listing or exporting sales with a date range that reaches back
+past the horizon reads the archive as well. Run it daily or weekly, off-peak.
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+import config
+from utils.db_helper import get_db_connection
+
+
+def main():
+    """Archive old sales in batches and print how many were moved"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--days', type=int, default=config.SALE_ARCHIVE_AFTER_DAYS,
+                        help='Archive sales older than this many days')
+    parser.add_argument('--batch-size', type=int, default=config.SALE_ARCHIVE_BATCH_SIZE,
+                        help='Sales moved per transaction')
+    args = parser.parse_args()
+
+    # Cut at midnight so a day is never split between the archive and the hot table
+    before = datetime.combine(datetime.now().date() - timedelta(days=args.days), datetime.min.time())
+    started = time.perf_counter()
+    conn = get_db_connection()
+    try:
+        cursor = conn.cursor()
+        result = cursor.execute("EXEC sp_archive_sales ?, ?", [before, args.batch_size]).fetchone()
+        cursor.close()
+    finally:
+        conn.close()
+
+    print(f"Archived {result.archived_count} sales before {before:%Y-%m-%d} "
+          f"in {time.perf_counter() - started:.1f} s (archive boundary {result.archived_before:%Y-%m-%d})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,10 @@
+"""
+ASGI entry point for the Inventory Management System
+
+Run with:
+    uvicorn asgi:application --host 0.0.0.0 --port 5001
+"""
+from app import app
+from utils.asgi_bridge import ExecutorASGIBridge
+
+application = ExecutorASGIBridge(app.wsgi_app)
@@ -0,0 +1,117 @@
+"""
+Benchmark the WSGI and ASGI serving modes side by side
+
+Opens many concurrent keep-alive connections against each URL, sends GET
+requests for a fixed time, and reports throughput, latency and failures.
+The load generator is plain asyncio, so thousands of connections need no
+extra threads or packages.
+
+Start both servers first with the same number of request threads, so the
+comparison is like for like. The Flask development server starts a thread
+per request and is not a fair baseline. For example, with the shipped
+defaults (ASGI_READ_WORKERS=32):
+    gunicorn -k gthread -w 1 --threads 32 -b :5001 app:app   # WSGI on 5001
+    uvicorn asgi:application --port 5002                      # ASGI on 5002
+
+Both serve at most 32 requests at once, so expect the same throughput
+(about threads / view time). The bridge does not raise that ceiling; it
+only keeps waiting requests off threads.
+
+Usage:
+    python benchmarks/bench_asgi_vs_wsgi.py
+        http://localhost:5001/api/dashboard/overview
+        http://localhost:5002/api/dashboard/overview
+        [--concurrency 1000] [--duration 20]
+
+Raise the open-file limit (ulimit -n) for high concurrency.
+"""
+import argparse
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+
+async def fetch_loop(url, stop_at, latencies, failures):
+    """Send GET requests over one keep-alive connection until stop_at"""
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    if parts.query:
+        path += '?' + parts.query
+    request = (
+        f"GET {path} HTTP/1.1\r\nHost: {parts.netloc}\r\n"
+        f"Accept-Encoding: identity\r\nConnection: keep-alive\r\n\r\n"
+    ).encode()
+
+    reader = writer = None
+    while time.perf_counter() < stop_at:
+        started = time.perf_counter()
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+            writer.write(request)
+            status_line = await reader.readline()
+            status = int(status_line.split()[1])
+            # HTTP/1.0 servers (the Flask development server) close after each response
+            length, close = 0, status_line.startswith(b'HTTP/1.0')
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                if name.lower() == 'content-length':
+                    length = int(value)
+                elif name.lower() == 'connection' and value.strip().lower() == 'close':
+                    close = True
+            await reader.readexactly(length)
+            if close:
+                writer.close()
+                writer = None
+            if status >= 400:
+                failures.append(status)
+            else:
+                latencies.append(time.perf_counter() - started)
+        except Exception:
+            failures.append('error')
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.05)
+    if writer is not None:
+        writer.close()
+
+
+async def run(url, concurrency, duration):
+    """Run one load test and return (latencies, failures, elapsed seconds)"""
+    latencies, failures = [], []
+    started = time.perf_counter()
+    stop_at = started + duration
+    await asyncio.gather(*(fetch_loop(url, stop_at, latencies, failures) for _ in range(concurrency)))
+    return latencies, failures, time.perf_counter() - started
+
+
+def report(label, url, latencies, failures, elapsed):
+    """Print throughput and latency for one run"""
+    latencies.sort()
+    print(f"{label}: {url}")
+    print(f"  completed      : {len(latencies)} ({len(failures)} failed)")
+    print(f"  throughput     : {len(latencies) / elapsed:,.0f} req/s over {elapsed:.1f} s")
+    if latencies:
+        print(f"  latency p50/p99: {latencies[len(latencies) // 2] * 1000:.1f} / "
+              f"{latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('wsgi_url')
+    parser.add_argument('asgi_url')
+    parser.add_argument('--concurrency', type=int, default=1000)
+    parser.add_argument('--duration', type=float, default=20, help='Seconds per server')
+    args = parser.parse_args()
+
+    print(f"concurrency={args.concurrency} duration={args.duration}s")
+    for label, url in (('wsgi', args.wsgi_url), ('asgi', args.asgi_url)):
+        report(label, url, *asyncio.run(run(url, args.concurrency, args.duration)))
+
+
+if __name__ == '__main__':
+    main()
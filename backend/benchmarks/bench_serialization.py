@@ -0,0 +1,102 @@
+"""
+Benchmark row building and JSON serialization for the product and sale list endpoints
+
+Rows are synthesized with the same column types the SQL Server driver returns
+for GET /api/products/ and GET /api/sales/, so no database is needed.
+
+Usage:
+    python benchmarks/bench_serialization.py [row_count]
+"""
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.json_provider import FastJSONProvider
+
+PRODUCT_COLUMNS = ['product_id', 'name', 'price', 'base_price', 'quantity', 'reorder_level',
+                   'profit_percentage', 'category_name', 'category_id', 'stock_status']
+SALE_COLUMNS = ['sale_id', 'product_id', 'product_name', 'quantity', 'sale_price',
+                'total_amount', 'sale_date']
+
+
+def product_rows(count):
+    """Build rows shaped like Product.get_all results"""
+    return [
+        (i, f"Product {i}", Decimal('129.99'), Decimal('99.99'), i % 200, 10,
+         Decimal('30.00'), f"Category {i % 8}", i % 8 + 1, 'In Stock')
+        for i in range(count)
+    ]
+
+
+def sale_rows(count):
+    """Build rows shaped like Sale.get_all results"""
+    start = datetime(2025, 1, 1)
+    return [
+        (i, i % 500, f"Product {i % 500}", 2, Decimal('129.99'), Decimal('259.98'),
+         start + timedelta(minutes=i))
+        for i in range(count)
+    ]
+
+
+class FakeDescription:
+    """Stands in for cursor.description, which query_db reads per call"""
+
+    def __init__(self, columns):
+        self.description = [(name,) for name in columns]
+
+
+def build_dicts_legacy(cursor, rows):
+    """Row building as query_db did it before: column names rebuilt for every row"""
+    return [dict(zip([column[0] for column in cursor.description], row)) for row in rows]
+
+
+def build_dicts(cursor, rows):
+    """Row building with one shared column list"""
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in rows]
+
+
+def build_columnar(cursor, rows):
+    """Columnar payload with a single header"""
+    return {"columns": [column[0] for column in cursor.description], "rows": [tuple(row) for row in rows]}
+
+
+def timed(fn, repeat):
+    """Return the best wall time in milliseconds over several runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def run(name, columns, rows, repeat):
+    """Benchmark one endpoint shape"""
+    app = Flask(__name__)
+    default_provider = DefaultJSONProvider(app)
+    fast_provider = FastJSONProvider(app)
+    cursor = FakeDescription(columns)
+
+    cases = [
+        ("dict rows (legacy) + Flask json", build_dicts_legacy, default_provider),
+        ("dict rows + fast json", build_dicts, fast_provider),
+        ("columnar rows + fast json", build_columnar, fast_provider),
+    ]
+    print(f"\n{name} ({len(rows)} rows)")
+    with app.app_context():
+        for label, builder, provider in cases:
+            size = len(provider.response({"success": True, "data": builder(cursor, rows)}).get_data())
+            elapsed = timed(lambda: provider.response({"success": True, "data": builder(cursor, rows)}), repeat)
+            print(f"  {label:<34} {elapsed:9.1f} ms  {size / 1024:9.1f} KiB")
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    run("GET /api/products/", PRODUCT_COLUMNS, product_rows(count), repeat=5)
+    run("GET /api/sales/", SALE_COLUMNS, sale_rows(count), repeat=5)
@@ -0,0 +1,110 @@
+"""
+Benchmark concurrent sales against one hot product
+
+Runs many threads, each with its own connection, selling one unit at a time of
+the same product, and reports throughput, latency and whether stock was
+oversold. Needs the database configured in .env.
+
+Modes:
+    atomic  - EXEC sp_make_sale (conditional UPDATE ... WHERE quantity >= @qty)
+    legacy  - the previous check-then-act path: read stock, then INSERT into
+              sale and let trg_update_stock_on_sale decrement it
+
+Usage:
+    python benchmarks/bench_stock_contention.py PRODUCT_ID [--mode atomic|legacy]
+        [--threads 32] [--sales 50] [--stock N]
+
+The product's quantity is overwritten before the run.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.db_helper import get_db_connection
+
+
+def sell_atomic(cursor, product_id):
+    """Sell one unit through sp_make_sale"""
+    cursor.execute("EXEC sp_make_sale ?, ?, ?", [product_id, 1, 1.00])
+    cursor.fetchall()
+
+
+def sell_legacy(cursor, product_id):
+    """Sell one unit the way sp_make_sale used to: read, check, then insert"""
+    stock = cursor.execute("SELECT quantity FROM product WHERE product_id = ?", [product_id]).fetchval()
+    if stock < 1:
+        raise ValueError("Not enough stock available")
+    cursor.execute("""
+        INSERT INTO sale (product_id, quantity, sale_price, sale_date)
+        VALUES (?, 1, 1.00, GETDATE())
+    """, [product_id])
+
+
+def worker(product_id, sales, sell, latencies, errors):
+    """Run one thread's share of the sales on its own connection"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    try:
+        for _ in range(sales):
+            started = time.perf_counter()
+            try:
+                sell(cursor, product_id)
+                latencies.append(time.perf_counter() - started)
+            except Exception:
+                errors.append(1)
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('product_id', type=int)
+    parser.add_argument('--mode', choices=['atomic', 'legacy'], default='atomic')
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--sales', type=int, default=50, help='Sales per thread')
+    parser.add_argument('--stock', type=int, help='Starting stock (default: exactly enough for every sale)')
+    args = parser.parse_args()
+
+    total = args.threads * args.sales
+    stock = args.stock if args.stock is not None else total
+
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute("UPDATE product SET quantity = ? WHERE product_id = ?", [stock, args.product_id])
+    sales_before = cursor.execute("SELECT COUNT(*) FROM sale WHERE product_id = ?", [args.product_id]).fetchval()
+
+    sell = sell_atomic if args.mode == 'atomic' else sell_legacy
+    latencies, errors = [], []
+    threads = [
+        threading.Thread(target=worker, args=(args.product_id, args.sales, sell, latencies, errors))
+        for _ in range(args.threads)
+    ]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    final_stock = cursor.execute("SELECT quantity FROM product WHERE product_id = ?", [args.product_id]).fetchval()
+    sales_after = cursor.execute("SELECT COUNT(*) FROM sale WHERE product_id = ?", [args.product_id]).fetchval()
+    cursor.close()
+    conn.close()
+
+    latencies.sort()
+    recorded = sales_after - sales_before
+    print(f"mode={args.mode} threads={args.threads} attempts={total} starting_stock={stock}")
+    print(f"  committed sales : {recorded} ({len(errors)} rejected)")
+    print(f"  throughput      : {recorded / elapsed:,.0f} sales/s over {elapsed:.2f} s")
+    if latencies:
+        print(f"  latency p50/p99 : {latencies[len(latencies) // 2] * 1000:.1f} / "
+              f"{latencies[int(len(latencies) * 0.99)] * 1000:.1f} ms")
+    print(f"  final stock     : {final_stock} ({'OVERSOLD' if final_stock < 0 else 'ok'})")
+
+
+if __name__ == '__main__':
+    main()
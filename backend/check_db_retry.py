@@ -0,0 +1,86 @@
+"""
+Script to check that a deadlock raised inside sp_make_sale is retried
+
+sp_make_sale is run against a stand-in connection whose first EXEC fails the
+way pyodbc reports a deadlock victim that sp_make_sale's CATCH block rethrew
+with THROW: SQLSTATE 40001 and error 1205. Sale.create must retry it and
+return the sale_id from the second attempt. The error that RAISERROR used to
+produce instead (50000, SQLSTATE 42000) must not be retried. No database is
+needed.
+"""
+import pyodbc
+from flask import Flask, g
+import config
+from models.sale import Sale
+from utils.db_retry import get_retry_reason
+
+# How pyodbc reports a deadlock victim rethrown with THROW
+DEADLOCK_ERROR = pyodbc.Error(
+    '40001',
+    '[40001] [Microsoft][ODBC Driver 17 for SQL Server][SQL Server]Transaction (Process ID 57) '
+    'was deadlocked on lock resources with another process and has been chosen as the deadlock '
+    'victim. Rerun the transaction. (1205) (SQLExecDirectW)'
+)
+
+# How pyodbc reported the same deadlock after RAISERROR(@ErrorMessage, ...)
+REWRAPPED_ERROR = pyodbc.Error(
+    '42000',
+    '[42000] [Microsoft][ODBC Driver 17 for SQL Server][SQL Server]Transaction (Process ID 57) '
+    'was deadlocked on lock resources with another process and has been chosen as the deadlock '
+    'victim. Rerun the transaction. (50000) (SQLExecDirectW)'
+)
+
+class DeadlockOnceConnection:
+    """Stands in for a pyodbc connection: the first sp_make_sale call is a deadlock victim"""
+
+    def __init__(self):
+        self.timeout = 0
+        self.calls = 0
+
+    def cursor(self):
+        return DeadlockOnceCursor(self)
+
+    def execute(self, query, *args):
+        pass
+
+class DeadlockOnceCursor:
+    """Cursor for DeadlockOnceConnection"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.description = None
+        self.rows = []
+
+    def execute(self, query, args=()):
+        if 'sp_make_sale' in query:
+            self.conn.calls += 1
+            if self.conn.calls == 1:
+                raise DEADLOCK_ERROR
+            self.description = [('sale_id',)]
+            self.rows = [(4242,)]
+        return self
+
+    def fetchall(self):
+        return self.rows
+
+    def close(self):
+        pass
+
+def main():
+    """Main check function"""
+    assert get_retry_reason(DEADLOCK_ERROR) == 'deadlock', "THROW-shaped deadlock is not classified as retryable"
+    assert get_retry_reason(REWRAPPED_ERROR) is None, "RAISERROR-wrapped error 50000 should not be retried"
+
+    config.DB_RETRY_BASE_DELAY_MS = 0
+    app = Flask(__name__)
+    with app.app_context():
+        conn = DeadlockOnceConnection()
+        g.db = conn
+        sale_id = Sale.create(1, 1, 9.99)
+
+    assert sale_id == 4242, f"Expected the retried sale_id 4242, got {sale_id}"
+    assert conn.calls == 2, f"Expected sp_make_sale to run twice, ran {conn.calls} times"
+    print("Deadlock from sp_make_sale was retried: OK")
+
+if __name__ == "__main__":
+    main()
@@ -18,4 +18,120 @@ PORT = int(os.getenv('PORT', '5001'))
 DEBUG = os.getenv('DEBUG', 'True') == 'True'
 
 # Business logic configuration
-DEFAULT_PRICE_MARKUP = float(os.getenv('DEFAULT_PRICE_MARKUP', '1.3')) # 30% markup by default
\ No newline at end of file
+DEFAULT_PRICE_MARKUP = float(os.getenv('DEFAULT_PRICE_MARKUP', '1.3')) # 30% markup by default
+
+# Request profiling configuration
+PROFILING_ENABLED = os.getenv('PROFILING_ENABLED', 'False') == 'True' # Opt-in: profiles are served by /api/admin/profiles
+PROFILE_HEADER = os.getenv('PROFILE_HEADER', 'X-Profile-Request')
+PROFILE_SAMPLE_RATE = float(os.getenv('PROFILE_SAMPLE_RATE', '0')) # Fraction of requests profiled without the header
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv('PROFILE_SAMPLE_INTERVAL_MS', '2'))
+PROFILE_HISTORY_SIZE = int(os.getenv('PROFILE_HISTORY_SIZE', '50'))
+
+# Response compression configuration
+COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'True') == 'True'
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024')) # Bytes; smaller bodies are sent as-is
+COMPRESSION_LEVEL = int(os.getenv('COMPRESSION_LEVEL', '6'))
+
+# Change feed configuration
+CHANGE_FEED_PAGE_SIZE = int(os.getenv('CHANGE_FEED_PAGE_SIZE', '1000'))
+
+# Live dashboard (Server-Sent Events) configuration
+LIVE_UPDATE_MIN_INTERVAL = float(os.getenv('LIVE_UPDATE_MIN_INTERVAL', '1.0')) # Seconds between dashboard recomputations
+LIVE_UPDATE_HEARTBEAT = float(os.getenv('LIVE_UPDATE_HEARTBEAT', '15')) # Seconds between keep-alive comments
+LIVE_UPDATE_QUEUE_SIZE = int(os.getenv('LIVE_UPDATE_QUEUE_SIZE', '20'))
+LIVE_UPDATE_MAX_SUBSCRIBERS = int(os.getenv('LIVE_UPDATE_MAX_SUBSCRIBERS', '64')) # Open dashboard streams per process
+LIVE_UPDATE_MAX_STREAM_SECONDS = int(os.getenv('LIVE_UPDATE_MAX_STREAM_SECONDS', '3600')) # Streams end after this; EventSource reconnects
+
+# Batched sale ingestion configuration
+SALE_BATCHING_ENABLED = os.getenv('SALE_BATCHING_ENABLED', 'False') == 'True'
+SALE_BATCH_MAX_SIZE = int(os.getenv('SALE_BATCH_MAX_SIZE', '100'))
+SALE_BATCH_MAX_WAIT_MS = float(os.getenv('SALE_BATCH_MAX_WAIT_MS', '10'))
+SALE_BATCH_RESULT_TIMEOUT = float(os.getenv('SALE_BATCH_RESULT_TIMEOUT', '30')) # Seconds a request waits for its batch
+SALE_BATCH_OUTCOME_HISTORY = int(os.getenv('SALE_BATCH_OUTCOME_HISTORY', '10000')) # Outcomes kept for sales answered with 202
+
+# Isolation and retry configuration
+SNAPSHOT_READS_ENABLED = os.getenv('SNAPSHOT_READS_ENABLED', 'True') == 'True' # Requires ALLOW_SNAPSHOT_ISOLATION ON
+DB_RETRY_ATTEMPTS = int(os.getenv('DB_RETRY_ATTEMPTS', '3'))
+DB_RETRY_BASE_DELAY_MS = float(os.getenv('DB_RETRY_BASE_DELAY_MS', '50'))
+DB_RETRY_MAX_DELAY_MS = float(os.getenv('DB_RETRY_MAX_DELAY_MS', '1000'))
+
+# Request deadline configuration
+REQUEST_DEADLINE_SECONDS = float(os.getenv('REQUEST_DEADLINE_SECONDS', '30')) # 0 disables the default deadline
+ANALYTICS_DEADLINE_SECONDS = float(os.getenv('ANALYTICS_DEADLINE_SECONDS', '10'))
+REQUEST_DEADLINE_OVERRIDES = os.getenv('REQUEST_DEADLINE_OVERRIDES', '') # e.g. "sale.get_all_sales=20,dashboard.get_dashboard_overview=5"
+DEADLINE_RETRY_AFTER = int(os.getenv('DEADLINE_RETRY_AFTER', '5')) # Seconds suggested to clients in Retry-After
+BULK_REPRICE_DEADLINE_SECONDS = float(os.getenv('BULK_REPRICE_DEADLINE_SECONDS', '300')) # Catalog-wide repricing fires every product trigger
+
+# Admission control configuration (per process)
+ADMISSION_CONTROL_ENABLED = os.getenv('ADMISSION_CONTROL_ENABLED', 'True') == 'True'
+ADMISSION_WRITE_LIMIT = int(os.getenv('ADMISSION_WRITE_LIMIT', '32')) # Concurrent POST/PUT/DELETE requests
+ADMISSION_WRITE_QUEUE = int(os.getenv('ADMISSION_WRITE_QUEUE', '64'))
+ADMISSION_READ_LIMIT = int(os.getenv('ADMISSION_READ_LIMIT', '16')) # Concurrent catalog and list reads
+ADMISSION_READ_QUEUE = int(os.getenv('ADMISSION_READ_QUEUE', '32'))
+ADMISSION_ANALYTICS_LIMIT = int(os.getenv('ADMISSION_ANALYTICS_LIMIT', '4')) # Concurrent dashboard/report requests
+ADMISSION_ANALYTICS_QUEUE = int(os.getenv('ADMISSION_ANALYTICS_QUEUE', '8'))
+ADMISSION_EXPORT_LIMIT = int(os.getenv('ADMISSION_EXPORT_LIMIT', '2')) # Concurrent export downloads
+ADMISSION_EXPORT_QUEUE = int(os.getenv('ADMISSION_EXPORT_QUEUE', '4'))
+ADMISSION_BULK_LIMIT = int(os.getenv('ADMISSION_BULK_LIMIT', '2')) # Concurrent imports, snapshots and on-demand job runs
+ADMISSION_BULK_QUEUE = int(os.getenv('ADMISSION_BULK_QUEUE', '4'))
+ADMISSION_QUEUE_TIMEOUT_MS = float(os.getenv('ADMISSION_QUEUE_TIMEOUT_MS', '2000')) # Longest wait for a slot before shedding
+ADMISSION_RETRY_AFTER = int(os.getenv('ADMISSION_RETRY_AFTER', '2'))
+
+# Read replica configuration
+REPLICA_SERVERS = os.getenv('REPLICA_SERVERS', '') # Comma-separated readable secondaries; empty sends every read to DB_SERVER
+REPLICA_MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', '5')) # 0 trusts replicas without checking lag
+REPLICA_LAG_CHECK_INTERVAL = float(os.getenv('REPLICA_LAG_CHECK_INTERVAL', '10'))
+
+# ASGI serving configuration (uvicorn asgi:application)
+ASGI_READ_WORKERS = int(os.getenv('ASGI_READ_WORKERS', '32')) # Threads running GET views and their queries = GET requests served at once
+ASGI_WRITE_WORKERS = int(os.getenv('ASGI_WRITE_WORKERS', '16')) # Threads running POST/PUT/DELETE views = writes served at once
+ASGI_STREAM_WORKERS = int(os.getenv('ASGI_STREAM_WORKERS', '64')) # Threads pulling streamed response chunks (exports)
+ASGI_SSE_WORKERS = int(os.getenv('ASGI_SSE_WORKERS', '64')) # Threads serving dashboard SSE streams; keep >= LIVE_UPDATE_MAX_SUBSCRIBERS
+ASGI_MAX_PENDING = int(os.getenv('ASGI_MAX_PENDING', '10000')) # Open requests per process before shedding with 503
+ASGI_BODY_BUFFER_BYTES = int(os.getenv('ASGI_BODY_BUFFER_BYTES', '65536')) # Request body read before the view runs; larger uploads stream
+
+# Export configuration
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '1000')) # Rows fetched and written per chunk
+
+# Bulk import and stock adjustment configuration
+IMPORT_BATCH_SIZE = int(os.getenv('IMPORT_BATCH_SIZE', '5000')) # Rows per fast_executemany batch and transaction
+IMPORT_MAX_ERRORS = int(os.getenv('IMPORT_MAX_ERRORS', '1000')) # Row errors listed in the report (all are counted)
+STOCK_ADJUSTMENT_CHUNK_SIZE = int(os.getenv('STOCK_ADJUSTMENT_CHUNK_SIZE', '5000')) # Products per sp_batch_update_stock call
+
+# Sale archiving configuration (python archive_sales.py)
+SALE_ARCHIVE_AFTER_DAYS = int(os.getenv('SALE_ARCHIVE_AFTER_DAYS', '365')) # Sales older than this move to sale_archive
+SALE_ARCHIVE_BATCH_SIZE = int(os.getenv('SALE_ARCHIVE_BATCH_SIZE', '5000')) # Sales moved per transaction
+
+# Product search configuration
+SEARCH_INDEX_SYNC_INTERVAL = float(os.getenv('SEARCH_INDEX_SYNC_INTERVAL', '2')) # Seconds before other processes' writes show up
+SEARCH_SYNC_BATCH_SIZE = int(os.getenv('SEARCH_SYNC_BATCH_SIZE', '5000')) # Change-feed rows read per sync round trip
+SEARCH_FUZZY_THRESHOLD = float(os.getenv('SEARCH_FUZZY_THRESHOLD', '0.3')) # Trigram similarity for typo matches (0-1)
+SEARCH_MAX_LIMIT = int(os.getenv('SEARCH_MAX_LIMIT', '100'))
+
+# Catalog pagination configuration
+CATALOG_PAGE_SIZE = int(os.getenv('CATALOG_PAGE_SIZE', '50')) # Products per page when limit is not given
+CATALOG_MAX_PAGE_SIZE = int(os.getenv('CATALOG_MAX_PAGE_SIZE', '500')) # Upper bound on the limit argument
+CATALOG_COUNT_LIMIT = int(os.getenv('CATALOG_COUNT_LIMIT', '10000')) # Filtered counts stop here (total_is_exact is false beyond it)
+
+# Batch multi-get configuration (?ids=)
+BATCH_MAX_IDS = int(os.getenv('BATCH_MAX_IDS', '500')) # Ids per batch request (SQL Server allows 2100 parameters)
+
+# Low-stock alert configuration (outbox dispatcher)
+LOW_STOCK_ALERTS_ENABLED = os.getenv('LOW_STOCK_ALERTS_ENABLED', 'True') == 'True' # Run the dispatcher thread in each app process
+LOW_STOCK_ALERT_POLL_INTERVAL = float(os.getenv('LOW_STOCK_ALERT_POLL_INTERVAL', '5')) # Seconds between outbox polls
+LOW_STOCK_ALERT_BATCH_SIZE = int(os.getenv('LOW_STOCK_ALERT_BATCH_SIZE', '200')) # Alerts claimed and delivered together
+LOW_STOCK_ALERT_LEASE_SECONDS = int(os.getenv('LOW_STOCK_ALERT_LEASE_SECONDS', '60')) # Claimed alerts are retried after this if undelivered
+LOW_STOCK_ALERT_WEBHOOK_URL = os.getenv('LOW_STOCK_ALERT_WEBHOOK_URL', '') # POST target for alert batches; empty logs them instead
+LOW_STOCK_ALERT_WEBHOOK_TIMEOUT = float(os.getenv('LOW_STOCK_ALERT_WEBHOOK_TIMEOUT', '10')) # Seconds per webhook call
+
+# Job scheduler configuration (cron expressions: minute hour day month weekday)
+JOB_SCHEDULER_ENABLED = os.getenv('JOB_SCHEDULER_ENABLED', 'True') == 'True' # Run the scheduler thread in each app process
+JOB_SCHEDULER_TICK = float(os.getenv('JOB_SCHEDULER_TICK', '30')) # Seconds between checks for due jobs
+JOB_DASHBOARD_SCHEDULE = os.getenv('JOB_DASHBOARD_SCHEDULE', '*/5 * * * *') # Dashboard snapshot (low stock, top selling, sales by category)
+JOB_STOCK_LEVELS_SCHEDULE = os.getenv('JOB_STOCK_LEVELS_SCHEDULE', '*/15 * * * *') # sp_generate_stock_level_report
+JOB_PRODUCT_PERFORMANCE_SCHEDULE = os.getenv('JOB_PRODUCT_PERFORMANCE_SCHEDULE', '0 * * * *') # sp_analyze_product_performance
+JOB_STOCK_FORECAST_SCHEDULE = os.getenv('JOB_STOCK_FORECAST_SCHEDULE', '10 * * * *') # sp_forecast_stock_needs
+JOB_REORDER_SUGGESTIONS_SCHEDULE = os.getenv('JOB_REORDER_SUGGESTIONS_SCHEDULE', '20 * * * *') # sp_generate_reorder_suggestions
+JOB_STOCK_SNAPSHOT_SCHEDULE = os.getenv('JOB_STOCK_SNAPSHOT_SCHEDULE', '0 * * * *') # sp_take_stock_snapshot
+REPORT_LOOKBACK_DAYS = int(os.getenv('REPORT_LOOKBACK_DAYS', '90')) # Sales history used by the performance, forecast and reorder reports
+REPORT_FORECAST_DAYS = int(os.getenv('REPORT_FORECAST_DAYS', '30')) # Horizon of the forecast and reorder reports
@@ -0,0 +1,123 @@
+"""
+Admin controller for the Inventory Management System
+"""
+from flask import Blueprint, Response, jsonify, request
+from utils.profiler import get_profiles, get_profile, to_collapsed_stacks, clear_profiles
+from utils.metrics import get_metrics
+from utils.admission import admission_class, get_admission_stats
+from utils.replica import get_replica_status
+from models.stock_ledger import StockLedger
+from services.product_search_service import ProductSearchService
+from services.job_scheduler_service import JobSchedulerService, JOBS
+from models.job_run import JobRun
+from utils.deadline import deadline
+
+admin_bp = Blueprint('admin', __name__)
+
+
+@admin_bp.route('/profiles', methods=['GET'])
+def list_profiles():
+    """Get a summary of the stored request profiles"""
+    try:
+        return jsonify({"success": True, "data": get_profiles()}), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+
+@admin_bp.route('/profiles/<int:profile_id>', methods=['GET'])
+def get_request_profile(profile_id):
+    """Get a stored request profile, as JSON or as collapsed stacks for flamegraphs"""
+    try:
+        profile = get_profile(profile_id)
+        if not profile:
+            return jsonify({"success": False, "error": "Profile not found"}), 404
+
+        if request.args.get('format') == 'collapsed':
+            return Response(
+                to_collapsed_stacks(profile),
+                mimetype='text/plain',
+                headers={"Content-Disposition": f"attachment; filename=profile-{profile_id}.folded"}
+            )
+        return jsonify({"success": True, "data": profile}), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+
+@admin_bp.route('/profiles', methods=['DELETE'])
+def delete_profiles():
+    """Remove all stored request profiles"""
+    try:
+        clear_profiles()
+        return jsonify({"success": True, "message": "Profiles cleared"}), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+
+@admin_bp.route('/metrics', methods=['GET'])
+def get_app_metrics():
+    """Get in-process counters and timings (database retries, admission control, replicas, search, etc.)"""
+    try:
+        data = get_metrics()
+        data['admission'] = get_admission_stats()
+        data['replicas'] = get_replica_status()
+        data['search'] = ProductSearchService.get_stats()
+        return jsonify({"success": True, "data": data}), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+
+
+@admin_bp.route('/stock-snapshots', methods=['POST'])
+@admission_class('bulk')
+def take_stock_snapshot():
+    """Snapshot stock levels for products with movements since their last snapshot"""
+    try:
+        result = StockLedger.take_snapshot()
+        return jsonify({"success": True, "data": result}), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+
+@admin_bp.route('/jobs', methods=['GET'])
+def get_jobs():
+    """List scheduled jobs with their cron schedule, next slot and latest run"""
+    try:
+        return jsonify({"success": True, "data": JobSchedulerService.get_jobs()}), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+
+@admin_bp.route('/jobs/<job_name>/runs', methods=['GET'])
+def get_job_runs(job_name):
+    """Get a job's run history, newest first (?limit=, default 50)"""
+    try:
+        if job_name not in JOBS:
+            return jsonify({"success": False, "error": "Job not found"}), 404
+        limit = min(max(request.args.get('limit', 50, type=int), 1), 1000)
+        return jsonify({"success": True, "data": JobRun.get_recent(job_name, limit)}), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+
+@admin_bp.route('/jobs/<job_name>/run', methods=['POST'])
+@admission_class('bulk')
+@deadline(0)
+def run_job(job_name):
+    """Run a job now (409 if another worker is running it)"""
+    try:
+        if job_name not in JOBS:
+            return jsonify({"success": False, "error": "Job not found"}), 404
+        result = JobSchedulerService.run_job(job_name)
+        if result['status'] == 'locked':
+            return jsonify({"success": False, "error": "Job is already running", "data": result}), 409
+        status_code = 200 if result['status'] == 'succeeded' else 500
+        return jsonify({"success": status_code == 200, "data": result}), status_code
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
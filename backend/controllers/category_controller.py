@@ -2,16 +2,28 @@
 Category controller for the Inventory Management System
 """
 from flask import Blueprint, jsonify, request
-from models.category import Category
+from models.category import Category, CATEGORY_FIELDS, CATEGORY_DEFAULT_FIELDS
+from models.product import Product
 from models import query_db
+from utils.http_cache import conditional_get
+from utils.pagination import parse_catalog_query, parse_id_list, key_by_id, parse_fields
+from services.product_search_service import ProductSearchService
 
 category_bp = Blueprint('category', __name__)
 
 
 @category_bp.route('/', methods=['GET'])
+@conditional_get(Product.get_catalog_version)
 def get_all_categories():
-    """Get all categories"""
+    """Get all categories (?ids=1,4 for just those categories, keyed by category_id)"""
     try:
+        if 'ids' in request.args:
+            try:
+                ids = parse_id_list(request.args)
+            except ValueError as e:
+                return jsonify({"success": False, "error": str(e)}), 400
+            categories, missing = key_by_id(Category.get_by_ids(ids), 'category_id', ids)
+            return jsonify({"success": True, "data": categories, "missing": missing}), 200
         categories = Category.get_all()
         return jsonify({"success": True, "data": categories}), 200
     except Exception as e:
@@ -21,9 +33,13 @@ def get_all_categories():
 
 @category_bp.route('/<int:category_id>', methods=['GET'])
 def get_category(category_id):
-    """Get a category by ID"""
+    """Get a category by ID (?fields=name,description; product_count only when asked for, or ?fields=*)"""
     try:
-        category = Category.get_by_id(category_id)
+        try:
+            fields = parse_fields(request.args, CATEGORY_FIELDS, CATEGORY_DEFAULT_FIELDS)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        category = Category.get_by_id(category_id, fields)
         if not category:
             return jsonify({"success": False, "error": "Category not found"}), 404
         return jsonify({"success": True, "data": category}), 200
@@ -70,7 +86,7 @@ def update_category(category_id):
             return jsonify({"success": False, "error": "Missing required field: name"}), 400
         
         # Check if category exists
-        category = Category.get_by_id(category_id)
+        category = Category.get_by_id(category_id, ('description',))
         if not category:
             return jsonify({"success": False, "error": "Category not found"}), 404
         
@@ -80,6 +96,7 @@ def update_category(category_id):
         # Update category
         try:
             Category.update(category_id, name, description)
+            ProductSearchService.notify_changed()
             return jsonify({
                 "success": True, 
                 "message": "Category updated successfully"
@@ -97,7 +114,7 @@ def delete_category(category_id):
     """Delete a category"""
     try:
         # Check if category exists
-        category = Category.get_by_id(category_id)
+        category = Category.get_by_id(category_id, ('product_count',))
         if not category:
             return jsonify({"success": False, "error": "Category not found"}), 404
         
@@ -110,6 +127,7 @@ def delete_category(category_id):
         
         # Delete category
         Category.delete(category_id)
+        ProductSearchService.notify_changed()
         
         return jsonify({
             "success": True, 
@@ -121,11 +139,16 @@ def delete_category(category_id):
         
 
 @category_bp.route('/<int:category_id>/products', methods=['GET'])
+@conditional_get(Product.get_catalog_version)
 def get_category_products(category_id):
-    """Get products in a category"""
+    """Get products in a category (same filter, sort and paging arguments as GET /api/products/)"""
     try:
+        try:
+            query = parse_catalog_query(request.args)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
         print(f"Fetching products for category ID: {category_id}")
-        category = Category.get_with_products(category_id)
+        category = Category.get_with_products(category_id, query)
         if not category:
             print(f"Category not found: {category_id}")
             return jsonify({"success": False, "error": "Category not found"}), 404
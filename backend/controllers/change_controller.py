@@ -0,0 +1,27 @@
+"""
+Change feed controller for the Inventory Management System
+"""
+from flask import Blueprint, jsonify, request
+from models.change_feed import ChangeFeed
+import config
+
+change_bp = Blueprint('change', __name__)
+
+
+@change_bp.route('/', methods=['GET'])
+def get_changes():
+    """Get products, categories and deletions changed since a sync token"""
+    try:
+        since = request.args.get('since', '0')
+        if not since.isdigit():
+            return jsonify({"success": False, "error": "since must be a token returned by a previous call"}), 400
+
+        limit = request.args.get('limit', config.CHANGE_FEED_PAGE_SIZE, type=int)
+        if limit <= 0:
+            return jsonify({"success": False, "error": "limit must be a positive number"}), 400
+        limit = min(limit, config.CHANGE_FEED_PAGE_SIZE)
+
+        changes = ChangeFeed.get_changes(int(since), limit)
+        return jsonify({"success": True, "data": changes}), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
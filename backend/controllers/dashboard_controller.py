@@ -1,10 +1,21 @@
 ﻿'''
 Dashboard controller for the Inventory Management System
 '''
-from flask import Blueprint, jsonify
+import queue
+import time
+from flask import Blueprint, Response, jsonify, g, request, stream_with_context
 from models.product import Product
 from models.sale import Sale
+from models.valuation import Valuation, COGS_GROUPINGS
+from models.report_result import ReportResult
 from models import query_db
+from services.live_update_service import LiveUpdateService, SubscriberLimitReached
+from services.job_scheduler_service import REPORTS
+from utils.deadline import deadline
+from utils.admission import admission_class
+from utils.export import parse_date_range
+from utils.json_provider import dumps_bytes
+import config
 
 dashboard_bp = Blueprint('dashboard', __name__)
 
@@ -14,6 +25,7 @@ def test_route():
     return jsonify({'success': True, 'message': 'Dashboard controller is working'})
 
 @dashboard_bp.route('/top-selling', methods=['GET'])
+@deadline(config.ANALYTICS_DEADLINE_SECONDS)
 def get_top_selling():
     '''Get top selling products for dashboard'''
     try:
@@ -23,19 +35,17 @@ def get_top_selling():
                 p.product_id,
                 p.name AS product_name,
                 c.name AS category_name,
-                SUM(s.quantity) AS total_quantity_sold,
-                SUM(s.quantity * s.sale_price) AS total_sales_amount
+                t.total_quantity_sold,
+                t.total_sales_value AS total_sales_amount
             FROM 
-                sale s
+                view_product_sales_totals t
             JOIN 
-                product p ON s.product_id = p.product_id
+                product p ON t.product_id = p.product_id
             JOIN 
                 category c ON p.category_id = c.category_id
-            GROUP BY 
-                p.product_id, p.name, c.name
             ORDER BY 
-                SUM(s.quantity) DESC
-        """)
+                t.total_quantity_sold DESC
+        """, snapshot=True, replica=True)
         
         print(f'Top selling API returning {len(products) if products else 0} products')
         return jsonify({'success': True, 'data': products}), 200
@@ -46,6 +56,7 @@ def get_top_selling():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @dashboard_bp.route('/low-stock', methods=['GET'])
+@deadline(config.ANALYTICS_DEADLINE_SECONDS)
 def get_low_stock():
     '''Get low stock products for dashboard'''
     try:
@@ -66,6 +77,7 @@ def get_low_stock():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @dashboard_bp.route('/sales-by-category', methods=['GET'])
+@deadline(config.ANALYTICS_DEADLINE_SECONDS)
 def get_sales_by_category():
     '''Get sales by category for dashboard'''
     try:
@@ -73,19 +85,19 @@ def get_sales_by_category():
         sales = query_db("""
             SELECT TOP 10
                 c.name AS category_name,
-                SUM(s.quantity) AS total_quantity_sold,
-                SUM(s.quantity * s.sale_price) AS total_sales
+                SUM(t.total_quantity_sold) AS total_quantity_sold,
+                SUM(t.total_sales_value) AS total_sales
             FROM 
-                sale s
+                view_product_sales_totals t
             JOIN 
-                product p ON s.product_id = p.product_id
+                product p ON t.product_id = p.product_id
             JOIN 
                 category c ON p.category_id = c.category_id
             GROUP BY 
                 c.name
             ORDER BY 
-                SUM(s.quantity * s.sale_price) DESC
-        """)
+                SUM(t.total_sales_value) DESC
+        """, snapshot=True, replica=True)
         
         return jsonify({'success': True, 'data': sales}), 200
     except Exception as e:
@@ -95,6 +107,7 @@ def get_sales_by_category():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @dashboard_bp.route('/overview', methods=['GET'])
+@deadline(config.ANALYTICS_DEADLINE_SECONDS)
 def get_dashboard_overview():
     '''Get dashboard overview data'''
     try:
@@ -139,6 +152,7 @@ def get_dashboard_overview():
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @dashboard_bp.route('/inventory-summary', methods=['GET'])
+@deadline(config.ANALYTICS_DEADLINE_SECONDS)
 def get_inventory_summary():
     '''Get inventory summary for dashboard'''
     try:
@@ -146,3 +160,105 @@ def get_inventory_summary():
         return jsonify({'success': True, 'data': summary}), 200
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
+
+@dashboard_bp.route('/valuation', methods=['GET'])
+@deadline(config.ANALYTICS_DEADLINE_SECONDS)
+def get_inventory_valuation():
+    '''Get inventory value at moving average cost and FIFO cost'''
+    try:
+        valuation = Valuation.get_inventory_value()
+        return jsonify({'success': True, 'data': valuation}), 200
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@dashboard_bp.route('/cogs', methods=['GET'])
+@deadline(config.ANALYTICS_DEADLINE_SECONDS)
+def get_cogs():
+    '''Get revenue and cost of goods sold per day or month (?start_date=&end_date=&group_by=&product_id=)'''
+    try:
+        try:
+            start, end = parse_date_range(request.args)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        group_by = request.args.get('group_by', 'day')
+        if group_by not in COGS_GROUPINGS:
+            return jsonify({'success': False, 'error': "group_by must be 'day' or 'month'"}), 400
+        cogs = Valuation.get_cogs(start, end, group_by, request.args.get('product_id', type=int))
+        return jsonify({'success': True, 'data': cogs}), 200
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@dashboard_bp.route('/reports', methods=['GET'])
+def get_reports():
+    '''List the precomputed reports and when each was last computed'''
+    try:
+        computed = {row['report_name']: row for row in ReportResult.get_all()}
+        data = [dict(computed.get(name, {}), report_name=name) for name in REPORTS]
+        return jsonify({'success': True, 'data': data}), 200
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@dashboard_bp.route('/reports/<report_name>', methods=['GET'])
+def get_report(report_name):
+    '''Get a report precomputed by the job scheduler, with when it was computed'''
+    try:
+        if report_name not in REPORTS:
+            return jsonify({'success': False, 'error': f"Unknown report; available: {', '.join(REPORTS)}"}), 404
+        report = ReportResult.get(report_name)
+        if not report:
+            return jsonify({'success': False, 'error': 'Report has not been computed yet'}), 404
+        # The stored payload is already JSON, so it is spliced in rather than parsed and re-encoded
+        meta = dumps_bytes({
+            'success': True,
+            'computed_at': report['computed_at'],
+            'duration_ms': report['duration_ms'],
+            'row_count': report['row_count']
+        })
+        body = meta[:-1] + b',"data":' + report['payload'].encode('utf-8') + b'}'
+        return Response(body, mimetype='application/json')
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+@dashboard_bp.route('/stream', methods=['GET'])
+@deadline(0)
+@admission_class(None)
+def stream_dashboard():
+    '''Stream live dashboard updates as Server-Sent Events'''
+    try:
+        subscriber = LiveUpdateService.subscribe()
+    except SubscriberLimitReached as e:
+        response = jsonify({'success': False, 'error': str(e)})
+        response.status_code = 503
+        response.headers['Retry-After'] = str(config.ADMISSION_RETRY_AFTER)
+        return response
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+    # The stream can stay open for hours; release the request's connections now,
+    # including the replica one a cold first snapshot may have opened
+    g.db.close()
+    del g.db
+    replica_db = g.pop('replica_db', None)
+    g.pop('replica_server', None)
+    if replica_db is not None:
+        replica_db.close()
+
+    def generate():
+        # Bounded so a stream whose client vanished unnoticed cannot hold a
+        # subscriber forever; EventSource reconnects on its own
+        ends_at = time.monotonic() + config.LIVE_UPDATE_MAX_STREAM_SECONDS
+        try:
+            while time.monotonic() < ends_at:
+                try:
+                    yield subscriber.get(timeout=config.LIVE_UPDATE_HEARTBEAT)
+                except queue.Empty:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ': keep-alive\n\n'
+        finally:
+            LiveUpdateService.unsubscribe(subscriber)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
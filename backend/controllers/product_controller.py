@@ -1,19 +1,97 @@
 """
 Product controller for the Inventory Management System
 """
-from flask import Blueprint, jsonify, request
-from models.product import Product
+from datetime import datetime
+from flask import Blueprint, jsonify, request, g
+from models.product import Product, PRODUCT_FIELDS, PRODUCT_DEFAULT_FIELDS
+from models.stock_ledger import StockLedger
+from utils.http_cache import conditional_get
+from utils.deadline import deadline
+from utils.admission import admission_class
+from utils.pagination import parse_catalog_query, parse_id_list, key_by_id, parse_fields
+from services.live_update_service import LiveUpdateService
+from services.product_import_service import ProductImportService
+from services.product_search_service import ProductSearchService
+from services.pricing_service import PricingService
+import config
 
 product_bp = Blueprint('product', __name__)
 
 
 
 @product_bp.route('/', methods=['GET'])
+@conditional_get(Product.get_catalog_version)
 def get_all_products():
-    """Get all products"""
+    """
+    Get products, optionally filtered, sorted and paged
+    (?category_id, stock_status, min_price, max_price, sort, order, limit, cursor;
+    ?format=columnar for a compact columns/rows payload)
+
+    ?ids=3,7,12 returns just those products in one query, keyed by product_id.
+    """
     try:
-        products = Product.get_all()
-        return jsonify({"success": True, "data": products}), 200
+        if 'ids' in request.args:
+            try:
+                ids = parse_id_list(request.args)
+            except ValueError as e:
+                return jsonify({"success": False, "error": str(e)}), 400
+            products, missing = key_by_id(Product.get_by_ids(ids), 'product_id', ids)
+            return jsonify({"success": True, "data": products, "missing": missing}), 200
+        try:
+            query = parse_catalog_query(request.args)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        page = Product.get_catalog(query, columnar=request.args.get('format') == 'columnar')
+        response = {"success": True, "data": page.pop('products')}
+        if query['limit'] is not None:
+            response["pagination"] = dict(page, limit=query['limit'])
+        return jsonify(response), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+
+@product_bp.route('/search', methods=['GET'])
+def search_products():
+    """Search products by name or category (?q=, offset, limit), best matches first"""
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            return jsonify({"success": False, "error": "q is required"}), 400
+        offset = max(request.args.get('offset', 0, type=int), 0)
+        limit = min(max(request.args.get('limit', 20, type=int), 1), config.SEARCH_MAX_LIMIT)
+        result = ProductSearchService.search(query, offset, limit)
+        return jsonify({
+            "success": True,
+            "data": result['products'],
+            "total": result['total'],
+            "offset": offset,
+            "limit": limit
+        }), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+
+@product_bp.route('/reprice', methods=['POST'])
+@admission_class('bulk')
+@deadline(config.BULK_REPRICE_DEADLINE_SECONDS)
+def reprice_products():
+    """
+    Recompute prices for many products in one statement
+
+    Body: category_id, product_ids, stock_status, min_price, max_price (or
+    all=true), optional profit_percentage, and dry_run to preview the changes.
+    """
+    try:
+        data = request.get_json() or {}
+        try:
+            result = PricingService.bulk_reprice(data)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        if result['affected'] and not result['dry_run']:
+            LiveUpdateService.notify_inventory_changed()
+        return jsonify({"success": True, "data": result}), 200
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
@@ -21,9 +99,18 @@ def get_all_products():
 
 @product_bp.route('/<int:product_id>', methods=['GET'])
 def get_product(product_id):
-    """Get a product by ID"""
+    """
+    Get a product by ID
+
+    ?fields=name,price selects only those fields; total_sales, average_cost,
+    fifo_unit_cost and profit_margin are only computed when asked for (or ?fields=*).
+    """
     try:
-        product = Product.get_by_id(product_id)
+        try:
+            fields = parse_fields(request.args, PRODUCT_FIELDS, PRODUCT_DEFAULT_FIELDS)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        product = Product.get_by_id(product_id, fields)
         if not product:
             return jsonify({"success": False, "error": "Product not found"}), 404
         return jsonify({"success": True, "data": product}), 200
@@ -48,6 +135,8 @@ def create_product():
         
         # Create product with default prices
         product_id = Product.create(name, category_id, 0, quantity, reorder_level, profit_percentage)
+        LiveUpdateService.notify_inventory_changed()
+        ProductSearchService.notify_changed()
         
         return jsonify({
             "success": True, 
@@ -59,6 +148,28 @@ def create_product():
 
 
 
+@product_bp.route('/import', methods=['POST'])
+@admission_class('bulk')
+@deadline(0)
+def import_products():
+    """Bulk-create products from a CSV upload (multipart "file" field or a text/csv body)"""
+    try:
+        upload = request.files.get('file')
+        stream = upload.stream if upload else request.stream
+        create_categories = request.args.get('create_categories', 'false').lower() == 'true'
+        try:
+            report = ProductImportService.import_csv(g.db, stream, create_categories=create_categories)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        if report['imported']:
+            LiveUpdateService.notify_inventory_changed()
+            ProductSearchService.notify_changed()
+        return jsonify({"success": True, "data": report}), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+
 @product_bp.route('/<int:product_id>/', methods=['PUT'])
 @product_bp.route('/<int:product_id>', methods=['PUT'])
 def update_product(product_id):
@@ -70,7 +181,7 @@ def update_product(product_id):
             return jsonify({"success": False, "error": "Missing required fields"}), 400
         
         # Check if product exists
-        product = Product.get_by_id(product_id)
+        product = Product.get_by_id(product_id, ('price', 'base_price', 'quantity', 'reorder_level', 'profit_percentage'))
         if not product:
             return jsonify({"success": False, "error": "Product not found"}), 404
         name = data.get('name')
@@ -85,6 +196,8 @@ def update_product(product_id):
         
         # Update product
         Product.update(product_id, name, category_id, current_price, quantity, reorder_level, profit_percentage, current_base_price)
+        LiveUpdateService.notify_inventory_changed()
+        ProductSearchService.notify_changed()
         
         return jsonify({
             "success": True, 
@@ -101,12 +214,14 @@ def delete_product(product_id):
     """Delete a product"""
     try:
         # Check if product exists
-        product = Product.get_by_id(product_id)
+        product = Product.get_by_id(product_id, ('product_id',))
         if not product:
             return jsonify({"success": False, "error": "Product not found"}), 404
         
         # Delete product
         Product.delete(product_id)
+        LiveUpdateService.notify_inventory_changed()
+        ProductSearchService.notify_changed()
         
         return jsonify({
             "success": True, 
@@ -121,6 +236,7 @@ def delete_product(product_id):
 
 
 @product_bp.route('/low-stock', methods=['GET'])
+@admission_class('analytics')
 def get_low_stock():
     """Get products with low stock"""
     try:
@@ -133,6 +249,7 @@ def get_low_stock():
 
 
 @product_bp.route('/top-selling', methods=['GET'])
+@admission_class('analytics')
 def get_top_selling():
     """Get top selling products"""
     try:
@@ -145,6 +262,7 @@ def get_top_selling():
 
 
 @product_bp.route('/inventory-summary', methods=['GET'])
+@admission_class('analytics')
 def get_inventory_summary():
     """Get inventory summary"""
     try:
@@ -152,3 +270,35 @@ def get_inventory_summary():
         return jsonify({"success": True, "data": summary}), 200
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
+
+
+
+
+@product_bp.route('/stock-as-of', methods=['GET'])
+@admission_class('analytics')
+def get_stock_as_of():
+    """Get stock levels at a point in time (?as_of=ISO datetime, optional product_id)"""
+    try:
+        try:
+            as_of = datetime.fromisoformat(request.args.get('as_of', ''))
+        except ValueError:
+            return jsonify({"success": False, "error": "as_of must be an ISO date or datetime"}), 400
+        if as_of.tzinfo is not None:
+            return jsonify({"success": False, "error": "as_of must be a local time without an offset"}), 400
+        product_id = request.args.get('product_id', type=int)
+        stock = StockLedger.get_stock_as_of(as_of, product_id)
+        return jsonify({"success": True, "data": stock}), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+
+@product_bp.route('/<int:product_id>/movements', methods=['GET'])
+def get_stock_movements(product_id):
+    """Get the most recent stock movements for a product (?limit=, default 100)"""
+    try:
+        limit = min(max(request.args.get('limit', 100, type=int), 1), 1000)
+        movements = StockLedger.get_movements(product_id, limit)
+        return jsonify({"success": True, "data": movements}), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
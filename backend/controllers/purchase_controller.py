@@ -4,6 +4,9 @@ Purchase controller for the Inventory Management System
 from flask import Blueprint, jsonify, request
 from models.purchase import Purchase
 from services.stock_service import StockService
+from services.live_update_service import LiveUpdateService
+from utils.admission import admission_class
+from utils.export import EXPORT_MIMETYPES, parse_date_range, stream_export
 import config
 
 purchase_bp = Blueprint('purchase', __name__)
@@ -11,15 +14,41 @@ purchase_bp = Blueprint('purchase', __name__)
 
 @purchase_bp.route('/', methods=['GET'])
 def get_all_purchases():
-    """Get all purchases"""
+    """Get all purchases (?format=columnar for a compact columns/rows payload)"""
     try:
-        purchases = Purchase.get_all()
+        purchases = Purchase.get_all(columnar=request.args.get('format') == 'columnar')
         return jsonify({"success": True, "data": purchases}), 200
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 
 
+@purchase_bp.route('/export', methods=['GET'])
+@admission_class('export')
+def export_purchases():
+    """Stream purchases for a date range as CSV or NDJSON (?format=csv|ndjson)"""
+    try:
+        fmt = request.args.get('format', 'csv')
+        if fmt not in EXPORT_MIMETYPES:
+            return jsonify({"success": False, "error": "format must be csv or ndjson"}), 400
+        try:
+            start, end = parse_date_range(request.args)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+
+        columns, chunks = Purchase.export(
+            start, end,
+            product_id=request.args.get('product_id', type=int),
+            category_id=request.args.get('category_id', type=int),
+            supplier=request.args.get('supplier')
+        )
+        filename = f"purchases-{request.args['start_date']}-to-{request.args['end_date']}"
+        return stream_export(columns, chunks, fmt, filename)
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+
 @purchase_bp.route('/<int:purchase_id>', methods=['GET'])
 def get_purchase(purchase_id):
     """Get a purchase by ID"""
@@ -61,6 +90,7 @@ def create_purchase():
                 purchase_price, 
                 supplier
             )
+            LiveUpdateService.notify_inventory_changed()
             
             return jsonify({
                 "success": True, 
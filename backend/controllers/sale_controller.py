@@ -3,20 +3,68 @@ Sale controller for the Inventory Management System
 """
 from flask import Blueprint, jsonify, request
 from models.sale import Sale
+from services.live_update_service import LiveUpdateService
+from services.sale_ingestion_service import SaleIngestionService, SaleNotRecorded, SalePending
+from utils.admission import admission_class
+from utils.export import EXPORT_MIMETYPES, parse_date_range, stream_export
+from utils.pagination import parse_id_list, key_by_id
+import config
 
 sale_bp = Blueprint('sale', __name__)
 
 @sale_bp.route('/', methods=['GET'])
 def get_all_sales():
-    """Get all sales"""
+    """
+    Get all sales, archived ones included (?format=columnar for a compact columns/rows payload, ?start_date=&end_date= for a range)
+
+    ?ids=3,7,12 returns just those sales, archived ones included, keyed by sale_id.
+    """
     try:
-        sales = Sale.get_all()
+        if 'ids' in request.args:
+            try:
+                ids = parse_id_list(request.args)
+            except ValueError as e:
+                return jsonify({"success": False, "error": str(e)}), 400
+            sales, missing = key_by_id(Sale.get_by_ids(ids), 'sale_id', ids)
+            return jsonify({"success": True, "data": sales, "missing": missing}), 200
+        start = end = None
+        if 'start_date' in request.args or 'end_date' in request.args:
+            try:
+                start, end = parse_date_range(request.args)
+            except ValueError as e:
+                return jsonify({"success": False, "error": str(e)}), 400
+        sales = Sale.get_all(columnar=request.args.get('format') == 'columnar', start=start, end=end)
         return jsonify({"success": True, "data": sales}), 200
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
 
 
+@sale_bp.route('/export', methods=['GET'])
+@admission_class('export')
+def export_sales():
+    """Stream sales for a date range as CSV or NDJSON (?format=csv|ndjson)"""
+    try:
+        fmt = request.args.get('format', 'csv')
+        if fmt not in EXPORT_MIMETYPES:
+            return jsonify({"success": False, "error": "format must be csv or ndjson"}), 400
+        try:
+            start, end = parse_date_range(request.args)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+
+        columns, chunks = Sale.export(
+            start, end,
+            product_id=request.args.get('product_id', type=int),
+            category_id=request.args.get('category_id', type=int)
+        )
+        filename = f"sales-{request.args['start_date']}-to-{request.args['end_date']}"
+        return stream_export(columns, chunks, fmt, filename)
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+
 @sale_bp.route('/<int:sale_id>', methods=['GET'])
 def get_sale(sale_id):
     """Get a sale by ID"""
@@ -50,15 +98,33 @@ def create_sale():
         if not isinstance(sale_price, (int, float)) or sale_price <= 0:
             return jsonify({"success": False, "error": "Sale price must be a positive number"}), 400
         
-        # Create sale using stored procedure
+        # Create sale using stored procedure, or through the group-commit pipeline when enabled
         try:
-            sale_id = Sale.create(product_id, quantity, sale_price)
+            if config.SALE_BATCHING_ENABLED:
+                sale_id = SaleIngestionService.create_sale(product_id, quantity, sale_price)
+            else:
+                sale_id = Sale.create(product_id, quantity, sale_price)
+            LiveUpdateService.notify_inventory_changed()
             
             return jsonify({
                 "success": True, 
                 "message": "Sale recorded successfully", 
                 "sale_id": sale_id
             }), 201
+        except SaleNotRecorded as e:
+            # Withdrawn from the queue before any batch wrote it, so a retry cannot double-sell
+            response = jsonify({"success": False, "error": str(e)})
+            response.status_code = 503
+            response.headers['Retry-After'] = str(config.ADMISSION_RETRY_AFTER)
+            return response
+        except SalePending as e:
+            # Already inside a batch: do not retry, poll the outcome instead
+            return jsonify({
+                "success": True,
+                "message": "Sale is still being recorded",
+                "ingest_id": e.ingest_id,
+                "status_url": f"/api/sales/ingest/{e.ingest_id}"
+            }), 202
         except Exception as e:
             # This could be a stock level error from the stored procedure
             return jsonify({"success": False, "error": f"Database error: {str(e)}"}), 500
@@ -67,6 +133,19 @@ def create_sale():
 
 
 
+@sale_bp.route('/ingest/<ingest_id>', methods=['GET'])
+def get_ingest_outcome(ingest_id):
+    """Get the outcome of a batched sale that was answered with 202 (pending, recorded or failed)"""
+    try:
+        outcome = SaleIngestionService.get_outcome(ingest_id)
+        if outcome is None:
+            return jsonify({"success": False, "error": "Unknown or expired ingest_id"}), 404
+        return jsonify({"success": True, "data": outcome}), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+
 @sale_bp.route('/product/<int:product_id>', methods=['GET'])
 def get_sales_by_product(product_id):
     """Get sales for a specific product"""
@@ -91,6 +170,7 @@ def get_recent_sales():
 
 
 @sale_bp.route('/top-selling', methods=['GET'])
+@admission_class('analytics')
 def get_top_selling():
     """Get top selling products"""
     try:
@@ -103,6 +183,7 @@ def get_top_selling():
         
 
 @sale_bp.route('/by-category', methods=['GET'])
+@admission_class('analytics')
 def get_sales_by_category():
     """Get sales aggregated by category"""
     try:
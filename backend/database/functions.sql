@@ -14,10 +14,15 @@ AS
 BEGIN
     DECLARE @total_sales DECIMAL(12, 2);
     
+    -- Hot sales plus the rollup of archived ones
     SELECT @total_sales = ISNULL(SUM(quantity * sale_price), 0)
     FROM sale
     WHERE product_id = @product_id;
     
+    SELECT @total_sales = @total_sales + ISNULL(SUM(revenue), 0)
+    FROM sale_rollup_daily
+    WHERE product_id = @product_id;
+    
     RETURN @total_sales;
 END;
 GO
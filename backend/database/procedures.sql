@@ -16,6 +16,7 @@ CREATE PROCEDURE sp_add_purchase
 AS
 BEGIN
     SET NOCOUNT ON;
+    SET XACT_ABORT ON;
     
     -- Validate input
     IF @product_id IS NULL OR @quantity IS NULL OR @purchase_price IS NULL
@@ -49,12 +50,20 @@ BEGIN
     -- Calculate the sale price using the product's profit percentage
     DECLARE @sale_price DECIMAL(10, 2);
     SET @sale_price = @purchase_price * (1 + (@profit_percentage / 100));      -- Insert the purchase
+    DECLARE @purchase_id INT;
+    
     BEGIN TRY
         BEGIN TRANSACTION;
         
         INSERT INTO purchase (product_id, quantity, purchase_price, supplier, purchase_date)
         VALUES (@product_id, @quantity, @purchase_price, @supplier, GETDATE());
         
+        SET @purchase_id = SCOPE_IDENTITY();
+        
+        -- Tell trg_product_stock_ledger which movement this is
+        EXEC sp_set_session_context @key = N'stock_movement_type', @value = 'purchase';
+        EXEC sp_set_session_context @key = N'stock_movement_ref', @value = @purchase_id;
+        
         -- Update product prices AND quantity (trigger is disabled to prevent double updates)
         UPDATE product
         SET quantity = quantity + @quantity,
@@ -63,20 +72,24 @@ BEGIN
             updated_at = GETDATE()
         WHERE product_id = @product_id;
         
+        EXEC sp_set_session_context @key = N'stock_movement_type', @value = NULL;
+        EXEC sp_set_session_context @key = N'stock_movement_ref', @value = NULL;
+        
         COMMIT TRANSACTION;
         
         -- Return the created purchase_id
-        SELECT SCOPE_IDENTITY() AS purchase_id;
+        SELECT @purchase_id AS purchase_id;
     END TRY
     BEGIN CATCH
+        EXEC sp_set_session_context @key = N'stock_movement_type', @value = NULL;
+        EXEC sp_set_session_context @key = N'stock_movement_ref', @value = NULL;
+        
         IF @@TRANCOUNT > 0
             ROLLBACK TRANSACTION;
-            
-        DECLARE @ErrorMessage NVARCHAR(4000) = ERROR_MESSAGE();
-        DECLARE @ErrorSeverity INT = ERROR_SEVERITY();
-        DECLARE @ErrorState INT = ERROR_STATE();
         
-        RAISERROR(@ErrorMessage, @ErrorSeverity, @ErrorState);
+        -- THROW keeps the original error number (1205, 1222, 3960) so the
+        -- caller can tell a deadlock or lock timeout from a real failure and retry
+        THROW;
     END CATCH;
 END;
 GO
@@ -93,6 +106,9 @@ CREATE PROCEDURE sp_make_sale
 AS
 BEGIN
     SET NOCOUNT ON;
+    -- A query timeout cancels the batch without running CATCH; XACT_ABORT
+    -- still rolls the transaction back instead of leaving its locks held
+    SET XACT_ABORT ON;
     
     -- Validate input
     IF @product_id IS NULL OR @quantity IS NULL OR @sale_price IS NULL
@@ -113,44 +129,58 @@ BEGIN
         RETURN;
     END;
     
-    -- Check if product exists
-    IF NOT EXISTS (SELECT 1 FROM product WHERE product_id = @product_id)
-    BEGIN
-        RAISERROR('Product does not exist.', 16, 1);
-        RETURN;
-    END;
-    
-    -- Check if there's enough stock
     DECLARE @current_stock INT;
-    SELECT @current_stock = quantity FROM product WHERE product_id = @product_id;
+    DECLARE @sale_id INT;
+    DECLARE @reserved TABLE (remaining_quantity INT);
     
-    IF @current_stock < @quantity
-    BEGIN
-        RAISERROR('Not enough stock available. Current stock: %d, Requested: %d', 16, 1, @current_stock, @quantity);
-        RETURN;
-    END;      -- Insert the sale
     BEGIN TRY
         BEGIN TRANSACTION;
         
+        -- Tell trg_update_stock_on_sale the quantity is already reserved, and
+        -- trg_product_stock_ledger to leave the ledger entry to the sale trigger
+        EXEC sp_set_session_context @key = N'stock_reserved', @value = 1;
+        
+        -- Reserve the stock with one conditional UPDATE instead of read-check-update:
+        -- the stock check and the decrement happen under the same row lock, so
+        -- concurrent sales of a hot product neither oversell nor wait on a prior read
+        UPDATE product
+        SET quantity = quantity - @quantity,
+            updated_at = GETDATE()
+        OUTPUT inserted.quantity INTO @reserved (remaining_quantity)
+        WHERE product_id = @product_id
+          AND quantity >= @quantity;
+        
+        IF NOT EXISTS (SELECT 1 FROM @reserved)
+        BEGIN
+            SELECT @current_stock = quantity FROM product WHERE product_id = @product_id;
+            
+            IF @current_stock IS NULL
+                RAISERROR('Product does not exist.', 16, 1);
+            ELSE
+                RAISERROR('Not enough stock available. Current stock: %d, Requested: %d', 16, 1, @current_stock, @quantity);
+        END;
+        
         INSERT INTO sale (product_id, quantity, sale_price, sale_date)
         VALUES (@product_id, @quantity, @sale_price, GETDATE());
         
-        -- Quantity update is handled by the trigger, so we don't need to update it here
+        SET @sale_id = SCOPE_IDENTITY();
+        
+        EXEC sp_set_session_context @key = N'stock_reserved', @value = NULL;
         
         COMMIT TRANSACTION;
         
         -- Return the created sale_id
-        SELECT SCOPE_IDENTITY() AS sale_id;
+        SELECT @sale_id AS sale_id;
     END TRY
     BEGIN CATCH
+        EXEC sp_set_session_context @key = N'stock_reserved', @value = NULL;
+        
         IF @@TRANCOUNT > 0
             ROLLBACK TRANSACTION;
-            
-        DECLARE @ErrorMessage NVARCHAR(4000) = ERROR_MESSAGE();
-        DECLARE @ErrorSeverity INT = ERROR_SEVERITY();
-        DECLARE @ErrorState INT = ERROR_STATE();
         
-        RAISERROR(@ErrorMessage, @ErrorSeverity, @ErrorState);
+        -- THROW keeps the original error number (1205, 1222, 3960) so the
+        -- caller can tell a deadlock or lock timeout from a real failure and retry
+        THROW;
     END CATCH;
 END;
 GO
@@ -211,6 +241,10 @@ BEGIN
     IF @end_date IS NULL
         SET @end_date = GETDATE();
     
+    -- Archived sales are only read when the range starts before the archive boundary
+    DECLARE @archived_before DATETIME;
+    SELECT @archived_before = archived_before FROM sale_archive_state;
+    
     -- Get sales history
     SELECT 
         s.sale_id,
@@ -219,8 +253,14 @@ BEGIN
         s.sale_price,
         s.quantity * s.sale_price AS total_amount,
         s.sale_date
-    FROM 
-        sale s
+    FROM (
+        SELECT sale_id, product_id, quantity, sale_price, sale_date
+        FROM sale
+        UNION ALL
+        SELECT sale_id, product_id, quantity, sale_price, sale_date
+        FROM sale_archive
+        WHERE @start_date < @archived_before
+    ) s
     JOIN 
         product p ON s.product_id = p.product_id
     WHERE 
@@ -231,13 +271,31 @@ BEGIN
 END;
 GO
 -- Create user-defined table type for batch stock updates
+-- Databases created before counted_quantity existed get the type recreated;
+-- the procedure depends on it, so it is dropped first and recreated below
+IF EXISTS (SELECT * FROM sys.types WHERE name = 'ProductStockUpdateType' AND is_table_type = 1)
+   AND NOT EXISTS (
+       SELECT 1
+       FROM sys.table_types tt
+       JOIN sys.columns c ON c.object_id = tt.type_table_object_id
+       WHERE tt.name = 'ProductStockUpdateType' AND c.name = 'counted_quantity'
+   )
+BEGIN
+    IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_batch_update_stock')
+        DROP PROCEDURE sp_batch_update_stock;
+    DROP TYPE dbo.ProductStockUpdateType;
+END;
+GO
+
 IF NOT EXISTS (SELECT * FROM sys.types WHERE name = 'ProductStockUpdateType' AND is_table_type = 1)
 BEGIN
     CREATE TYPE dbo.ProductStockUpdateType AS TABLE
     (
         product_id INT NOT NULL,
-        quantity_change INT NOT NULL,
-        reason VARCHAR(255) NULL
+        quantity_change INT NULL,
+        reason VARCHAR(255) NULL,
+        -- Counted stock for a cycle count; the change is worked out under the row lock
+        counted_quantity INT NULL
     );
 END;
 GO
@@ -252,16 +310,22 @@ CREATE PROCEDURE sp_batch_update_stock
 AS
 BEGIN
     SET NOCOUNT ON;
+    SET XACT_ABORT ON;
     
     DECLARE @ErrorMessage NVARCHAR(4000);
+    DECLARE @changes TABLE (product_id INT NOT NULL, quantity_change INT NOT NULL, reason VARCHAR(255) NULL);
     
-    -- Validate input data
+    -- Validate input data: each row is either a non-zero change or a counted quantity
     IF EXISTS (
         SELECT 1 FROM @product_updates 
-        WHERE product_id IS NULL OR quantity_change IS NULL OR quantity_change = 0
+        WHERE product_id IS NULL
+           OR (quantity_change IS NULL AND counted_quantity IS NULL)
+           OR (quantity_change IS NOT NULL AND counted_quantity IS NOT NULL)
+           OR quantity_change = 0
+           OR counted_quantity < 0
     )
     BEGIN
-        RAISERROR('All product IDs and quantity changes are required and must not be zero.', 16, 1);
+        RAISERROR('Each update needs a product ID and either a non-zero quantity change or a counted quantity that is not negative.', 16, 1);
         RETURN;
     END;
     
@@ -278,32 +342,43 @@ BEGIN
         RETURN;
     END;
     
-    -- Check that we have enough stock for negative adjustments
-    IF EXISTS (
-        SELECT 1
-        FROM @product_updates pu
-        JOIN product p ON pu.product_id = p.product_id
-        WHERE pu.quantity_change < 0 AND ABS(pu.quantity_change) > p.quantity
-    )
-    BEGIN
-        SET @ErrorMessage = 'One or more products do not have enough stock for the requested reduction.';
-        RAISERROR(@ErrorMessage, 16, 1);
-        RETURN;
-    END;
-    
     -- Update all product quantities in a single transaction
     BEGIN TRY
         BEGIN TRANSACTION;
         
+        -- Lock the product rows first, so counted quantities become changes
+        -- from the stock as it is now, not as it was when the count was loaded
+        INSERT INTO @changes (product_id, quantity_change, reason)
+        SELECT 
+            pu.product_id,
+            ISNULL(pu.quantity_change, pu.counted_quantity - p.quantity),
+            pu.reason
+        FROM @product_updates pu
+        JOIN product p WITH (UPDLOCK, ROWLOCK) ON p.product_id = pu.product_id;
+        
+        -- Check that we have enough stock for negative adjustments
+        IF EXISTS (
+            SELECT 1
+            FROM @changes c
+            JOIN product p ON c.product_id = p.product_id
+            WHERE p.quantity + c.quantity_change < 0
+        )
+            RAISERROR('One or more products do not have enough stock for the requested reduction.', 16, 1);
+        
+        EXEC sp_set_session_context @key = N'stock_movement_type', @value = 'adjustment';
+        
         UPDATE p
-        SET p.quantity = p.quantity + pu.quantity_change,
+        SET p.quantity = p.quantity + c.quantity_change,
             p.updated_at = GETDATE()
         FROM product p
-        JOIN @product_updates pu ON p.product_id = pu.product_id;
+        JOIN @changes c ON p.product_id = c.product_id
+        WHERE c.quantity_change <> 0;
+        
+        EXEC sp_set_session_context @key = N'stock_movement_type', @value = NULL;
         
         COMMIT TRANSACTION;
         
-        -- Return updated products
+        -- Return updated products with the change actually applied (0 when a count already matched)
         SELECT 
             p.product_id,
             p.name,
@@ -314,16 +389,18 @@ BEGIN
                 WHEN p.quantity = 0 THEN 'Out of Stock'
                 ELSE 'In Stock'
             END AS stock_status,
-            pu.quantity_change,
-            pu.reason
+            c.quantity_change,
+            c.reason
         FROM 
             product p
         JOIN 
-            @product_updates pu ON p.product_id = pu.product_id
+            @changes c ON p.product_id = c.product_id
         ORDER BY 
             p.name;
     END TRY
     BEGIN CATCH
+        EXEC sp_set_session_context @key = N'stock_movement_type', @value = NULL;
+        
         IF @@TRANCOUNT > 0
             ROLLBACK TRANSACTION;
             
@@ -509,8 +586,9 @@ BEGIN
         CASE
             WHEN pm.current_stock = 0 THEN 'Out of Stock'
             WHEN pm.units_sold = 0 THEN 'Overstocked'
-            WHEN pm.current_stock / (pm.units_sold / @lookback_days) > 60 THEN 'Overstocked'
-            WHEN pm.current_stock / (pm.units_sold / @lookback_days) < 7 THEN 'Understocked'
+            -- Decimal daily rate: integer division made it 0 (and the ratio divide by zero) below one unit a day
+            WHEN pm.current_stock / (pm.units_sold * 1.0 / @lookback_days) > 60 THEN 'Overstocked'
+            WHEN pm.current_stock / (pm.units_sold * 1.0 / @lookback_days) < 7 THEN 'Understocked'
             ELSE 'Optimally Stocked'
         END AS stock_efficiency
     FROM 
@@ -651,3 +729,475 @@ BEGIN
     PRINT 'Product pricing fields check completed';
 END;
 GO
+
+-- Create user-defined table type for batched sale ingestion
+IF NOT EXISTS (SELECT * FROM sys.types WHERE name = 'SaleBatchType' AND is_table_type = 1)
+BEGIN
+    CREATE TYPE dbo.SaleBatchType AS TABLE
+    (
+        line_no INT NOT NULL PRIMARY KEY,
+        product_id INT NOT NULL,
+        quantity INT NOT NULL,
+        sale_price DECIMAL(10, 2) NOT NULL
+    );
+END;
+GO
+
+-- Procedure to record a micro-batch of sales in one transaction
+IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_make_sales_batch')
+    DROP PROCEDURE sp_make_sales_batch;
+GO
+
+CREATE PROCEDURE sp_make_sales_batch
+    @sales dbo.SaleBatchType READONLY
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+    
+    DECLARE @accepted TABLE (line_no INT PRIMARY KEY);
+    DECLARE @inserted TABLE (line_no INT PRIMARY KEY, sale_id INT NOT NULL);
+    
+    BEGIN TRY
+        BEGIN TRANSACTION;
+        
+        -- Accept lines while the running total per product stays within stock.
+        -- UPDLOCK holds the product rows until commit so the check cannot go stale.
+        INSERT INTO @accepted (line_no)
+        SELECT r.line_no
+        FROM (
+            SELECT 
+                s.line_no,
+                s.quantity,
+                s.sale_price,
+                p.quantity AS current_stock,
+                SUM(s.quantity) OVER (PARTITION BY s.product_id ORDER BY s.line_no ROWS UNBOUNDED PRECEDING) AS running_quantity
+            FROM @sales s
+            JOIN product p WITH (UPDLOCK, ROWLOCK) ON p.product_id = s.product_id
+        ) r
+        WHERE r.quantity > 0
+          AND r.sale_price > 0
+          AND r.running_quantity <= r.current_stock;
+        
+        -- MERGE (rather than INSERT) so OUTPUT can map each new sale_id back to its line
+        MERGE INTO sale AS target
+        USING (
+            SELECT s.line_no, s.product_id, s.quantity, s.sale_price
+            FROM @sales s
+            JOIN @accepted a ON a.line_no = s.line_no
+        ) AS source
+        ON 1 = 0
+        WHEN NOT MATCHED THEN
+            INSERT (product_id, quantity, sale_price, sale_date)
+            VALUES (source.product_id, source.quantity, source.sale_price, GETDATE())
+        OUTPUT source.line_no, inserted.sale_id INTO @inserted (line_no, sale_id);
+        
+        COMMIT TRANSACTION;
+        
+        -- Lines without a sale_id were rejected and should be retried individually
+        SELECT s.line_no, i.sale_id
+        FROM @sales s
+        LEFT JOIN @inserted i ON i.line_no = s.line_no
+        ORDER BY s.line_no;
+    END TRY
+    BEGIN CATCH
+        IF @@TRANCOUNT > 0
+            ROLLBACK TRANSACTION;
+        
+        -- THROW keeps the original error number (1205, 1222, 3960) so the
+        -- caller can tell a deadlock or lock timeout from a real failure and retry
+        THROW;
+    END CATCH;
+END;
+GO
+
+-- Procedure to snapshot stock levels from the movement ledger
+IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_take_stock_snapshot')
+    DROP PROCEDURE sp_take_stock_snapshot;
+GO
+
+CREATE PROCEDURE sp_take_stock_snapshot
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    DECLARE @now DATETIME2 = SYSDATETIME();
+    
+    -- Only products with movements since their latest snapshot get a new one.
+    -- Quantities are derived from the ledger, so a snapshot always matches the
+    -- movements it covers even while new ones are being written.
+    INSERT INTO stock_snapshot (product_id, quantity, last_movement_id, snapshot_date)
+    SELECT 
+        p.product_id,
+        ISNULL(s.quantity, 0) + t.quantity_change,
+        t.last_movement_id,
+        @now
+    FROM product p
+    OUTER APPLY (
+        SELECT TOP 1 ss.quantity, ss.last_movement_id
+        FROM stock_snapshot ss
+        WHERE ss.product_id = p.product_id
+        ORDER BY ss.snapshot_date DESC, ss.snapshot_id DESC
+    ) s
+    CROSS APPLY (
+        SELECT 
+            SUM(m.quantity_change) AS quantity_change,
+            MAX(m.movement_id) AS last_movement_id
+        FROM stock_movement m
+        WHERE m.product_id = p.product_id
+          AND m.movement_id > ISNULL(s.last_movement_id, 0)
+    ) t
+    WHERE t.last_movement_id IS NOT NULL;
+    
+    SELECT @@ROWCOUNT AS snapshot_count, @now AS snapshot_date;
+END;
+GO
+
+-- Procedure to get stock levels as of a point in time
+IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_get_stock_as_of')
+    DROP PROCEDURE sp_get_stock_as_of;
+GO
+
+CREATE PROCEDURE sp_get_stock_as_of
+    @as_of DATETIME2,
+    @product_id INT = NULL
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    -- Start from the nearest snapshot at or before @as_of and replay only the
+    -- ledger tail after it. The next snapshot bounds the tail by movement id,
+    -- so the scan never covers more than one snapshot interval.
+    SELECT 
+        p.product_id,
+        p.name,
+        ISNULL(s.quantity, 0) + ISNULL(t.quantity_change, 0) AS quantity,
+        s.snapshot_date,
+        ISNULL(t.movement_count, 0) AS movements_applied
+    FROM product p
+    OUTER APPLY (
+        SELECT TOP 1 ss.quantity, ss.last_movement_id, ss.snapshot_date
+        FROM stock_snapshot ss
+        WHERE ss.product_id = p.product_id
+          AND ss.snapshot_date <= @as_of
+        ORDER BY ss.snapshot_date DESC, ss.snapshot_id DESC
+    ) s
+    OUTER APPLY (
+        SELECT TOP 1 ns.last_movement_id
+        FROM stock_snapshot ns
+        WHERE ns.product_id = p.product_id
+          AND ns.snapshot_date > @as_of
+        ORDER BY ns.snapshot_date, ns.snapshot_id
+    ) n
+    OUTER APPLY (
+        SELECT 
+            SUM(m.quantity_change) AS quantity_change,
+            COUNT(*) AS movement_count
+        FROM stock_movement m
+        WHERE m.product_id = p.product_id
+          AND m.movement_id > ISNULL(s.last_movement_id, 0)
+          AND (n.last_movement_id IS NULL OR m.movement_id <= n.last_movement_id)
+          AND m.movement_date <= @as_of
+    ) t
+    WHERE (@product_id IS NULL OR p.product_id = @product_id)
+      AND (s.snapshot_date IS NOT NULL OR t.movement_count > 0)
+    ORDER BY p.name;
+END;
+GO
+
+-- Create user-defined table type for stock valuation movements
+IF NOT EXISTS (SELECT * FROM sys.types WHERE name = 'StockValuationType' AND is_table_type = 1)
+BEGIN
+    CREATE TYPE dbo.StockValuationType AS TABLE
+    (
+        line_no INT NOT NULL PRIMARY KEY,   -- Issue order within the batch
+        product_id INT NOT NULL,
+        quantity_change INT NOT NULL,
+        unit_cost DECIMAL(19, 4) NULL,      -- Receipt cost; NULL uses the current average cost
+        movement_type VARCHAR(20) NOT NULL,
+        reference_id INT NULL,
+        sale_id INT NULL,
+        sale_price DECIMAL(10, 2) NULL,
+        movement_date DATETIME2 NOT NULL
+    );
+END;
+GO
+
+-- Procedure to apply stock movements to the valuation state
+IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_apply_stock_valuation')
+    DROP PROCEDURE sp_apply_stock_valuation;
+GO
+
+CREATE PROCEDURE sp_apply_stock_valuation
+    @movements dbo.StockValuationType READONLY
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    -- Called from the stock triggers after the product rows have been updated,
+    -- so each product's valuation is changed under its product row lock.
+    
+    -- Products valued for the first time start empty
+    INSERT INTO product_valuation (product_id)
+    SELECT DISTINCT m.product_id
+    FROM @movements m
+    WHERE NOT EXISTS (SELECT 1 FROM product_valuation v WHERE v.product_id = m.product_id);
+    
+    -- Issues consume the open layers oldest first. Each issue covers a range of
+    -- the product's issued units and each layer a range of its open units; the
+    -- overlap of the two ranges is what the issue takes from the layer.
+    DECLARE @consumed TABLE (
+        line_no INT NOT NULL,
+        layer_id BIGINT NOT NULL,
+        quantity INT NOT NULL,
+        unit_cost DECIMAL(19, 4) NOT NULL,
+        PRIMARY KEY (line_no, layer_id)
+    );
+    
+    WITH issues AS (
+        SELECT 
+            line_no,
+            product_id,
+            -quantity_change AS quantity,
+            SUM(-quantity_change) OVER (PARTITION BY product_id ORDER BY line_no ROWS UNBOUNDED PRECEDING) + quantity_change AS issued_before
+        FROM @movements
+        WHERE quantity_change < 0
+    ),
+    layers AS (
+        SELECT 
+            l.layer_id,
+            l.product_id,
+            l.unit_cost,
+            l.quantity_remaining,
+            SUM(l.quantity_remaining) OVER (PARTITION BY l.product_id ORDER BY l.layer_id ROWS UNBOUNDED PRECEDING) - l.quantity_remaining AS available_before
+        FROM cost_layer l
+        WHERE l.quantity_remaining > 0
+          AND l.product_id IN (SELECT product_id FROM @movements WHERE quantity_change < 0)
+    )
+    INSERT INTO @consumed (line_no, layer_id, quantity, unit_cost)
+    SELECT 
+        i.line_no,
+        l.layer_id,
+        CASE WHEN i.issued_before + i.quantity < l.available_before + l.quantity_remaining
+             THEN i.issued_before + i.quantity ELSE l.available_before + l.quantity_remaining END
+        - CASE WHEN i.issued_before > l.available_before
+               THEN i.issued_before ELSE l.available_before END,
+        l.unit_cost
+    FROM issues i
+    JOIN layers l ON l.product_id = i.product_id
+                 AND l.available_before < i.issued_before + i.quantity
+                 AND i.issued_before < l.available_before + l.quantity_remaining;
+    
+    UPDATE l
+    SET l.quantity_remaining = l.quantity_remaining - c.quantity
+    FROM cost_layer l
+    JOIN (
+        SELECT layer_id, SUM(quantity) AS quantity
+        FROM @consumed
+        GROUP BY layer_id
+    ) c ON c.layer_id = l.layer_id;
+    
+    -- Cost of each issue under both methods. Units without an open layer
+    -- (stock that predates valuation) are costed at the average cost.
+    DECLARE @issue_cost TABLE (
+        line_no INT NOT NULL PRIMARY KEY,
+        product_id INT NOT NULL,
+        quantity INT NOT NULL,
+        cost_average DECIMAL(19, 4) NOT NULL,
+        cost_fifo DECIMAL(19, 4) NOT NULL
+    );
+    
+    INSERT INTO @issue_cost (line_no, product_id, quantity, cost_average, cost_fifo)
+    SELECT 
+        m.line_no,
+        m.product_id,
+        -m.quantity_change,
+        -m.quantity_change * v.average_cost,
+        ISNULL(c.cost, 0) + (-m.quantity_change - ISNULL(c.quantity, 0)) * v.average_cost
+    FROM @movements m
+    JOIN product_valuation v ON v.product_id = m.product_id
+    OUTER APPLY (
+        SELECT SUM(quantity * unit_cost) AS cost, SUM(quantity) AS quantity
+        FROM @consumed c
+        WHERE c.line_no = m.line_no
+    ) c
+    WHERE m.quantity_change < 0;
+    
+    -- Sales are cost of goods sold; other issues (write-offs) only reduce value
+    INSERT INTO sale_cost (sale_id, product_id, sale_date, quantity, revenue, cogs_average, cogs_fifo)
+    SELECT m.sale_id, m.product_id, m.movement_date, ic.quantity, ic.quantity * m.sale_price, ic.cost_average, ic.cost_fifo
+    FROM @movements m
+    JOIN @issue_cost ic ON ic.line_no = m.line_no
+    WHERE m.sale_id IS NOT NULL;
+    
+    MERGE INTO cogs_daily WITH (HOLDLOCK) AS target
+    USING (
+        SELECT 
+            CAST(m.movement_date AS DATE) AS cost_date,
+            m.product_id,
+            SUM(ic.quantity) AS quantity_sold,
+            SUM(ic.quantity * m.sale_price) AS revenue,
+            SUM(ic.cost_average) AS cogs_average,
+            SUM(ic.cost_fifo) AS cogs_fifo
+        FROM @movements m
+        JOIN @issue_cost ic ON ic.line_no = m.line_no
+        WHERE m.sale_id IS NOT NULL
+        GROUP BY CAST(m.movement_date AS DATE), m.product_id
+    ) AS source
+    ON target.cost_date = source.cost_date AND target.product_id = source.product_id
+    WHEN MATCHED THEN
+        UPDATE SET 
+            target.quantity_sold = target.quantity_sold + source.quantity_sold,
+            target.revenue = target.revenue + source.revenue,
+            target.cogs_average = target.cogs_average + source.cogs_average,
+            target.cogs_fifo = target.cogs_fifo + source.cogs_fifo
+    WHEN NOT MATCHED THEN
+        INSERT (cost_date, product_id, quantity_sold, revenue, cogs_average, cogs_fifo)
+        VALUES (source.cost_date, source.product_id, source.quantity_sold, source.revenue, source.cogs_average, source.cogs_fifo);
+    
+    -- Issues leave the average cost unchanged
+    UPDATE v
+    SET v.quantity = v.quantity - ic.quantity,
+        v.fifo_value = CASE WHEN v.quantity - ic.quantity <= 0 THEN 0 ELSE v.fifo_value - ic.cost_fifo END,
+        v.updated_at = SYSDATETIME()
+    FROM product_valuation v
+    JOIN (
+        SELECT product_id, SUM(quantity) AS quantity, SUM(cost_fifo) AS cost_fifo
+        FROM @issue_cost
+        GROUP BY product_id
+    ) ic ON ic.product_id = v.product_id;
+    
+    -- Receipts open a layer each and move the weighted average
+    INSERT INTO cost_layer (product_id, unit_cost, quantity_received, quantity_remaining, movement_type, reference_id, received_date)
+    SELECT 
+        m.product_id,
+        ISNULL(m.unit_cost, v.average_cost),
+        m.quantity_change,
+        m.quantity_change,
+        m.movement_type,
+        m.reference_id,
+        m.movement_date
+    FROM @movements m
+    JOIN product_valuation v ON v.product_id = m.product_id
+    WHERE m.quantity_change > 0;
+    
+    UPDATE v
+    SET v.average_cost = (CASE WHEN v.quantity > 0 THEN v.quantity * v.average_cost ELSE 0 END + r.cost)
+                         / (CASE WHEN v.quantity > 0 THEN v.quantity ELSE 0 END + r.quantity),
+        v.quantity = v.quantity + r.quantity,
+        v.fifo_value = v.fifo_value + r.cost,
+        v.updated_at = SYSDATETIME()
+    FROM product_valuation v
+    JOIN (
+        SELECT 
+            m.product_id,
+            SUM(m.quantity_change) AS quantity,
+            SUM(m.quantity_change * ISNULL(m.unit_cost, pv.average_cost)) AS cost
+        FROM @movements m
+        JOIN product_valuation pv ON pv.product_id = m.product_id
+        WHERE m.quantity_change > 0
+        GROUP BY m.product_id
+    ) r ON r.product_id = v.product_id;
+END;
+GO
+
+-- Procedure to move old sales into the archive
+IF EXISTS (SELECT * FROM sys.procedures WHERE name = 'sp_archive_sales')
+    DROP PROCEDURE sp_archive_sales;
+GO
+
+CREATE PROCEDURE sp_archive_sales
+    @before DATETIME,
+    @batch_size INT = 5000
+AS
+BEGIN
+    SET NOCOUNT ON;
+    SET XACT_ABORT ON;
+    
+    IF @before IS NULL OR @batch_size IS NULL OR @batch_size <= 0
+    BEGIN
+        RAISERROR('A cutoff date and a positive batch size are required.', 16, 1);
+        RETURN;
+    END;
+    
+    DECLARE @archived INT = 0;
+    DECLARE @rows INT = 1;
+    DECLARE @batch TABLE (
+        sale_id INT PRIMARY KEY,
+        product_id INT NOT NULL,
+        quantity INT NOT NULL,
+        sale_price DECIMAL(10, 2) NOT NULL,
+        sale_date DATETIME NOT NULL
+    );
+    
+    BEGIN TRY
+        -- Move the boundary first: from now on readers whose range starts before
+        -- @before also read the archive, so rows in transit are never missed
+        MERGE INTO sale_archive_state WITH (HOLDLOCK) AS target
+        USING (SELECT 1 AS state_id) AS source
+        ON target.state_id = source.state_id
+        WHEN MATCHED AND target.archived_before < @before THEN
+            UPDATE SET target.archived_before = @before
+        WHEN NOT MATCHED THEN
+            INSERT (state_id, archived_before) VALUES (1, @before);
+        
+        -- Short batches keep locks and log growth small while sales keep coming in
+        WHILE @rows > 0
+        BEGIN
+            BEGIN TRANSACTION;
+            
+            DELETE TOP (@batch_size) FROM sale
+            OUTPUT deleted.sale_id, deleted.product_id, deleted.quantity, deleted.sale_price, deleted.sale_date
+            INTO @batch (sale_id, product_id, quantity, sale_price, sale_date)
+            WHERE sale_date < @before;
+            
+            SET @rows = @@ROWCOUNT;
+            
+            INSERT INTO sale_archive (sale_id, product_id, quantity, sale_price, sale_date)
+            SELECT sale_id, product_id, quantity, sale_price, sale_date
+            FROM @batch;
+            
+            MERGE INTO sale_rollup_daily WITH (HOLDLOCK) AS target
+            USING (
+                SELECT 
+                    CAST(sale_date AS DATE) AS sale_date,
+                    product_id,
+                    COUNT(*) AS sale_count,
+                    SUM(quantity) AS quantity,
+                    SUM(quantity * sale_price) AS revenue
+                FROM @batch
+                GROUP BY CAST(sale_date AS DATE), product_id
+            ) AS source
+            ON target.sale_date = source.sale_date AND target.product_id = source.product_id
+            WHEN MATCHED THEN
+                UPDATE SET 
+                    target.sale_count = target.sale_count + source.sale_count,
+                    target.quantity = target.quantity + source.quantity,
+                    target.revenue = target.revenue + source.revenue
+            WHEN NOT MATCHED THEN
+                INSERT (sale_date, product_id, sale_count, quantity, revenue)
+                VALUES (source.sale_date, source.product_id, source.sale_count, source.quantity, source.revenue);
+            
+            COMMIT TRANSACTION;
+            
+            SET @archived = @archived + @rows;
+            DELETE FROM @batch;
+        END;
+        
+        UPDATE sale_archive_state
+        SET last_run_at = SYSDATETIME(),
+            last_run_count = @archived;
+        
+        SELECT @archived AS archived_count, archived_before
+        FROM sale_archive_state;
+    END TRY
+    BEGIN CATCH
+        IF @@TRANCOUNT > 0
+            ROLLBACK TRANSACTION;
+        
+        -- THROW keeps the original error number (1205, 1222, 3960) so the
+        -- caller can tell a deadlock or lock timeout from a real failure and retry
+        THROW;
+    END CATCH;
+END;
+GO
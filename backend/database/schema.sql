@@ -8,6 +8,13 @@ BEGIN
 END
 GO
 
+-- Allow SNAPSHOT isolation so analytics reads do not block or wait on sale/purchase transactions
+IF NOT EXISTS (SELECT * FROM sys.databases WHERE name = 'inventory_management' AND snapshot_isolation_state = 1)
+BEGIN
+    ALTER DATABASE inventory_management SET ALLOW_SNAPSHOT_ISOLATION ON;
+END
+GO
+
 USE inventory_management;
 GO
 
@@ -105,4 +112,321 @@ BEGIN
         FOREIGN KEY (product_id) REFERENCES product(product_id)
     );
 END
-GO
\ No newline at end of file
+GO
+
+-- Index backing the catalog change marker (MAX(updated_at)) used for ETag/Last-Modified
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_product_updated_at' AND object_id = OBJECT_ID('product'))
+BEGIN
+    CREATE INDEX IX_product_updated_at ON product (updated_at);
+END
+GO
+
+-- Date indexes for the streaming date-range exports (/api/sales/export, /api/purchases/export)
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_sale_sale_date' AND object_id = OBJECT_ID('sale'))
+BEGIN
+    CREATE INDEX IX_sale_sale_date ON sale (sale_date) INCLUDE (product_id, quantity, sale_price);
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_purchase_purchase_date' AND object_id = OBJECT_ID('purchase'))
+BEGIN
+    CREATE INDEX IX_purchase_purchase_date ON purchase (purchase_date) INCLUDE (product_id, quantity, purchase_price, supplier);
+END
+GO
+
+-- Catalog sort keys for keyset pagination (/api/products/?sort=&cursor=); the product_id
+-- tie-breaker is the clustered key, so each index is already ordered by (key, product_id)
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_product_name' AND object_id = OBJECT_ID('product'))
+BEGIN
+    CREATE INDEX IX_product_name ON product (name) INCLUDE (category_id, price, base_price, quantity, reorder_level, profit_percentage);
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_product_price' AND object_id = OBJECT_ID('product'))
+BEGIN
+    CREATE INDEX IX_product_price ON product (price) INCLUDE (name, category_id, base_price, quantity, reorder_level, profit_percentage);
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_product_quantity' AND object_id = OBJECT_ID('product'))
+BEGIN
+    CREATE INDEX IX_product_quantity ON product (quantity) INCLUDE (name, category_id, price, base_price, reorder_level, profit_percentage);
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_product_category_name' AND object_id = OBJECT_ID('product'))
+BEGIN
+    CREATE INDEX IX_product_category_name ON product (category_id, name) INCLUDE (price, base_price, quantity, reorder_level, profit_percentage);
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_product_category_price' AND object_id = OBJECT_ID('product'))
+BEGIN
+    CREATE INDEX IX_product_category_price ON product (category_id, price) INCLUDE (name, base_price, quantity, reorder_level, profit_percentage);
+END
+GO
+
+-- Row versions for the delta-sync change feed (/api/changes)
+IF NOT EXISTS (
+    SELECT * FROM sys.columns 
+    WHERE name = 'row_version' AND object_id = OBJECT_ID('product')
+)
+BEGIN
+    ALTER TABLE product
+    ADD row_version ROWVERSION;
+    
+    PRINT 'Added row_version column to product table';
+END
+GO
+
+IF NOT EXISTS (
+    SELECT * FROM sys.columns 
+    WHERE name = 'row_version' AND object_id = OBJECT_ID('category')
+)
+BEGIN
+    ALTER TABLE category
+    ADD row_version ROWVERSION;
+    
+    PRINT 'Added row_version column to category table';
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_product_row_version' AND object_id = OBJECT_ID('product'))
+BEGIN
+    CREATE INDEX IX_product_row_version ON product (row_version);
+END
+GO
+
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name = 'IX_category_row_version' AND object_id = OBJECT_ID('category'))
+BEGIN
+    CREATE INDEX IX_category_row_version ON category (row_version);
+END
+GO
+
+-- Tombstones for deleted rows, so the change feed can report deletions
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'change_tombstone')
+BEGIN
+    CREATE TABLE change_tombstone (
+        tombstone_id INT PRIMARY KEY IDENTITY(1,1),
+        entity_type VARCHAR(20) NOT NULL,
+        entity_id INT NOT NULL,
+        row_version ROWVERSION,
+        deleted_at DATETIME DEFAULT GETDATE()
+    );
+    
+    CREATE INDEX IX_change_tombstone_row_version ON change_tombstone (row_version);
+END
+GO
+
+-- Append-only stock movement ledger, filled by trg_product_stock_ledger and trg_update_stock_on_sale
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'stock_movement')
+BEGIN
+    CREATE TABLE stock_movement (
+        movement_id BIGINT PRIMARY KEY IDENTITY(1,1),
+        product_id INT NOT NULL,
+        movement_type VARCHAR(20) NOT NULL, -- opening, sale, purchase, adjustment, manual
+        quantity_change INT NOT NULL,
+        reference_id INT NULL,              -- sale_id or purchase_id when known
+        movement_date DATETIME2 NOT NULL DEFAULT SYSDATETIME()
+    );
+    
+    CREATE INDEX IX_stock_movement_product ON stock_movement (product_id, movement_id) INCLUDE (quantity_change, movement_date);
+END
+GO
+
+-- Periodic per-product stock snapshots, so as-of lookups only replay a short ledger tail
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'stock_snapshot')
+BEGIN
+    CREATE TABLE stock_snapshot (
+        snapshot_id BIGINT PRIMARY KEY IDENTITY(1,1),
+        product_id INT NOT NULL,
+        quantity INT NOT NULL,
+        last_movement_id BIGINT NOT NULL,   -- Ledger movements up to this id are included
+        snapshot_date DATETIME2 NOT NULL DEFAULT SYSDATETIME()
+    );
+    
+    CREATE INDEX IX_stock_snapshot_product ON stock_snapshot (product_id, snapshot_date) INCLUDE (quantity, last_movement_id);
+    
+    -- Baseline for stock that existed before the ledger
+    INSERT INTO stock_snapshot (product_id, quantity, last_movement_id)
+    SELECT product_id, quantity, 0 FROM product;
+    
+    PRINT 'Created stock_snapshot table with a baseline snapshot';
+END
+GO
+
+-- FIFO cost layers: one per receipt, consumed oldest first by sales and write-offs
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'cost_layer')
+BEGIN
+    CREATE TABLE cost_layer (
+        layer_id BIGINT PRIMARY KEY IDENTITY(1,1),
+        product_id INT NOT NULL,
+        unit_cost DECIMAL(19, 4) NOT NULL,
+        quantity_received INT NOT NULL,
+        quantity_remaining INT NOT NULL,
+        movement_type VARCHAR(20) NOT NULL,
+        reference_id INT NULL,              -- purchase_id for purchases
+        received_date DATETIME2 NOT NULL DEFAULT SYSDATETIME()
+    );
+    
+    CREATE INDEX IX_cost_layer_open ON cost_layer (product_id, layer_id)
+        INCLUDE (unit_cost, quantity_remaining)
+        WHERE quantity_remaining > 0;
+END
+GO
+
+-- Per-product valuation state, maintained incrementally by sp_apply_stock_valuation
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'product_valuation')
+BEGIN
+    CREATE TABLE product_valuation (
+        product_id INT PRIMARY KEY,
+        quantity INT NOT NULL DEFAULT 0,
+        average_cost DECIMAL(19, 4) NOT NULL DEFAULT 0, -- Moving weighted-average unit cost
+        fifo_value DECIMAL(19, 4) NOT NULL DEFAULT 0,   -- Cost of the open FIFO layers
+        updated_at DATETIME2 NOT NULL DEFAULT SYSDATETIME()
+    );
+    
+    -- Existing stock starts as one layer per product at its current base price
+    INSERT INTO cost_layer (product_id, unit_cost, quantity_received, quantity_remaining, movement_type)
+    SELECT product_id, base_price, quantity, quantity, 'opening'
+    FROM product
+    WHERE quantity > 0;
+    
+    INSERT INTO product_valuation (product_id, quantity, average_cost, fifo_value)
+    SELECT product_id, quantity, base_price, quantity * base_price
+    FROM product;
+    
+    PRINT 'Created product_valuation table from current stock';
+END
+GO
+
+-- Cost of goods sold per sale, under both costing methods
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'sale_cost')
+BEGIN
+    CREATE TABLE sale_cost (
+        sale_id INT PRIMARY KEY,
+        product_id INT NOT NULL,
+        sale_date DATETIME2 NOT NULL,
+        quantity INT NOT NULL,
+        revenue DECIMAL(19, 4) NOT NULL,
+        cogs_average DECIMAL(19, 4) NOT NULL,
+        cogs_fifo DECIMAL(19, 4) NOT NULL
+    );
+END
+GO
+
+-- Daily COGS rollup per product, so period reports never aggregate raw sales
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'cogs_daily')
+BEGIN
+    CREATE TABLE cogs_daily (
+        cost_date DATE NOT NULL,
+        product_id INT NOT NULL,
+        quantity_sold INT NOT NULL,
+        revenue DECIMAL(19, 4) NOT NULL,
+        cogs_average DECIMAL(19, 4) NOT NULL,
+        cogs_fifo DECIMAL(19, 4) NOT NULL,
+        PRIMARY KEY (cost_date, product_id)
+    );
+END
+GO
+
+-- Archived sales, moved out of the hot sale table by sp_archive_sales
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'sale_archive')
+BEGIN
+    CREATE TABLE sale_archive (
+        sale_id INT PRIMARY KEY,
+        product_id INT NOT NULL,
+        quantity INT NOT NULL,
+        sale_price DECIMAL(10, 2) NOT NULL,
+        sale_date DATETIME NOT NULL,
+        archived_at DATETIME2 NOT NULL DEFAULT SYSDATETIME()
+    );
+    
+    CREATE INDEX IX_sale_archive_sale_date ON sale_archive (sale_date) INCLUDE (product_id, quantity, sale_price);
+    CREATE INDEX IX_sale_archive_product ON sale_archive (product_id, sale_date);
+END
+GO
+
+-- Daily totals of archived sales, so all-time aggregates never read the archive
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'sale_rollup_daily')
+BEGIN
+    CREATE TABLE sale_rollup_daily (
+        sale_date DATE NOT NULL,
+        product_id INT NOT NULL,
+        sale_count INT NOT NULL,
+        quantity INT NOT NULL,
+        revenue DECIMAL(19, 2) NOT NULL,
+        PRIMARY KEY (sale_date, product_id)
+    );
+    
+    CREATE INDEX IX_sale_rollup_daily_product ON sale_rollup_daily (product_id) INCLUDE (quantity, revenue);
+END
+GO
+
+-- Sales before archived_before may be in sale_archive; later ones are always in sale
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'sale_archive_state')
+BEGIN
+    CREATE TABLE sale_archive_state (
+        state_id TINYINT PRIMARY KEY DEFAULT 1 CHECK (state_id = 1),
+        archived_before DATETIME NOT NULL,
+        last_run_at DATETIME2 NULL,
+        last_run_count INT NULL
+    );
+END
+GO
+
+-- Outbox of low-stock threshold crossings, written by trg_product_low_stock_alert
+-- and delivered after commit by the alert dispatcher (LowStockAlertService)
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'low_stock_alert')
+BEGIN
+    CREATE TABLE low_stock_alert (
+        alert_id BIGINT PRIMARY KEY IDENTITY(1,1),
+        product_id INT NOT NULL,
+        product_name VARCHAR(100) NOT NULL,
+        quantity INT NOT NULL,
+        reorder_level INT NOT NULL,
+        created_at DATETIME2 NOT NULL DEFAULT SYSDATETIME(),
+        attempts INT NOT NULL DEFAULT 0,
+        claimed_until DATETIME2 NULL,
+        dispatched_at DATETIME2 NULL,
+        last_error NVARCHAR(400) NULL
+    );
+    
+    CREATE INDEX IX_low_stock_alert_pending ON low_stock_alert (alert_id) 
+        INCLUDE (claimed_until) WHERE dispatched_at IS NULL;
+END
+GO
+
+-- Scheduled job history (JobSchedulerService); scheduled_for is the cron slot a run covers
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'job_run')
+BEGIN
+    CREATE TABLE job_run (
+        run_id BIGINT PRIMARY KEY IDENTITY(1,1),
+        job_name VARCHAR(50) NOT NULL,
+        scheduled_for DATETIME2 NOT NULL,
+        started_at DATETIME2 NOT NULL DEFAULT SYSDATETIME(),
+        finished_at DATETIME2 NULL,
+        duration_ms INT NULL,
+        status VARCHAR(20) NOT NULL DEFAULT 'running',
+        row_count INT NULL,
+        error NVARCHAR(4000) NULL,
+        worker VARCHAR(100) NULL
+    );
+    
+    CREATE INDEX IX_job_run_job ON job_run (job_name, run_id) INCLUDE (scheduled_for, status);
+END
+GO
+
+-- Latest precomputed result of each scheduled report, stored as JSON
+IF NOT EXISTS (SELECT * FROM sys.tables WHERE name = 'report_result')
+BEGIN
+    CREATE TABLE report_result (
+        report_name VARCHAR(50) PRIMARY KEY,
+        payload NVARCHAR(MAX) NOT NULL,
+        row_count INT NULL,
+        computed_at DATETIME2 NOT NULL,
+        duration_ms INT NULL,
+        run_id BIGINT NULL
+    );
+END
+GO
@@ -34,49 +34,39 @@ AS
 BEGIN
     SET NOCOUNT ON;
     
-    -- Update product quantity
-    UPDATE p
-    SET p.quantity = p.quantity - i.quantity,
-        p.updated_at = GETDATE()
-    FROM product p
-    INNER JOIN inserted i ON p.product_id = i.product_id;
-    
-    -- Check for low stock after sale
-    DECLARE @low_stock_products TABLE (
-        product_id INT,
-        product_name VARCHAR(100),
-        current_quantity INT,
-        reorder_level INT
-    );
-    
-    INSERT INTO @low_stock_products
-    SELECT p.product_id, p.name, p.quantity, p.reorder_level
-    FROM product p
-    INNER JOIN inserted i ON p.product_id = i.product_id
-    WHERE p.quantity <= p.reorder_level;
-    
-    -- Here you could send alerts or log low stock status
-    -- For demonstration, we'll just print messages
-    DECLARE @product_id INT, @product_name VARCHAR(100), @quantity INT, @reorder_level INT;
-    
-    DECLARE low_stock_cursor CURSOR FOR
-    SELECT product_id, product_name, current_quantity, reorder_level
-    FROM @low_stock_products;
-    
-    OPEN low_stock_cursor;
-    
-    FETCH NEXT FROM low_stock_cursor INTO @product_id, @product_name, @quantity, @reorder_level;
-    
-    WHILE @@FETCH_STATUS = 0
+    -- Update product quantity (aggregated so multi-row inserts for one product all count).
+    -- sp_make_sale reserves stock itself with a conditional UPDATE and flags it in the session.
+    IF ISNULL(CAST(SESSION_CONTEXT(N'stock_reserved') AS INT), 0) = 0
     BEGIN
-        PRINT 'LOW STOCK ALERT: Product ' + @product_name + ' is low on stock. Current quantity: ' + 
-              CAST(@quantity AS VARCHAR) + ', Reorder level: ' + CAST(@reorder_level AS VARCHAR);
-        
-        FETCH NEXT FROM low_stock_cursor INTO @product_id, @product_name, @quantity, @reorder_level;
+        UPDATE p
+        SET p.quantity = p.quantity - i.quantity,
+            p.updated_at = GETDATE()
+        FROM product p
+        INNER JOIN (
+            SELECT product_id, SUM(quantity) AS quantity
+            FROM inserted
+            GROUP BY product_id
+        ) i ON p.product_id = i.product_id;
     END;
     
-    CLOSE low_stock_cursor;
-    DEALLOCATE low_stock_cursor;
+    -- One ledger movement per sale, referencing its sale_id. The product rows are
+    -- locked by now, so movement ids stay in commit order for each product.
+    -- trg_product_stock_ledger skips sale decrements to avoid counting them twice.
+    INSERT INTO stock_movement (product_id, movement_type, quantity_change, reference_id)
+    SELECT product_id, 'sale', -quantity, sale_id
+    FROM inserted;
+    
+    -- Cost the sales (FIFO layers and weighted average) and add them to COGS
+    DECLARE @valuation dbo.StockValuationType;
+    
+    INSERT INTO @valuation (line_no, product_id, quantity_change, movement_type, reference_id, sale_id, sale_price, movement_date)
+    SELECT sale_id, product_id, -quantity, 'sale', sale_id, sale_id, sale_price, sale_date
+    FROM inserted;
+    
+    EXEC sp_apply_stock_valuation @valuation;
+    
+    -- Low-stock alerts are queued by trg_product_low_stock_alert when the
+    -- stock update crosses the reorder level and delivered after commit
 END;
 GO
 
@@ -101,3 +91,124 @@ BEGIN
     END;
 END;
 GO
+
+-- Triggers to record deletions for the change feed
+IF EXISTS (SELECT * FROM sys.triggers WHERE name = 'trg_product_track_delete')
+    DROP TRIGGER trg_product_track_delete;
+GO
+
+CREATE TRIGGER trg_product_track_delete
+ON product
+AFTER DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    INSERT INTO change_tombstone (entity_type, entity_id)
+    SELECT 'product', d.product_id
+    FROM deleted d;
+END;
+GO
+
+IF EXISTS (SELECT * FROM sys.triggers WHERE name = 'trg_category_track_delete')
+    DROP TRIGGER trg_category_track_delete;
+GO
+
+CREATE TRIGGER trg_category_track_delete
+ON category
+AFTER DELETE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    INSERT INTO change_tombstone (entity_type, entity_id)
+    SELECT 'category', d.category_id
+    FROM deleted d;
+END;
+GO
+
+-- Trigger to record every other stock change in the movement ledger
+IF EXISTS (SELECT * FROM sys.triggers WHERE name = 'trg_product_stock_ledger')
+    DROP TRIGGER trg_product_stock_ledger;
+GO
+
+CREATE TRIGGER trg_product_stock_ledger
+ON product
+AFTER INSERT, UPDATE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    IF NOT UPDATE(quantity)
+        RETURN;
+    
+    -- Sale decrements are recorded per sale by trg_update_stock_on_sale
+    IF ISNULL(CAST(SESSION_CONTEXT(N'stock_reserved') AS INT), 0) = 1
+       OR TRIGGER_NESTLEVEL(OBJECT_ID('trg_update_stock_on_sale'), 'AFTER', 'DML') > 0
+        RETURN;
+    
+    -- Procedures name the movement through the session context; anything else is a manual edit
+    DECLARE @valuation dbo.StockValuationType;
+    DECLARE @now DATETIME2 = SYSDATETIME();
+    
+    INSERT INTO @valuation (line_no, product_id, quantity_change, unit_cost, movement_type, reference_id, movement_date)
+    SELECT 
+        m.product_id,
+        m.product_id,
+        m.quantity_change,
+        -- Purchases set base_price to the purchase price in the same UPDATE.
+        -- Other receipts come in at the average cost, or base_price before there is one.
+        CASE WHEN m.movement_type IN ('purchase', 'opening') OR ISNULL(v.average_cost, 0) = 0 THEN m.base_price END,
+        m.movement_type,
+        m.reference_id,
+        @now
+    FROM (
+        SELECT 
+            i.product_id,
+            i.base_price,
+            i.quantity - ISNULL(d.quantity, 0) AS quantity_change,
+            ISNULL(
+                CAST(SESSION_CONTEXT(N'stock_movement_type') AS VARCHAR(20)),
+                CASE WHEN d.product_id IS NULL THEN 'opening' ELSE 'manual' END
+            ) AS movement_type,
+            CAST(SESSION_CONTEXT(N'stock_movement_ref') AS INT) AS reference_id
+        FROM inserted i
+        LEFT JOIN deleted d ON d.product_id = i.product_id
+        WHERE i.quantity <> ISNULL(d.quantity, 0)
+    ) m
+    LEFT JOIN product_valuation v ON v.product_id = m.product_id;
+    
+    INSERT INTO stock_movement (product_id, movement_type, quantity_change, reference_id, movement_date)
+    SELECT product_id, movement_type, quantity_change, reference_id, movement_date
+    FROM @valuation;
+    
+    EXEC sp_apply_stock_valuation @valuation;
+END;
+GO
+
+-- Trigger to queue a low-stock alert when a product's stock falls to its reorder level
+IF EXISTS (SELECT * FROM sys.triggers WHERE name = 'trg_product_low_stock_alert')
+    DROP TRIGGER trg_product_low_stock_alert;
+GO
+
+CREATE TRIGGER trg_product_low_stock_alert
+ON product
+AFTER UPDATE
+AS
+BEGIN
+    SET NOCOUNT ON;
+    
+    IF NOT (UPDATE(quantity) OR UPDATE(reorder_level))
+        RETURN;
+    
+    -- One outbox row per crossing from above the reorder level to at or below it,
+    -- whichever path lowered the stock (sales, reservations, adjustments, edits).
+    -- Products already low stay quiet until they are restocked above the level.
+    INSERT INTO low_stock_alert (product_id, product_name, quantity, reorder_level)
+    SELECT i.product_id, i.name, i.quantity, i.reorder_level
+    FROM inserted i
+    JOIN deleted d ON d.product_id = i.product_id
+    WHERE i.quantity <= i.reorder_level
+      AND d.quantity > d.reorder_level;
+END;
+GO
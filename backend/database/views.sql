@@ -24,6 +24,27 @@ WHERE
     p.quantity <= p.reorder_level;
 GO
 
+-- View for all-time sales totals per product: hot sales plus the archived rollup
+IF EXISTS (SELECT * FROM sys.views WHERE name = 'view_product_sales_totals')
+    DROP VIEW view_product_sales_totals;
+GO
+
+CREATE VIEW view_product_sales_totals AS
+SELECT 
+    t.product_id,
+    SUM(t.quantity) AS total_quantity_sold,
+    SUM(t.sales_value) AS total_sales_value
+FROM (
+    SELECT product_id, quantity, quantity * sale_price AS sales_value
+    FROM sale
+    UNION ALL
+    SELECT product_id, quantity, revenue
+    FROM sale_rollup_daily
+) t
+GROUP BY 
+    t.product_id;
+GO
+
 -- View for top selling products
 IF EXISTS (SELECT * FROM sys.views WHERE name = 'view_top_selling_products')
     DROP VIEW view_top_selling_products;
@@ -34,18 +55,16 @@ SELECT TOP 100
     p.product_id,
     p.name AS product_name,
     c.name AS category_name,
-    SUM(s.quantity) AS total_quantity_sold,
-    SUM(s.quantity * s.sale_price) AS total_sales_value
+    t.total_quantity_sold,
+    t.total_sales_value
 FROM 
     product p
 JOIN 
     category c ON p.category_id = c.category_id
 JOIN 
-    sale s ON p.product_id = s.product_id
-GROUP BY 
-    p.product_id, p.name, c.name
+    view_product_sales_totals t ON p.product_id = t.product_id
 ORDER BY 
-    total_quantity_sold DESC;
+    t.total_quantity_sold DESC;
 GO
 
 -- View for inventory summary
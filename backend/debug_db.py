@@ -1,35 +1,7 @@
 """
 Debug script to check database views and low stock products
 """
-import pyodbc
-import config
-
-def get_db_connection():
-    """Create a connection to the database"""
-    # Connect to SQL Server with Windows Authentication or credentials
-    if config.DB_TRUSTED_CONNECTION:
-        conn_str = (
-            f"DRIVER={{{config.DB_DRIVER}}};"
-            f"SERVER={config.DB_SERVER};"
-            f"DATABASE={config.DB_NAME};"
-            f"Trusted_Connection=yes;"
-        )
-    else:
-        conn_str = (
-            f"DRIVER={{{config.DB_DRIVER}}};"
-            f"SERVER={config.DB_SERVER};"
-            f"DATABASE={config.DB_NAME};"
-            f"UID={config.DB_USER};"
-            f"PWD={config.DB_PASSWORD};"
-        )
-    
-    try:
-        conn = pyodbc.connect(conn_str)
-        conn.autocommit = True
-        return conn
-    except pyodbc.Error as e:
-        print(f"Database connection error: {str(e)}")
-        raise
+from utils.db_helper import get_db_connection
 
 def execute_query(conn, query, params=None, one=False):
     """Execute SQL query and return results as dictionaries"""
@@ -0,0 +1,42 @@
+"""
+Bulk import products and opening stock from a CSV file
+
+Usage:
+    python import_products.py products.csv [--create-categories] [--batch-size 5000]
+
+Columns: name, category (or category_id), and optionally price, quantity,
+reorder_level and profit_percentage.
+"""
+import argparse
+import json
+from utils.db_helper import get_db_connection
+from services.product_import_service import ProductImportService
+
+
+def main():
+    """Import the CSV file and print the row-level report"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('csv_file')
+    parser.add_argument('--create-categories', action='store_true', help='Create categories that do not exist yet')
+    parser.add_argument('--batch-size', type=int, help='Rows per insert batch and transaction')
+    args = parser.parse_args()
+
+    conn = get_db_connection()
+    try:
+        with open(args.csv_file, 'rb') as csv_file:
+            report = ProductImportService.import_csv(
+                conn, csv_file,
+                create_categories=args.create_categories,
+                batch_size=args.batch_size
+            )
+    finally:
+        conn.close()
+
+    print(f"Imported {report['imported']} of {report['total_rows']} rows "
+          f"({report['failed']} failed) in {report['elapsed_ms'] / 1000:.1f} s")
+    if report['errors']:
+        print(json.dumps(report['errors'], indent=2))
+
+
+if __name__ == '__main__':
+    main()
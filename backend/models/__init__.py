@@ -1,36 +1,189 @@
 """
 Database models initialization
 """
+import time
 from flask import g
+from utils.profiler import record_db_time
+from utils.db_retry import run_with_retry
+from utils.deadline import DeadlineExceeded, get_statement_timeout, is_timeout_error, mark_deadline_exceeded
+from utils.replica import drop_replica_connection, get_read_connection, mark_primary_write
+import config
 
-def query_db(query, args=(), one=False, timeout=None):
-    """Execute a query and return the results"""
-    cursor = g.db.cursor()
-    
-    # We now ignore the timeout parameter to avoid SQL syntax issues
-    # and rely on the database's default timeout settings
+# Session context keys the write procedures set for the stock triggers
+SESSION_FLAGS = ('stock_reserved', 'stock_movement_type', 'stock_movement_ref')
+
+def _reset_after_timeout(conn):
+    """
+    Roll back and clear the session flags a cancelled statement left behind
+
+    A query timeout aborts the batch without running the procedure's CATCH
+    block, so an open transaction (and its row locks) or a stock_reserved flag
+    could otherwise follow the connection into later statements and back into
+    the pool.
+    """
     try:
+        conn.timeout = 0
+        conn.execute("IF @@TRANCOUNT > 0 ROLLBACK TRANSACTION;\n" + "\n".join(
+            f"EXEC sp_set_session_context @key = N'{key}', @value = NULL;" for key in SESSION_FLAGS
+        ))
+    except Exception as e:
+        print(f"Could not reset connection after a query timeout: {str(e)}")
+
+def _raise_if_timeout(error, conn):
+    """Translate an ODBC query timeout into DeadlineExceeded, cleaning up the connection first"""
+    if is_timeout_error(error):
+        _reset_after_timeout(conn)
+        mark_deadline_exceeded()
+        raise DeadlineExceeded("Query cancelled at the request deadline") from error
+
+def _is_connection_error(error):
+    """Check whether a database error means the connection itself failed (SQLSTATE 08xxx)"""
+    args = getattr(error, 'args', None)
+    return bool(args) and str(args[0]).startswith('08')
+
+def query_db(query, args=(), one=False, timeout=None, columnar=False, snapshot=False, retry=False, replica=False):
+    """
+    Execute a query and return the results
+
+    Rows are returned as dictionaries, or with columnar=True as a single
+    {"columns": [...], "rows": [[...]]} mapping that shares one header
+    across all rows, which is much cheaper to build and serialize for large lists.
+
+    snapshot=True runs the query under SNAPSHOT isolation so long analytics
+    reads neither block nor are blocked by sale/purchase transactions.
+    retry=True retries deadlocks and lock timeouts (for procedures that write).
+    replica=True sends an analytics read to a read replica when one is
+    configured, healthy and not lagging, unless this request has already written.
+    """
+    if retry:
+        mark_primary_write()
+        return run_with_retry(lambda: query_db(query, args, one, timeout, columnar, snapshot))
+
+    if replica:
+        conn, server = get_read_connection()
+        if server is not None:
+            try:
+                return _run_query(conn, query, args, one, timeout, columnar, snapshot)
+            except Exception as e:
+                if not _is_connection_error(e):
+                    raise
+                # The replica went away mid-request: drop it and answer from the primary
+                drop_replica_connection(server)
+    return _run_query(g.db, query, args, one, timeout, columnar, snapshot)
+
+def _run_query(conn, query, args, one, timeout, columnar, snapshot):
+    """Run one query on the given connection and build its rows"""
+    snapshot = snapshot and config.SNAPSHOT_READS_ENABLED
+
+    # The ODBC query timeout is bounded by the request deadline; when it expires
+    # the driver cancels the statement on the server
+    conn.timeout = get_statement_timeout(timeout)
+    cursor = conn.cursor()
+
+    try:
+        started = time.perf_counter()
         # Execute the actual query
-        cursor.execute(query, args)
+        if snapshot:
+            cursor.execute("SET TRANSACTION ISOLATION LEVEL SNAPSHOT;\n" + query, args)
+        else:
+            cursor.execute(query, args)
         if cursor.description:  # Check if query returns results
-            rv = [dict(zip([column[0] for column in cursor.description], row)) 
-                for row in cursor.fetchall()]
+            columns = [column[0] for column in cursor.description]
+            rows = cursor.fetchall()
+            fetched = time.perf_counter()
+            if columnar:
+                rv = {"columns": columns, "rows": [tuple(row) for row in rows]}
+            else:
+                rv = [dict(zip(columns, row)) for row in rows]
         else:
-            rv = []
+            fetched = time.perf_counter()
+            rv = {"columns": [], "rows": []} if columnar else []
+        record_db_time(fetched - started, time.perf_counter() - fetched)
     except Exception as e:
+        _raise_if_timeout(e, conn)
+        raise
+    finally:
         cursor.close()
-        raise e
-    cursor.close()
+        if snapshot:
+            # The isolation level sticks to the connection; restore it for later writes
+            conn.execute("SET TRANSACTION ISOLATION LEVEL READ COMMITTED")
+    if columnar:
+        return rv
     return (rv[0] if rv else None) if one else rv
 
+def stream_db(query, args=(), chunk_size=None, snapshot=False, replica=False):
+    """
+    Execute a query and stream its rows in fixed-size chunks
+
+    The statement runs straight away, so errors surface before a response has
+    started. Rows are then fetched with fetchmany as the generator is consumed,
+    so memory stays constant however many rows the query returns. With
+    replica=True, a replica whose connection fails before the first row is
+    fetched is dropped and the query runs on the primary instead.
+
+    Returns:
+        tuple: (column names, generator yielding lists of row tuples)
+    """
+    chunk_size = chunk_size or config.EXPORT_CHUNK_SIZE
+    snapshot = snapshot and config.SNAPSHOT_READS_ENABLED
+
+    if replica:
+        conn, server = get_read_connection()
+        if server is not None:
+            try:
+                return _start_stream(conn, query, args, chunk_size, snapshot)
+            except Exception as e:
+                if not _is_connection_error(e):
+                    raise
+                drop_replica_connection(server)
+    return _start_stream(g.db, query, args, chunk_size, snapshot)
+
+def _start_stream(conn, query, args, chunk_size, snapshot):
+    """Run the query on the given connection and return its columns and chunk generator"""
+    conn.timeout = get_statement_timeout()
+    cursor = conn.cursor()
+    try:
+        if snapshot:
+            cursor.execute("SET TRANSACTION ISOLATION LEVEL SNAPSHOT;\n" + query, args)
+        else:
+            cursor.execute(query, args)
+    except Exception as e:
+        cursor.close()
+        _raise_if_timeout(e, conn)
+        raise
+    columns = [column[0] for column in cursor.description]
+
+    def chunks():
+        try:
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield [tuple(row) for row in rows]
+        finally:
+            cursor.close()
+            if snapshot:
+                conn.execute("SET TRANSACTION ISOLATION LEVEL READ COMMITTED")
+
+    return columns, chunks()
+
 def execute_db(query, args=(), timeout=None):
-    """Execute a query without returning results"""
+    """Execute a query without returning results, retrying deadlocks and lock timeouts"""
+    mark_primary_write()
+    return run_with_retry(lambda: _execute_once(query, args, timeout))
+
+def _execute_once(query, args, timeout=None):
+    """Execute a single write attempt and return the last identity value"""
+    g.db.timeout = get_statement_timeout(timeout)
     cursor = g.db.cursor()
     try:
+        started = time.perf_counter()
         cursor.execute(query, args)
         last_id = cursor.execute("SELECT @@IDENTITY").fetchval()
+        record_db_time(time.perf_counter() - started)
     except Exception as e:
         cursor.close()
+        _raise_if_timeout(e, g.db)
         raise e
     cursor.close()
     return last_id
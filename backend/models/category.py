@@ -2,6 +2,18 @@
 Category model for the Inventory Management System
 """
 from models import query_db, execute_db
+from models.product import Product
+
+# Selectable category fields: name -> SELECT expression
+CATEGORY_FIELDS = {
+    'category_id': "c.category_id",
+    'name': "c.name",
+    'description': "c.description",
+    'product_count': "(SELECT COUNT(*) FROM product WHERE category_id = c.category_id) AS product_count"
+}
+
+# Returned by GET /api/categories/<id> unless ?fields= asks for product_count
+CATEGORY_DEFAULT_FIELDS = ('category_id', 'name', 'description')
 
 class Category:
     """Category model class"""
@@ -25,17 +37,43 @@ class Category:
 
 
     @staticmethod
-    def get_by_id(category_id):
-        """Get a category by ID"""
-        return query_db("""
+    def get_by_id(category_id, fields=None):
+        """
+        Get a category by ID
+
+        Args:
+            category_id: Category to read
+            fields: Names from CATEGORY_FIELDS to select (category_id is always
+                included); None selects all of them
+        """
+        wanted = CATEGORY_FIELDS.keys() if fields is None else set(fields) | {'category_id'}
+        select = ',\n                '.join(CATEGORY_FIELDS[name] for name in CATEGORY_FIELDS if name in wanted)
+        return query_db(f"""
+            SELECT 
+                {select}
+            FROM category c
+            WHERE c.category_id = ?
+        """, [category_id], True)
+
+
+
+    @staticmethod
+    def get_by_ids(category_ids):
+        """Get several categories by ID in one query (order is not preserved)"""
+        if not category_ids:
+            return []
+        placeholders = ', '.join('?' * len(category_ids))
+        return query_db(f"""
             SELECT 
                 c.category_id, 
                 c.name, 
                 c.description,
-                (SELECT COUNT(*) FROM product WHERE category_id = c.category_id) AS product_count
+                COUNT(p.product_id) AS product_count
             FROM category c
-            WHERE c.category_id = ?
-        """, [category_id], True)
+            LEFT JOIN product p ON c.category_id = p.category_id
+            WHERE c.category_id IN ({placeholders})
+            GROUP BY c.category_id, c.name, c.description
+        """, list(category_ids))
 
 
 
@@ -68,7 +106,7 @@ class Category:
             
         execute_db("""
             UPDATE category
-            SET name = ?, description = ?
+            SET name = ?, description = ?, updated_at = GETDATE()
             WHERE category_id = ?
         """, [name, description, category_id])
         return category_id
@@ -82,29 +120,24 @@ class Category:
         return category_id
     
     @staticmethod
-    def get_with_products(category_id):
-        """Get a category with its products"""
+    def get_with_products(category_id, query):
+        """
+        Get a category with its products
+
+        Args:
+            category_id: Category to read
+            query: Filters, sort and paging from utils.pagination.parse_catalog_query
+                (its category_id is replaced by this category)
+        """
         try:
             category = Category.get_by_id(category_id)
             if not category:
                 return None
             
-            products = query_db("""
-                SELECT 
-                    p.product_id, 
-                    p.name, 
-                    p.price, 
-                    p.quantity, 
-                    p.reorder_level,
-                    CASE 
-                        WHEN p.quantity <= p.reorder_level THEN 'Low Stock'
-                        WHEN p.quantity = 0 THEN 'Out of Stock'
-                        ELSE 'In Stock'
-                    END AS stock_status
-                FROM product p
-                WHERE p.category_id = ?
-                ORDER BY p.name
-            """, [category_id])
+            page = Product.get_catalog(dict(query, category_id=category_id))
+            products = page.pop('products')
+            if query['limit'] is not None:
+                category['pagination'] = dict(page, limit=query['limit'])
             
             category['products'] = products
             return category
@@ -0,0 +1,120 @@
+"""
+Change feed model for the Inventory Management System
+"""
+from models import query_db
+
+
+class ChangeFeed:
+    """Delta-sync change feed over product and category row versions"""
+
+    @staticmethod
+    def get_current_version():
+        """
+        Get the highest row version that is safe to hand out as a sync token
+
+        MIN_ACTIVE_ROWVERSION() is used instead of @@DBTS so rows written by
+        transactions that are still open are never skipped.
+        """
+        result = query_db("SELECT CAST(MIN_ACTIVE_ROWVERSION() AS BIGINT) - 1 AS version", one=True)
+        return result['version']
+
+    @staticmethod
+    def get_changed_products(since, upto, limit):
+        """Get products inserted or updated after a row version"""
+        return query_db("""
+            SELECT TOP (?)
+                p.product_id,
+                p.name,
+                p.price,
+                p.base_price,
+                p.quantity,
+                p.reorder_level,
+                p.profit_percentage,
+                c.name AS category_name,
+                c.category_id,
+                CASE
+                    WHEN p.quantity <= p.reorder_level THEN 'Low Stock'
+                    WHEN p.quantity = 0 THEN 'Out of Stock'
+                    ELSE 'In Stock'
+                END AS stock_status,
+                CAST(p.row_version AS BIGINT) AS version
+            FROM product p
+            JOIN category c ON p.category_id = c.category_id
+            WHERE p.row_version > CAST(CAST(? AS BIGINT) AS BINARY(8))
+              AND p.row_version <= CAST(CAST(? AS BIGINT) AS BINARY(8))
+            ORDER BY p.row_version
+        """, [limit, since, upto])
+
+    @staticmethod
+    def get_changed_categories(since, upto, limit):
+        """Get categories inserted or updated after a row version"""
+        return query_db("""
+            SELECT TOP (?)
+                c.category_id,
+                c.name,
+                c.description,
+                CAST(c.row_version AS BIGINT) AS version
+            FROM category c
+            WHERE c.row_version > CAST(CAST(? AS BIGINT) AS BINARY(8))
+              AND c.row_version <= CAST(CAST(? AS BIGINT) AS BINARY(8))
+            ORDER BY c.row_version
+        """, [limit, since, upto])
+
+    @staticmethod
+    def get_deletions(since, upto, limit):
+        """Get products and categories deleted after a row version"""
+        return query_db("""
+            SELECT TOP (?)
+                t.entity_type,
+                t.entity_id,
+                t.deleted_at,
+                CAST(t.row_version AS BIGINT) AS version
+            FROM change_tombstone t
+            WHERE t.row_version > CAST(CAST(? AS BIGINT) AS BINARY(8))
+              AND t.row_version <= CAST(CAST(? AS BIGINT) AS BINARY(8))
+            ORDER BY t.row_version
+        """, [limit, since, upto])
+
+    @staticmethod
+    def get_changes(since, limit):
+        """
+        Get everything that changed after a sync token
+
+        Args:
+            since: Token returned by a previous call (0 for a full snapshot)
+            limit: Maximum number of rows to return per entity stream
+
+        Returns:
+            dict: Changed products and categories, deletions, the next token
+                and whether more changes are waiting
+        """
+        upto = ChangeFeed.get_current_version()
+        streams = {
+            'products': ChangeFeed.get_changed_products(since, upto, limit + 1),
+            'categories': ChangeFeed.get_changed_categories(since, upto, limit + 1),
+            'deleted': ChangeFeed.get_deletions(since, upto, limit + 1)
+        }
+
+        # When a stream is truncated, cut every stream at the same version so
+        # the next token never skips rows from any of them
+        next_token = max(upto, since)
+        truncated = [rows[limit - 1]['version'] for rows in streams.values() if len(rows) > limit]
+        has_more = bool(truncated)
+        if has_more:
+            next_token = min(truncated)
+            streams = {
+                name: [row for row in rows if row['version'] <= next_token]
+                for name, rows in streams.items()
+            }
+
+        deleted = {'product': [], 'category': []}
+        for row in streams['deleted']:
+            deleted[row['entity_type']].append(row['entity_id'])
+
+        return {
+            'products': streams['products'],
+            'categories': streams['categories'],
+            'deleted': {'products': deleted['product'], 'categories': deleted['category']},
+            'next_token': str(next_token),
+            'has_more': has_more
+        }
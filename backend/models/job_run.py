@@ -0,0 +1,65 @@
+"""
+Scheduled job run history for the Inventory Management System
+"""
+from models import query_db, execute_db
+
+
+class JobRun:
+    """One row per run of a scheduled job"""
+
+    @staticmethod
+    def start(job_name, scheduled_for, worker):
+        """Record a run as started and return its run_id"""
+        result = query_db("""
+            SET NOCOUNT ON;
+            INSERT INTO job_run (job_name, scheduled_for, worker)
+            VALUES (?, ?, ?);
+            SELECT CAST(SCOPE_IDENTITY() AS BIGINT) AS run_id;
+        """, [job_name, scheduled_for, worker], True)
+        return int(result['run_id'])
+
+    @staticmethod
+    def finish(run_id, status, row_count=None, error=None):
+        """Record how a run ended"""
+        execute_db("""
+            UPDATE job_run
+            SET finished_at = SYSDATETIME(),
+                duration_ms = DATEDIFF(MILLISECOND, started_at, SYSDATETIME()),
+                status = ?,
+                row_count = ?,
+                error = ?
+            WHERE run_id = ?
+        """, [status, row_count, error[:4000] if error else None, run_id])
+
+    @staticmethod
+    def get_last_slot(job_name):
+        """Get the latest cron slot a successful run covered, or None"""
+        result = query_db("""
+            SELECT MAX(scheduled_for) AS scheduled_for
+            FROM job_run
+            WHERE job_name = ? AND status = 'succeeded'
+        """, [job_name], True)
+        return result['scheduled_for'] if result else None
+
+    @staticmethod
+    def get_latest():
+        """Get the most recent run of every job"""
+        return query_db("""
+            SELECT job_name, run_id, scheduled_for, started_at, finished_at, duration_ms, status, row_count, error, worker
+            FROM (
+                SELECT *, ROW_NUMBER() OVER (PARTITION BY job_name ORDER BY run_id DESC) AS position
+                FROM job_run
+            ) r
+            WHERE r.position = 1
+        """)
+
+    @staticmethod
+    def get_recent(job_name, limit=50):
+        """Get a job's most recent runs, newest first"""
+        return query_db("""
+            SELECT TOP (?)
+                run_id, scheduled_for, started_at, finished_at, duration_ms, status, row_count, error, worker
+            FROM job_run
+            WHERE job_name = ?
+            ORDER BY run_id DESC
+        """, [limit, job_name])
@@ -2,13 +2,60 @@
 Product model for the Inventory Management System
 """
 from models import query_db, execute_db
+from utils.pagination import next_cursor
+import config
+
+# stock_status filter -> condition (low_stock matches the 'Low Stock' label and view_low_stock)
+CATALOG_STOCK_FILTERS = {
+    'in_stock': "p.quantity > p.reorder_level",
+    'low_stock': "p.quantity <= p.reorder_level",
+    'out_of_stock': "p.quantity = 0"
+}
+
+# Selectable product fields: name -> (SELECT expression, join it needs)
+PRODUCT_FIELDS = {
+    'product_id': ("p.product_id", None),
+    'name': ("p.name", None),
+    'price': ("p.price", None),
+    'base_price': ("p.base_price", None),
+    'quantity': ("p.quantity", None),
+    'reorder_level': ("p.reorder_level", None),
+    'profit_percentage': ("p.profit_percentage", None),
+    'category_name': ("c.name AS category_name", 'category'),
+    'category_id': ("p.category_id", None),
+    'stock_status': ("""CASE 
+                    WHEN p.quantity <= p.reorder_level THEN 'Low Stock'
+                    WHEN p.quantity = 0 THEN 'Out of Stock'
+                    ELSE 'In Stock'
+                END AS stock_status""", None),
+    'total_sales': ("ISNULL((SELECT total_sales_value FROM view_product_sales_totals WHERE product_id = p.product_id), 0) AS total_sales", None),
+    'average_cost': ("v.average_cost", 'valuation'),
+    'fifo_unit_cost': ("CASE WHEN v.quantity > 0 THEN v.fifo_value / v.quantity ELSE v.average_cost END AS fifo_unit_cost", 'valuation'),
+    # Margin of the current price over the moving average cost
+    'profit_margin': ("""CASE 
+                    WHEN ISNULL(v.average_cost, 0) = 0 THEN 0
+                    ELSE (p.price - v.average_cost) / v.average_cost * 100
+                END AS profit_margin""", 'valuation')
+}
+
+PRODUCT_JOINS = {
+    'category': "JOIN category c ON p.category_id = c.category_id",
+    'valuation': "LEFT JOIN product_valuation v ON v.product_id = p.product_id"
+}
+
+# Returned by GET /api/products/<id> unless ?fields= asks for more; the
+# sales total and valuation fields need a subquery or join and are opt-in
+PRODUCT_DEFAULT_FIELDS = (
+    'product_id', 'name', 'price', 'base_price', 'quantity', 'reorder_level',
+    'profit_percentage', 'category_name', 'category_id', 'stock_status'
+)
 
 class Product:
     """Product model class"""
     
     @staticmethod
-    def get_all():
-        """Get all products with their categories"""
+    def get_all(columnar=False):
+        """Get all products with their categories, optionally as shared columns plus row lists"""
         return query_db("""
             SELECT 
                 p.product_id, 
@@ -28,12 +75,15 @@ class Product:
             FROM product p
             JOIN category c ON p.category_id = c.category_id
             ORDER BY p.name
-        """)
+        """, columnar=columnar)
     
     @staticmethod
-    def get_by_id(product_id):
-        """Get a product by ID"""
-        return query_db("""
+    def get_by_ids(product_ids):
+        """Get several products by ID in one query (order is not preserved)"""
+        if not product_ids:
+            return []
+        placeholders = ', '.join('?' * len(product_ids))
+        return query_db(f"""
             SELECT 
                 p.product_id, 
                 p.name, 
@@ -48,14 +98,172 @@ class Product:
                     WHEN p.quantity <= p.reorder_level THEN 'Low Stock'
                     WHEN p.quantity = 0 THEN 'Out of Stock'
                     ELSE 'In Stock'
-                END AS stock_status,
-                (SELECT ISNULL(SUM(quantity * sale_price), 0) FROM sale WHERE product_id = p.product_id) AS total_sales,
-                (SELECT CASE 
-                    WHEN AVG(purchase_price) IS NULL OR AVG(purchase_price) = 0 THEN 0
-                    ELSE ((SELECT AVG(sale_price) FROM sale WHERE product_id = p.product_id) - AVG(purchase_price)) / AVG(purchase_price) * 100
-                 END FROM purchase WHERE product_id = p.product_id) AS profit_margin
+                END AS stock_status
             FROM product p
             JOIN category c ON p.category_id = c.category_id
+            WHERE p.product_id IN ({placeholders})
+        """, list(product_ids))
+    
+    @staticmethod
+    def get_catalog(query, columnar=False):
+        """
+        Get a filtered, sorted and optionally keyset-paginated slice of the catalog
+
+        Args:
+            query: Options from utils.pagination.parse_catalog_query
+            columnar: Return shared columns plus row lists
+
+        Returns:
+            dict: products, plus next_cursor, total_estimate and total_is_exact
+            when paging (the estimate is only computed for the first page)
+        """
+        conditions, args = Product._catalog_conditions(query)
+        sort_column = f"p.{query['sort']}"
+        direction = 'ASC' if query['order'] == 'asc' else 'DESC'
+        order_by = f"{sort_column} {direction}"
+        if query['sort'] != 'product_id':
+            order_by += f", p.product_id {direction}"
+
+        page_conditions, page_args = list(conditions), list(args)
+        if query['after'] is not None:
+            # Keyset: continue strictly after the last (sort value, product_id) seen
+            value, last_id = query['after']
+            op = '>' if query['order'] == 'asc' else '<'
+            if query['sort'] == 'product_id':
+                page_conditions.append(f"p.product_id {op} ?")
+                page_args.append(last_id)
+            else:
+                page_conditions.append(f"({sort_column} {op} ? OR ({sort_column} = ? AND p.product_id {op} ?))")
+                page_args.extend([value, value, last_id])
+
+        top = ""
+        if query['limit'] is not None:
+            # One extra row tells whether another page follows
+            top = "TOP (?)"
+            page_args.insert(0, query['limit'] + 1)
+        where = f"WHERE {' AND '.join(page_conditions)}" if page_conditions else ""
+        result = query_db(f"""
+            SELECT {top}
+                p.product_id, 
+                p.name, 
+                p.price, 
+                p.base_price,
+                p.quantity, 
+                p.reorder_level,
+                p.profit_percentage,
+                c.name AS category_name,
+                c.category_id,
+                CASE 
+                    WHEN p.quantity <= p.reorder_level THEN 'Low Stock'
+                    WHEN p.quantity = 0 THEN 'Out of Stock'
+                    ELSE 'In Stock'
+                END AS stock_status
+            FROM product p
+            JOIN category c ON p.category_id = c.category_id
+            {where}
+            ORDER BY {order_by}
+        """, page_args, columnar=columnar)
+        if query['limit'] is None:
+            return {'products': result}
+
+        rows = result['rows'] if columnar else result
+        page = {'next_cursor': None}
+        if len(rows) > query['limit']:
+            del rows[query['limit']:]
+            last = dict(zip(result['columns'], rows[-1])) if columnar else rows[-1]
+            page['next_cursor'] = next_cursor(query, last)
+        if query['after'] is None:
+            page['total_estimate'], page['total_is_exact'] = Product._estimate_catalog_count(conditions, args)
+        return {'products': result, **page}
+
+    @staticmethod
+    def _catalog_conditions(query):
+        """Build the WHERE conditions and arguments for catalog filters"""
+        conditions, args = [], []
+        if query['category_id'] is not None:
+            conditions.append("p.category_id = ?")
+            args.append(query['category_id'])
+        if query['stock_status'] is not None:
+            conditions.append(CATALOG_STOCK_FILTERS[query['stock_status']])
+        if query['min_price'] is not None:
+            conditions.append("p.price >= ?")
+            args.append(query['min_price'])
+        if query['max_price'] is not None:
+            conditions.append("p.price <= ?")
+            args.append(query['max_price'])
+        return conditions, args
+
+    @staticmethod
+    def _estimate_catalog_count(conditions, args):
+        """
+        Count the filtered catalog cheaply
+
+        Without filters the row count comes from the partition metadata. With
+        filters the count stops at CATALOG_COUNT_LIMIT rows.
+
+        Returns:
+            tuple: (count, whether the count is exact)
+        """
+        if not conditions:
+            result = query_db("""
+                SELECT SUM(rows) AS total
+                FROM sys.partitions
+                WHERE object_id = OBJECT_ID('product') AND index_id IN (0, 1)
+            """, one=True)
+            return int(result['total'] or 0), False
+        result = query_db(f"""
+            SELECT COUNT_BIG(*) AS total
+            FROM (
+                SELECT TOP (?) 1 AS found
+                FROM product p
+                WHERE {' AND '.join(conditions)}
+            ) t
+        """, [config.CATALOG_COUNT_LIMIT] + args, one=True)
+        total = int(result['total'])
+        return total, total < config.CATALOG_COUNT_LIMIT
+    
+    @staticmethod
+    def get_catalog_version():
+        """
+        Get a cheap change marker for the product catalog
+
+        Uses MAX(updated_at), maintained by trg_product_update_timestamp, plus row
+        counts so deletions are also detected, without running the catalog join.
+
+        Returns:
+            tuple: (version_key, last_modified)
+        """
+        marker = query_db("""
+            SELECT
+                (SELECT MAX(updated_at) FROM product) AS product_updated_at,
+                (SELECT COUNT(*) FROM product) AS product_count,
+                (SELECT MAX(updated_at) FROM category) AS category_updated_at,
+                (SELECT COUNT(*) FROM category) AS category_count
+        """, one=True)
+        timestamps = [t for t in (marker['product_updated_at'], marker['category_updated_at']) if t]
+        version_key = "{product_updated_at}|{product_count}|{category_updated_at}|{category_count}".format(**marker)
+        return version_key, max(timestamps) if timestamps else None
+
+    @staticmethod
+    def get_by_id(product_id, fields=None):
+        """
+        Get a product by ID
+
+        Args:
+            product_id: Product to read
+            fields: Names from PRODUCT_FIELDS to select (product_id is always
+                included); None selects all of them. Joins and subqueries that
+                no requested field needs are left out of the query.
+        """
+        wanted = PRODUCT_FIELDS.keys() if fields is None else set(fields) | {'product_id'}
+        columns = [PRODUCT_FIELDS[name] for name in PRODUCT_FIELDS if name in wanted]
+        select = ',\n                '.join(expression for expression, _ in columns)
+        joins = '\n            '.join(PRODUCT_JOINS[join] for join in PRODUCT_JOINS if any(needs == join for _, needs in columns))
+        return query_db(f"""
+            SELECT 
+                {select}
+            FROM product p
+            {joins}
             WHERE p.product_id = ?
         """, [product_id], True)
     
@@ -81,7 +289,7 @@ class Product:
                     p.quantity <= p.reorder_level
                 ORDER BY 
                     (p.reorder_level - p.quantity) DESC
-            """)
+            """, snapshot=True, replica=True)
             
             print(f"Low stock query returned {len(results) if results else 0} items")
             
@@ -102,16 +310,21 @@ class Product:
         # Calculate base price (price without profit)
         base_price = price / (1 + (profit_percentage / 100)) if price > 0 else 0
         
-        return execute_db("""
+        # SCOPE_IDENTITY rather than execute_db's @@IDENTITY: the stock ledger trigger
+        # inserts into stock_movement, which would change @@IDENTITY
+        result = query_db("""
+            SET NOCOUNT ON;
             INSERT INTO product (name, category_id, price, base_price, quantity, reorder_level, profit_percentage)
-            VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, [name, category_id, price, base_price, quantity, reorder_level, profit_percentage])
+            VALUES (?, ?, ?, ?, ?, ?, ?);
+            SELECT CAST(SCOPE_IDENTITY() AS INT) AS product_id;
+        """, [name, category_id, price, base_price, quantity, reorder_level, profit_percentage], True, retry=True)
+        return result['product_id'] if result else None
     @staticmethod
     def update(product_id, name, category_id, price=0, quantity=0, reorder_level=10, profit_percentage=None, base_price=None):
         """Update a product"""
         # Get existing product data if profit_percentage is not provided
         if profit_percentage is None:
-            product = Product.get_by_id(product_id)
+            product = Product.get_by_id(product_id, fields=('profit_percentage',))
             if product:
                 profit_percentage = product.get('profit_percentage', 30)
             else:
@@ -136,11 +349,100 @@ class Product:
         """, [name, category_id, price, base_price, quantity, reorder_level, profit_percentage, product_id])
         return product_id
         
+    @staticmethod
+    def reprice(filters, product_ids=None, profit_percentage=None, dry_run=False):
+        """
+        Recompute price and base_price for many products in one set-based UPDATE
+
+        base_price (cost) is kept, except that products with a price but no
+        base_price get one derived from their current margin, as Product.update
+        does. price becomes base_price plus the margin, rounded to cents.
+
+        Args:
+            filters: category_id, stock_status, min_price and max_price as in
+                utils.pagination.parse_catalog_query (None for no filter)
+            product_ids: Limit to these products
+            profit_percentage: New margin for every matched product; None keeps
+                each product's own margin and only recomputes its price
+            dry_run: Return the changes without writing them
+
+        Returns:
+            list: One row per product that changes, with old_ and new_ price,
+            base_price and profit_percentage
+        """
+        conditions, args = Product._catalog_conditions(filters)
+        if product_ids:
+            conditions.append(f"p.product_id IN ({', '.join('?' * len(product_ids))})")
+            args.extend(product_ids)
+        # Products the new values would leave untouched are skipped, so they
+        # keep their updated_at and stay out of the change feed
+        conditions.append("(n.price <> p.price OR b.base_price <> p.base_price OR m.profit_percentage <> p.profit_percentage)")
+        source = f"""
+            FROM product p
+            CROSS APPLY (SELECT ISNULL(CAST(? AS DECIMAL(10, 2)), p.profit_percentage) AS profit_percentage) m
+            CROSS APPLY (
+                SELECT CAST(CASE 
+                    WHEN p.base_price = 0 AND p.price > 0 THEN p.price / (1 + (p.profit_percentage / 100))
+                    ELSE p.base_price
+                END AS DECIMAL(10, 2)) AS base_price
+            ) b
+            CROSS APPLY (SELECT CAST(ROUND(b.base_price * (1 + (m.profit_percentage / 100)), 2) AS DECIMAL(10, 2)) AS price) n
+            WHERE {' AND '.join(conditions)}
+        """
+        args = [profit_percentage] + args
+
+        if dry_run:
+            return query_db(f"""
+                SELECT 
+                    p.product_id,
+                    p.name,
+                    p.price AS old_price,
+                    n.price AS new_price,
+                    p.base_price AS old_base_price,
+                    b.base_price AS new_base_price,
+                    p.profit_percentage AS old_profit_percentage,
+                    m.profit_percentage AS new_profit_percentage
+                {source}
+                ORDER BY p.product_id
+            """, args)
+
+        # product has triggers, so OUTPUT has to go through a table variable
+        return query_db(f"""
+            SET NOCOUNT ON;
+            DECLARE @changes TABLE (
+                product_id INT PRIMARY KEY,
+                name VARCHAR(100),
+                old_price DECIMAL(10, 2),
+                new_price DECIMAL(10, 2),
+                old_base_price DECIMAL(10, 2),
+                new_base_price DECIMAL(10, 2),
+                old_profit_percentage DECIMAL(10, 2),
+                new_profit_percentage DECIMAL(10, 2)
+            );
+            UPDATE p
+            SET p.price = n.price,
+                p.base_price = b.base_price,
+                p.profit_percentage = m.profit_percentage,
+                p.updated_at = GETDATE()
+            OUTPUT 
+                inserted.product_id, inserted.name,
+                deleted.price, inserted.price,
+                deleted.base_price, inserted.base_price,
+                deleted.profit_percentage, inserted.profit_percentage
+            INTO @changes
+            {source};
+            SELECT * FROM @changes ORDER BY product_id;
+        """, args, retry=True)
+    
     @staticmethod
     def check_product_references(product_id):
         """Check if a product has references in other tables"""
         purchase_refs = query_db("SELECT COUNT(*) AS count FROM purchase WHERE product_id = ?", [product_id], True)
-        sale_refs = query_db("SELECT COUNT(*) AS count FROM sale WHERE product_id = ?", [product_id], True)
+        sale_refs = query_db("""
+            SELECT
+                (SELECT COUNT(*) FROM sale WHERE product_id = ?)
+                + (SELECT COUNT(*) FROM sale_archive WHERE product_id = ?) AS count
+        """, [product_id, product_id], True)
         
         return {
             'purchase_count': purchase_refs['count'] if purchase_refs else 0,
@@ -167,15 +469,15 @@ class Product:
         """Get top selling products"""
         return query_db("""
             SELECT TOP (?) * FROM view_top_selling_products
-        """, [limit])
+        """, [limit], snapshot=True, replica=True)
     
     @staticmethod
     def get_inventory_summary():
         """Get inventory summary"""
-        total_value = query_db("SELECT SUM(quantity * price) AS total_value FROM product", one=True)
-        total_items = query_db("SELECT SUM(quantity) AS total_items FROM product", one=True)
-        products_count = query_db("SELECT COUNT(*) AS product_count FROM product", one=True)
-        low_stock_count = query_db("SELECT COUNT(*) AS low_stock_count FROM view_low_stock", one=True)
+        total_value = query_db("SELECT SUM(quantity * price) AS total_value FROM product", one=True, snapshot=True, replica=True)
+        total_items = query_db("SELECT SUM(quantity) AS total_items FROM product", one=True, snapshot=True, replica=True)
+        products_count = query_db("SELECT COUNT(*) AS product_count FROM product", one=True, snapshot=True, replica=True)
+        low_stock_count = query_db("SELECT COUNT(*) AS low_stock_count FROM view_low_stock", one=True, snapshot=True, replica=True)
         
         return {
             "total_value": total_value['total_value'] if total_value else 0,
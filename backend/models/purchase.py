@@ -1,15 +1,15 @@
 """
 Purchase model for the Inventory Management System
 """
-from models import query_db, execute_db
+from models import query_db, execute_db, stream_db
 import config
 
 class Purchase:
     """Purchase model class"""
     
     @staticmethod
-    def get_all():
-        """Get all purchases"""
+    def get_all(columnar=False):
+        """Get all purchases, optionally as shared columns plus row lists"""
         return query_db("""
             SELECT 
                 pu.purchase_id, 
@@ -23,7 +23,39 @@ class Purchase:
             FROM purchase pu
             JOIN product p ON pu.product_id = p.product_id
             ORDER BY pu.purchase_date DESC
-        """)
+        """, columnar=columnar)
+    
+    @staticmethod
+    def export(start, end, product_id=None, category_id=None, supplier=None):
+        """Stream purchases in [start, end), optionally for one product, category or supplier"""
+        conditions = ["pu.purchase_date >= ?", "pu.purchase_date < ?"]
+        args = [start, end]
+        if product_id is not None:
+            conditions.append("pu.product_id = ?")
+            args.append(product_id)
+        if category_id is not None:
+            conditions.append("p.category_id = ?")
+            args.append(category_id)
+        if supplier:
+            conditions.append("pu.supplier = ?")
+            args.append(supplier)
+        return stream_db(f"""
+            SELECT 
+                pu.purchase_id, 
+                pu.product_id, 
+                p.name AS product_name,
+                c.name AS category_name,
+                pu.quantity, 
+                pu.purchase_price,
+                pu.quantity * pu.purchase_price AS total_cost,
+                pu.supplier,
+                pu.purchase_date
+            FROM purchase pu
+            JOIN product p ON pu.product_id = p.product_id
+            JOIN category c ON p.category_id = c.category_id
+            WHERE {' AND '.join(conditions)}
+            ORDER BY pu.purchase_date, pu.purchase_id
+        """, args, snapshot=True, replica=True)
     
     @staticmethod
     def get_by_id(purchase_id):
@@ -46,9 +78,12 @@ class Purchase:
     @staticmethod
     def create(product_id, quantity, purchase_price, supplier=None):
         """Create a new purchase using stored procedure with price update based on product's profit percentage"""
-        return execute_db("""
+        # sp_add_purchase returns the new purchase_id itself; @@IDENTITY would point
+        # at the stock ledger row written by the product trigger
+        result = query_db("""
             EXEC sp_add_purchase ?, ?, ?, ?
-        """, [product_id, quantity, purchase_price, supplier])
+        """, [product_id, quantity, purchase_price, supplier], True, retry=True)
+        return int(result['purchase_id']) if result else None
     
     @staticmethod
     def get_by_product(product_id):
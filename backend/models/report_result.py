@@ -0,0 +1,40 @@
+"""
+Precomputed report results for the Inventory Management System
+"""
+from models import query_db, execute_db
+
+
+class ReportResult:
+    """Latest result of each scheduled report, kept as a JSON document"""
+
+    @staticmethod
+    def get(report_name):
+        """Get a report's stored JSON payload and when it was computed"""
+        return query_db("""
+            SELECT report_name, payload, row_count, computed_at, duration_ms
+            FROM report_result
+            WHERE report_name = ?
+        """, [report_name], True)
+
+    @staticmethod
+    def get_all():
+        """Get when each report was last computed (without the payloads)"""
+        return query_db("""
+            SELECT report_name, row_count, computed_at, duration_ms, run_id
+            FROM report_result
+            ORDER BY report_name
+        """)
+
+    @staticmethod
+    def save(report_name, payload, row_count, duration_ms, run_id):
+        """Replace a report's stored result"""
+        execute_db("""
+            MERGE report_result WITH (HOLDLOCK) AS target
+            USING (SELECT ? AS report_name) AS source
+            ON target.report_name = source.report_name
+            WHEN MATCHED THEN
+                UPDATE SET payload = ?, row_count = ?, computed_at = SYSDATETIME(), duration_ms = ?, run_id = ?
+            WHEN NOT MATCHED THEN
+                INSERT (report_name, payload, row_count, computed_at, duration_ms, run_id)
+                VALUES (?, ?, ?, SYSDATETIME(), ?, ?);
+        """, [report_name, payload, row_count, duration_ms, run_id, report_name, payload, row_count, duration_ms, run_id])
@@ -1,15 +1,54 @@
 """
 Sale model for the Inventory Management System
 """
-from models import query_db, execute_db
+from models import query_db, execute_db, stream_db
+
+# Hot and archived sales in [start, end). The archive branch only runs when the
+# range starts before the archive boundary; deciding in the same statement keeps
+# sales that sp_archive_sales is moving from being missed.
+SALES_IN_RANGE = """(
+    SELECT sale_id, product_id, quantity, sale_price, sale_date
+    FROM sale
+    WHERE sale_date >= ? AND sale_date < ?
+    UNION ALL
+    SELECT sale_id, product_id, quantity, sale_price, sale_date
+    FROM sale_archive
+    WHERE sale_date >= ? AND sale_date < ?
+      AND EXISTS (SELECT 1 FROM sale_archive_state WHERE archived_before > ?)
+)"""
+
+
+# Every hot and archived sale, for reads without a date range. The archive
+# branch is skipped until sp_archive_sales has run once.
+ALL_SALES = """(
+    SELECT sale_id, product_id, quantity, sale_price, sale_date
+    FROM sale
+    UNION ALL
+    SELECT sale_id, product_id, quantity, sale_price, sale_date
+    FROM sale_archive
+    WHERE EXISTS (SELECT 1 FROM sale_archive_state)
+)"""
+
+
+def _sales_in_range(start, end):
+    """Get the SALES_IN_RANGE source and its arguments"""
+    return SALES_IN_RANGE, [start, end, start, end, start]
+
 
 class Sale:
     """Sale model class"""
     
     @staticmethod
-    def get_all():
-        """Get all sales"""
-        return query_db("""
+    def get_all(columnar=False, start=None, end=None):
+        """
+        Get sales, optionally as shared columns plus row lists
+
+        Without a date range every sale is returned, archived ones included;
+        with [start, end) the archive is only read when the range reaches back
+        before the archive boundary.
+        """
+        source, args = (ALL_SALES, []) if start is None else _sales_in_range(start, end)
+        return query_db(f"""
             SELECT 
                 s.sale_id, 
                 s.product_id, 
@@ -18,10 +57,38 @@ class Sale:
                 s.sale_price,
                 s.quantity * s.sale_price AS total_amount,
                 s.sale_date
-            FROM sale s
+            FROM {source} s
             JOIN product p ON s.product_id = p.product_id
             ORDER BY s.sale_date DESC
-        """)
+        """, args, columnar=columnar)
+    
+    @staticmethod
+    def export(start, end, product_id=None, category_id=None):
+        """Stream sales in [start, end), optionally for one product or category"""
+        source, args = _sales_in_range(start, end)
+        conditions = []
+        if product_id is not None:
+            conditions.append("s.product_id = ?")
+            args.append(product_id)
+        if category_id is not None:
+            conditions.append("p.category_id = ?")
+            args.append(category_id)
+        return stream_db(f"""
+            SELECT 
+                s.sale_id, 
+                s.product_id, 
+                p.name AS product_name,
+                c.name AS category_name,
+                s.quantity, 
+                s.sale_price,
+                s.quantity * s.sale_price AS total_amount,
+                s.sale_date
+            FROM {source} s
+            JOIN product p ON s.product_id = p.product_id
+            JOIN category c ON p.category_id = c.category_id
+            {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+            ORDER BY s.sale_date, s.sale_id
+        """, args, snapshot=True, replica=True)
     
     @staticmethod
     def get_by_id(sale_id):
@@ -35,17 +102,45 @@ class Sale:
                 s.sale_price,
                 s.quantity * s.sale_price AS total_amount,
                 s.sale_date
-            FROM sale s
+            FROM (
+                SELECT sale_id, product_id, quantity, sale_price, sale_date FROM sale WHERE sale_id = ?
+                UNION ALL
+                SELECT sale_id, product_id, quantity, sale_price, sale_date FROM sale_archive WHERE sale_id = ?
+            ) s
+            JOIN product p ON s.product_id = p.product_id
+        """, [sale_id, sale_id], True)
+    
+    @staticmethod
+    def get_by_ids(sale_ids):
+        """Get several sales by ID in one query, archived ones included (order is not preserved)"""
+        if not sale_ids:
+            return []
+        placeholders = ', '.join('?' * len(sale_ids))
+        return query_db(f"""
+            SELECT 
+                s.sale_id, 
+                s.product_id, 
+                p.name AS product_name,
+                s.quantity, 
+                s.sale_price,
+                s.quantity * s.sale_price AS total_amount,
+                s.sale_date
+            FROM (
+                SELECT sale_id, product_id, quantity, sale_price, sale_date FROM sale WHERE sale_id IN ({placeholders})
+                UNION ALL
+                SELECT sale_id, product_id, quantity, sale_price, sale_date FROM sale_archive WHERE sale_id IN ({placeholders})
+            ) s
             JOIN product p ON s.product_id = p.product_id
-            WHERE s.sale_id = ?
-        """, [sale_id], True)
+        """, list(sale_ids) * 2)
     
     @staticmethod
     def create(product_id, quantity, sale_price):
         """Create a new sale using stored procedure"""
-        return execute_db("""
+        # sp_make_sale returns the new sale_id itself, so no @@IDENTITY round trip is needed
+        result = query_db("""
             EXEC sp_make_sale ?, ?, ?
-        """, [product_id, quantity, sale_price])
+        """, [product_id, quantity, sale_price], True, retry=True)
+        return int(result['sale_id']) if result else None
     
     @staticmethod
     def get_by_product(product_id):
@@ -66,23 +161,23 @@ class Sale:
         """Get top selling products"""
         return query_db("""
             SELECT TOP (?) * FROM view_top_selling_products
-        """, [limit])
+        """, [limit], snapshot=True, replica=True)
     @staticmethod
     def get_sales_by_category():
         """Get sales aggregated by category"""
         return query_db("""
             SELECT 
                 c.name AS category_name,
-                SUM(s.quantity) AS total_quantity_sold,
-                SUM(s.quantity * s.sale_price) AS total_sales
+                SUM(t.total_quantity_sold) AS total_quantity_sold,
+                SUM(t.total_sales_value) AS total_sales
             FROM 
-                sale s
+                view_product_sales_totals t
             JOIN 
-                product p ON s.product_id = p.product_id
+                product p ON t.product_id = p.product_id
             JOIN 
                 category c ON p.category_id = c.category_id
             GROUP BY 
                 c.name
             ORDER BY 
                 total_sales DESC
-        """)
+        """, snapshot=True, replica=True)
@@ -0,0 +1,42 @@
+"""
+Stock ledger model for the Inventory Management System
+"""
+from models import query_db
+
+
+class StockLedger:
+    """Append-only stock movements with periodic per-product snapshots"""
+
+    @staticmethod
+    def get_stock_as_of(as_of, product_id=None):
+        """
+        Get stock levels at a point in time
+
+        Reads the nearest snapshot at or before as_of plus the ledger movements
+        after it, so the cost depends on the snapshot interval rather than on
+        the full history.
+        """
+        return query_db("""
+            EXEC sp_get_stock_as_of ?, ?
+        """, [as_of, product_id], replica=True)
+
+    @staticmethod
+    def get_movements(product_id, limit=100):
+        """Get the most recent stock movements for a product"""
+        return query_db("""
+            SELECT TOP (?)
+                movement_id,
+                product_id,
+                movement_type,
+                quantity_change,
+                reference_id,
+                movement_date
+            FROM stock_movement
+            WHERE product_id = ?
+            ORDER BY movement_id DESC
+        """, [limit, product_id], replica=True)
+
+    @staticmethod
+    def take_snapshot():
+        """Snapshot every product with movements since its latest snapshot"""
+        return query_db("EXEC sp_take_stock_snapshot", one=True, retry=True)
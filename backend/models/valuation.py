@@ -0,0 +1,67 @@
+"""
+Inventory valuation model for the Inventory Management System
+"""
+from models import query_db
+
+COGS_GROUPINGS = {
+    'day': "d.cost_date",
+    'month': "DATEFROMPARTS(YEAR(d.cost_date), MONTH(d.cost_date), 1)"
+}
+
+
+class Valuation:
+    """Reads of the valuation state kept by sp_apply_stock_valuation"""
+
+    @staticmethod
+    def get_inventory_value():
+        """Get the total inventory value under both costing methods, overall and per category"""
+        by_category = query_db("""
+            SELECT
+                c.category_id,
+                c.name AS category_name,
+                SUM(v.quantity) AS quantity,
+                SUM(v.quantity * v.average_cost) AS average_cost_value,
+                SUM(v.fifo_value) AS fifo_value
+            FROM product_valuation v
+            JOIN product p ON p.product_id = v.product_id
+            JOIN category c ON c.category_id = p.category_id
+            GROUP BY c.category_id, c.name
+            ORDER BY c.name
+        """, snapshot=True, replica=True)
+        return {
+            'quantity': sum(row['quantity'] for row in by_category),
+            'average_cost_value': sum(row['average_cost_value'] for row in by_category),
+            'fifo_value': sum(row['fifo_value'] for row in by_category),
+            'by_category': by_category
+        }
+
+    @staticmethod
+    def get_cogs(start, end, group_by='day', product_id=None):
+        """
+        Get revenue and cost of goods sold per period from the daily rollup
+
+        Args:
+            start: First day (inclusive)
+            end: Day after the last day (exclusive)
+            group_by: 'day' or 'month'
+            product_id: Limit to one product
+        """
+        period = COGS_GROUPINGS[group_by]
+        conditions = ["d.cost_date >= ?", "d.cost_date < ?"]
+        args = [start.date(), end.date()]
+        if product_id is not None:
+            conditions.append("d.product_id = ?")
+            args.append(product_id)
+        return query_db(f"""
+            SELECT
+                {period} AS period,
+                SUM(d.quantity_sold) AS quantity_sold,
+                SUM(d.revenue) AS revenue,
+                SUM(d.cogs_average) AS cogs_average,
+                SUM(d.cogs_fifo) AS cogs_fifo,
+                SUM(d.revenue) - SUM(d.cogs_fifo) AS gross_profit_fifo
+            FROM cogs_daily d
+            WHERE {' AND '.join(conditions)}
+            GROUP BY {period}
+            ORDER BY period
+        """, args, snapshot=True, replica=True)
@@ -0,0 +1,237 @@
+"""
+Background job scheduler for the Inventory Management System
+"""
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+from flask import g
+from models import query_db
+from models.job_run import JobRun
+from models.report_result import ReportResult
+from models.stock_ledger import StockLedger
+from services.live_update_service import LiveUpdateService
+from utils.cron import CronSchedule
+from utils.db_helper import get_db_connection
+from utils.json_provider import dumps_bytes
+from utils import metrics
+import config
+
+
+def _dashboard():
+    """Dashboard sections shown on the reports page"""
+    return LiveUpdateService.compute_snapshot()
+
+
+def _stock_levels():
+    """Stock totals and health per category"""
+    return query_db("EXEC sp_generate_stock_level_report", snapshot=True, replica=True)
+
+
+def _product_performance():
+    """Sales ranks, velocity and stock efficiency per product"""
+    return query_db("EXEC sp_analyze_product_performance ?", [config.REPORT_LOOKBACK_DAYS], snapshot=True, replica=True)
+
+
+def _stock_forecast():
+    """Projected usage and days of stock left per product"""
+    return query_db("""
+        EXEC sp_forecast_stock_needs NULL, ?, ?
+    """, [config.REPORT_FORECAST_DAYS, config.REPORT_LOOKBACK_DAYS], snapshot=True, replica=True)
+
+
+def _reorder_suggestions():
+    """Reorder points and quantities per product"""
+    return query_db("""
+        EXEC sp_generate_reorder_suggestions ?, ?
+    """, [config.REPORT_LOOKBACK_DAYS, config.REPORT_FORECAST_DAYS], snapshot=True, replica=True)
+
+
+def _stock_snapshot():
+    """Ledger snapshot for as-of stock queries"""
+    return StockLedger.take_snapshot()
+
+
+# Job name -> (schedule, task, whether the task's result is stored as a report)
+JOBS = {
+    'dashboard': (CronSchedule(config.JOB_DASHBOARD_SCHEDULE), _dashboard, True),
+    'stock_levels': (CronSchedule(config.JOB_STOCK_LEVELS_SCHEDULE), _stock_levels, True),
+    'product_performance': (CronSchedule(config.JOB_PRODUCT_PERFORMANCE_SCHEDULE), _product_performance, True),
+    'stock_forecast': (CronSchedule(config.JOB_STOCK_FORECAST_SCHEDULE), _stock_forecast, True),
+    'reorder_suggestions': (CronSchedule(config.JOB_REORDER_SUGGESTIONS_SCHEDULE), _reorder_suggestions, True),
+    'stock_snapshot': (CronSchedule(config.JOB_STOCK_SNAPSHOT_SCHEDULE), _stock_snapshot, False)
+}
+
+REPORTS = tuple(name for name, (_, _, is_report) in JOBS.items() if is_report)
+
+
+class JobSchedulerService:
+    """
+    Runs reports and maintenance on cron schedules and keeps their results
+
+    Every app process runs a scheduler thread. When a job's next cron slot
+    has passed, the scheduler takes a session-owned sp_getapplock on the
+    job's name without waiting. If another process holds it, that process is
+    already running the job. Otherwise the scheduler checks job_run, in case
+    another process has already covered the slot. Only then does it run the
+    job, so each slot runs once across all workers. After downtime, one run
+    catches up on the missed slots rather than replaying each of them.
+    Report results are stored in report_result as JSON, and pages read them
+    without running the underlying queries.
+    """
+    _app = None
+    _worker = None
+    _lock = threading.Lock()
+    _conn = None
+    _last_slots = {}
+    _worker_name = f"{socket.gethostname()}:{os.getpid()}"[:100]
+
+    @staticmethod
+    def start(app):
+        """Start the scheduler thread once per process"""
+        with JobSchedulerService._lock:
+            if JobSchedulerService._worker is not None:
+                return
+            JobSchedulerService._app = app
+            JobSchedulerService._worker = threading.Thread(target=JobSchedulerService._run, daemon=True)
+            JobSchedulerService._worker.start()
+
+    @staticmethod
+    def run_job(name, scheduled_for=None):
+        """
+        Run a job now on g.db unless another worker is running it or has covered the slot
+
+        Args:
+            name: Key of JOBS
+            scheduled_for: Cron slot this run covers; None for an on-demand run
+
+        Returns:
+            dict: job and status: succeeded or failed (with run_id, row_count,
+            duration_ms or error), locked (another worker is running it) or
+            skipped (another worker already covered the slot)
+        """
+        _, task, is_report = JOBS[name]
+        if not JobSchedulerService._acquire(name):
+            return {'job': name, 'status': 'locked'}
+        try:
+            if scheduled_for is not None:
+                last_slot = JobRun.get_last_slot(name)
+                if last_slot is not None and last_slot >= scheduled_for:
+                    return {'job': name, 'status': 'skipped'}
+            slot = scheduled_for or datetime.now().replace(second=0, microsecond=0)
+            run_id = JobRun.start(name, slot, JobSchedulerService._worker_name)
+
+            started = time.perf_counter()
+            try:
+                result = task()
+                row_count = JobSchedulerService._count_rows(result)
+                if is_report:
+                    duration_ms = int((time.perf_counter() - started) * 1000)
+                    ReportResult.save(name, dumps_bytes(result).decode('utf-8'), row_count, duration_ms, run_id)
+            except Exception as e:
+                JobRun.finish(run_id, 'failed', error=str(e))
+                metrics.increment('job_failures', job=name)
+                return {'job': name, 'status': 'failed', 'run_id': run_id, 'error': str(e)}
+
+            JobRun.finish(run_id, 'succeeded', row_count)
+            elapsed = time.perf_counter() - started
+            metrics.observe('job_run_time', elapsed, job=name)
+            return {
+                'job': name,
+                'status': 'succeeded',
+                'run_id': run_id,
+                'row_count': row_count,
+                'duration_ms': int(elapsed * 1000)
+            }
+        finally:
+            JobSchedulerService._release(name)
+
+    @staticmethod
+    def get_jobs():
+        """Get every job with its schedule, next slot and latest run"""
+        now = datetime.now()
+        latest = {run['job_name']: run for run in JobRun.get_latest()}
+        return [
+            {
+                'job': name,
+                'schedule': schedule.expression,
+                'report': is_report,
+                'next_run': schedule.next_after(now),
+                'last_run': latest.get(name)
+            }
+            for name, (schedule, _, is_report) in JOBS.items()
+        ]
+
+    @staticmethod
+    def _count_rows(result):
+        """Rows in a task result: a row list, a dict of row lists, or a procedure's count row"""
+        if isinstance(result, list):
+            return len(result)
+        if isinstance(result, dict):
+            lists = [value for value in result.values() if isinstance(value, list)]
+            if lists:
+                return sum(len(value) for value in lists)
+            counts = [value for value in result.values() if isinstance(value, int)]
+            return counts[0] if counts else None
+        return None
+
+    @staticmethod
+    def _acquire(name):
+        """Take the job's application lock on this session without waiting"""
+        result = query_db("""
+            SET NOCOUNT ON;
+            DECLARE @result INT;
+            EXEC @result = sp_getapplock @Resource = ?, @LockMode = 'Exclusive', @LockOwner = 'Session', @LockTimeout = 0;
+            SELECT @result AS result;
+        """, [f"job:{name}"], True)
+        return result is not None and result['result'] >= 0
+
+    @staticmethod
+    def _release(name):
+        """Release the job's application lock"""
+        query_db("""
+            SET NOCOUNT ON;
+            DECLARE @result INT;
+            EXEC @result = sp_releaseapplock @Resource = ?, @LockOwner = 'Session';
+            SELECT @result AS result;
+        """, [f"job:{name}"], True)
+
+    @staticmethod
+    def _run_due_jobs():
+        """Run every job whose next cron slot has passed (app context with g.db set)"""
+        now = datetime.now()
+        for name, (schedule, _, _) in JOBS.items():
+            last = JobSchedulerService._last_slots.get(name)
+            if last is None:
+                last = JobRun.get_last_slot(name)
+            # A job that has never succeeded is due straight away
+            slot = schedule.latest_until(last, now) if last else now.replace(second=0, microsecond=0)
+            if slot is None:
+                JobSchedulerService._last_slots[name] = last
+                continue
+            # Remembered even when the run fails, so a failing job waits for its next slot
+            JobSchedulerService._last_slots[name] = slot
+            outcome = JobSchedulerService.run_job(name, slot)
+            if outcome['status'] == 'failed':
+                print(f"Job {name} failed: {outcome['error']}")
+
+    @staticmethod
+    def _run():
+        """Background worker loop"""
+        while True:
+            time.sleep(config.JOB_SCHEDULER_TICK)
+            try:
+                with JobSchedulerService._app.app_context():
+                    if JobSchedulerService._conn is None:
+                        JobSchedulerService._conn = get_db_connection()
+                    g.db = JobSchedulerService._conn
+                    JobSchedulerService._run_due_jobs()
+            except Exception as e:
+                print(f"Job scheduler error: {str(e)}")
+                # Drop the connection (and any session locks with it) and start fresh
+                try:
+                    JobSchedulerService._conn.close()
+                except Exception:
+                    pass
+                JobSchedulerService._conn = None
@@ -0,0 +1,190 @@
+"""
+Live dashboard update service for the Inventory Management System
+"""
+import queue
+import threading
+import time
+from flask import g, current_app
+from models.product import Product
+from models.sale import Sale
+from utils.db_helper import get_db_connection
+from utils.json_provider import dumps_bytes
+import config
+
+
+class SubscriberLimitReached(Exception):
+    """Raised when this process already serves LIVE_UPDATE_MAX_SUBSCRIBERS streams"""
+
+
+class LiveUpdateService:
+    """
+    Pushes dashboard changes to Server-Sent Events subscribers
+
+    Writes only mark the dashboard dirty. One background worker recomputes the
+    dashboard at most once per LIVE_UPDATE_MIN_INTERVAL, diffs it against the
+    previous snapshot and fans the same serialized delta out to every client,
+    so database load does not grow with the number of open dashboards.
+    """
+    _app = None
+    _worker = None
+    _lock = threading.Lock()
+    _dirty = threading.Event()
+    _subscribers = set()
+    _snapshot = None
+    _event_id = 0
+
+    @staticmethod
+    def start(app):
+        """Start the background worker once per process"""
+        with LiveUpdateService._lock:
+            if LiveUpdateService._worker is not None:
+                return
+            LiveUpdateService._app = app
+            LiveUpdateService._worker = threading.Thread(target=LiveUpdateService._run, daemon=True)
+            LiveUpdateService._worker.start()
+
+    @staticmethod
+    def notify_inventory_changed():
+        """Mark the dashboard as changed after a sale, purchase or product write"""
+        LiveUpdateService.start(current_app._get_current_object())
+        LiveUpdateService._dirty.set()
+
+    @staticmethod
+    def subscribe():
+        """
+        Register a new stream subscriber
+
+        Must be called inside a request so the first snapshot can be computed
+        on the request's connection if no snapshot exists yet.
+
+        Returns:
+            queue.Queue: Receives ready-to-send SSE messages
+
+        Raises:
+            SubscriberLimitReached: LIVE_UPDATE_MAX_SUBSCRIBERS streams are already open
+        """
+        if len(LiveUpdateService._subscribers) >= config.LIVE_UPDATE_MAX_SUBSCRIBERS:
+            raise SubscriberLimitReached("Too many open dashboard streams")
+        LiveUpdateService.start(current_app._get_current_object())
+        snapshot = LiveUpdateService._snapshot
+        if snapshot is None:
+            snapshot = LiveUpdateService.compute_snapshot()
+
+        subscriber = queue.Queue(maxsize=config.LIVE_UPDATE_QUEUE_SIZE)
+        with LiveUpdateService._lock:
+            # Checked again under the lock: the first check only avoids computing a snapshot
+            if len(LiveUpdateService._subscribers) >= config.LIVE_UPDATE_MAX_SUBSCRIBERS:
+                raise SubscriberLimitReached("Too many open dashboard streams")
+            if LiveUpdateService._snapshot is None:
+                LiveUpdateService._snapshot = snapshot
+            subscriber.put_nowait(LiveUpdateService._format('snapshot', LiveUpdateService._snapshot))
+            LiveUpdateService._subscribers.add(subscriber)
+        return subscriber
+
+    @staticmethod
+    def unsubscribe(subscriber):
+        """Remove a stream subscriber"""
+        with LiveUpdateService._lock:
+            LiveUpdateService._subscribers.discard(subscriber)
+
+    @staticmethod
+    def compute_snapshot():
+        """Compute the dashboard data pushed to clients"""
+        return {
+            'inventory_summary': Product.get_inventory_summary(),
+            'low_stock': Product.get_low_stock() or [],
+            'top_selling': Sale.get_top_selling_products(5) or [],
+            'sales_by_category': Sale.get_sales_by_category() or []
+        }
+
+    @staticmethod
+    def diff_snapshots(previous, current):
+        """
+        Compute the incremental update between two dashboard snapshots
+
+        Returns:
+            dict: Only the sections that changed; low stock is keyed by product
+                so unchanged rows are not resent
+        """
+        delta = {}
+
+        summary_changes = {
+            key: value for key, value in current['inventory_summary'].items()
+            if previous['inventory_summary'].get(key) != value
+        }
+        if summary_changes:
+            delta['inventory_summary'] = summary_changes
+
+        previous_low = {row['product_id']: row for row in previous['low_stock']}
+        current_low = {row['product_id']: row for row in current['low_stock']}
+        upserted = [row for pid, row in current_low.items() if previous_low.get(pid) != row]
+        removed = [pid for pid in previous_low if pid not in current_low]
+        if upserted or removed:
+            delta['low_stock'] = {'upserted': upserted, 'removed': removed}
+
+        # These are short ranked lists, so a changed list is sent whole
+        for key in ('top_selling', 'sales_by_category'):
+            if previous[key] != current[key]:
+                delta[key] = current[key]
+
+        return delta
+
+    @staticmethod
+    def _format(event, data):
+        """Serialize one SSE message"""
+        LiveUpdateService._event_id += 1
+        payload = dumps_bytes(data).decode('utf-8')
+        return f"id: {LiveUpdateService._event_id}\nevent: {event}\ndata: {payload}\n\n"
+
+    @staticmethod
+    def _broadcast(event, data):
+        """Send one serialized message to every subscriber"""
+        with LiveUpdateService._lock:
+            message = LiveUpdateService._format(event, data)
+            resync = None
+            for subscriber in LiveUpdateService._subscribers:
+                try:
+                    subscriber.put_nowait(message)
+                except queue.Full:
+                    # A slow client missed deltas; replace its backlog with a full snapshot
+                    if resync is None:
+                        resync = LiveUpdateService._format('snapshot', LiveUpdateService._snapshot)
+                    with subscriber.mutex:
+                        subscriber.queue.clear()
+                    subscriber.put_nowait(resync)
+
+    @staticmethod
+    def _run():
+        """Background worker: recompute and broadcast whenever the dashboard is dirty"""
+        while True:
+            LiveUpdateService._dirty.wait()
+            # Coalesce bursts of writes into one recomputation
+            time.sleep(config.LIVE_UPDATE_MIN_INTERVAL)
+            LiveUpdateService._dirty.clear()
+
+            with LiveUpdateService._lock:
+                if not LiveUpdateService._subscribers:
+                    # Nobody is listening; the next subscriber computes a fresh snapshot
+                    LiveUpdateService._snapshot = None
+                    continue
+
+            try:
+                with LiveUpdateService._app.app_context():
+                    g.db = get_db_connection()
+                    try:
+                        current = LiveUpdateService.compute_snapshot()
+                    finally:
+                        g.db.close()
+            except Exception as e:
+                print(f"Live update error: {str(e)}")
+                continue
+
+            previous = LiveUpdateService._snapshot
+            LiveUpdateService._snapshot = current
+            if previous is None:
+                LiveUpdateService._broadcast('snapshot', current)
+                continue
+
+            delta = LiveUpdateService.diff_snapshots(previous, current)
+            if delta:
+                LiveUpdateService._broadcast('delta', delta)
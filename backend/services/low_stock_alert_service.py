@@ -0,0 +1,159 @@
+"""
+Low-stock alert dispatcher for the Inventory Management System
+"""
+import threading
+import time
+import urllib.request
+from utils.db_helper import get_db_connection
+from utils.json_provider import dumps_bytes
+from utils import metrics
+import config
+
+
+class LowStockAlertService:
+    """
+    Delivers low-stock alerts from the low_stock_alert outbox
+
+    trg_product_low_stock_alert inserts one outbox row per threshold crossing
+    inside the transaction that lowered the stock, so sales only pay for a
+    set-based insert. A background worker in each app process claims pending
+    rows in batches (READPAST, so processes never take the same rows), folds
+    repeated crossings of one product into a single alert, delivers the batch
+    and marks it dispatched. Alerts whose delivery failed are claimed again
+    once their lease expires; webhook receivers can use alert_id to drop the
+    rare duplicate left by a crash between delivery and marking.
+    """
+    _worker = None
+    _lock = threading.Lock()
+    _conn = None
+
+    @staticmethod
+    def start():
+        """Start the background worker once per process"""
+        with LowStockAlertService._lock:
+            if LowStockAlertService._worker is not None:
+                return
+            LowStockAlertService._worker = threading.Thread(target=LowStockAlertService._run, daemon=True)
+            LowStockAlertService._worker.start()
+
+    @staticmethod
+    def dispatch_pending(conn, batch_size=None):
+        """
+        Deliver pending alerts until the outbox has no unclaimed rows left
+
+        Args:
+            conn: pyodbc connection (autocommit)
+            batch_size: Alerts claimed per round
+
+        Returns:
+            int: Outbox rows marked dispatched
+        """
+        batch_size = batch_size or config.LOW_STOCK_ALERT_BATCH_SIZE
+        dispatched = 0
+        cursor = conn.cursor()
+        try:
+            while True:
+                claimed = LowStockAlertService._claim(cursor, batch_size)
+                if not claimed:
+                    break
+                alert_ids = [row.alert_id for row in claimed]
+                try:
+                    LowStockAlertService._deliver(LowStockAlertService._fold(claimed))
+                except Exception as e:
+                    # Left claimed: the rows are retried when the lease runs out
+                    metrics.increment('low_stock_alert_failures')
+                    LowStockAlertService._mark(cursor, alert_ids, "last_error = ?", [str(e)[:400]])
+                    raise
+                LowStockAlertService._mark(cursor, alert_ids, "dispatched_at = SYSDATETIME(), last_error = NULL")
+                dispatched += len(alert_ids)
+                metrics.increment('low_stock_alerts_dispatched', len(alert_ids))
+                if len(claimed) < batch_size:
+                    break
+        finally:
+            cursor.close()
+        return dispatched
+
+    @staticmethod
+    def _claim(cursor, batch_size):
+        """Lease the oldest pending alerts that no other dispatcher holds"""
+        return cursor.execute("""
+            WITH pending AS (
+                SELECT TOP (?) *
+                FROM low_stock_alert WITH (READPAST, UPDLOCK, ROWLOCK)
+                WHERE dispatched_at IS NULL
+                  AND (claimed_until IS NULL OR claimed_until < SYSDATETIME())
+                ORDER BY alert_id
+            )
+            UPDATE pending
+            SET claimed_until = DATEADD(SECOND, ?, SYSDATETIME()),
+                attempts = attempts + 1
+            OUTPUT
+                inserted.alert_id,
+                inserted.product_id,
+                inserted.product_name,
+                inserted.quantity,
+                inserted.reorder_level,
+                inserted.created_at
+        """, [batch_size, config.LOW_STOCK_ALERT_LEASE_SECONDS]).fetchall()
+
+    @staticmethod
+    def _mark(cursor, alert_ids, assignments, args=()):
+        """Update claimed outbox rows"""
+        placeholders = ', '.join('?' * len(alert_ids))
+        cursor.execute(
+            f"UPDATE low_stock_alert SET {assignments} WHERE alert_id IN ({placeholders})",
+            list(args) + alert_ids
+        )
+
+    @staticmethod
+    def _fold(claimed):
+        """One alert per product, carrying its latest crossing and every outbox id it covers"""
+        alerts = {}
+        for row in sorted(claimed, key=lambda row: row.alert_id):
+            alert = alerts.setdefault(row.product_id, {'alert_ids': []})
+            alert['alert_ids'].append(row.alert_id)
+            alert.update(
+                alert_id=row.alert_id,
+                product_id=row.product_id,
+                product_name=row.product_name,
+                quantity=row.quantity,
+                reorder_level=row.reorder_level,
+                created_at=row.created_at
+            )
+        return list(alerts.values())
+
+    @staticmethod
+    def _deliver(alerts):
+        """POST the batch to the configured webhook, or log it when there is none"""
+        if not config.LOW_STOCK_ALERT_WEBHOOK_URL:
+            for alert in alerts:
+                print(f"LOW STOCK ALERT: Product {alert['product_name']} is low on stock. "
+                      f"Current quantity: {alert['quantity']}, Reorder level: {alert['reorder_level']}")
+            return
+        request = urllib.request.Request(
+            config.LOW_STOCK_ALERT_WEBHOOK_URL,
+            data=dumps_bytes({'alerts': alerts}),
+            headers={'Content-Type': 'application/json'},
+            method='POST'
+        )
+        # urlopen raises for non-2xx responses
+        with urllib.request.urlopen(request, timeout=config.LOW_STOCK_ALERT_WEBHOOK_TIMEOUT):
+            pass
+
+    @staticmethod
+    def _run():
+        """Background worker loop"""
+        while True:
+            time.sleep(config.LOW_STOCK_ALERT_POLL_INTERVAL)
+            try:
+                if LowStockAlertService._conn is None:
+                    LowStockAlertService._conn = get_db_connection()
+                LowStockAlertService.dispatch_pending(LowStockAlertService._conn)
+            except Exception as e:
+                print(f"Low-stock alert dispatch failed: {str(e)}")
+                # Drop the connection so the next round starts on a fresh one
+                try:
+                    LowStockAlertService._conn.close()
+                except Exception:
+                    pass
+                LowStockAlertService._conn = None
@@ -0,0 +1,80 @@
+"""
+Pricing service for the Inventory Management System
+"""
+from decimal import Decimal, InvalidOperation
+from models.product import Product
+from utils.pagination import STOCK_STATUSES
+import config
+
+
+class PricingService:
+    """Service for bulk price changes"""
+
+    @staticmethod
+    def bulk_reprice(data):
+        """
+        Reprice a category, a filtered slice or a list of products at once
+
+        Args:
+            data: Request body with any of category_id, product_ids,
+                stock_status, min_price and max_price to pick the products
+                (or all=true for the whole catalog), an optional
+                profit_percentage and dry_run
+
+        Returns:
+            dict: dry_run, affected and the per-product changes
+
+        Raises:
+            ValueError: The body is malformed or selects no products
+        """
+        filters = {
+            'category_id': PricingService._optional_int(data, 'category_id'),
+            'stock_status': data.get('stock_status'),
+            'min_price': PricingService._optional_decimal(data, 'min_price'),
+            'max_price': PricingService._optional_decimal(data, 'max_price')
+        }
+        if filters['stock_status'] is not None and filters['stock_status'] not in STOCK_STATUSES:
+            raise ValueError(f"stock_status must be one of {', '.join(STOCK_STATUSES)}")
+
+        product_ids = data.get('product_ids')
+        if product_ids is not None:
+            if not isinstance(product_ids, list) or not all(isinstance(item, int) and item > 0 for item in product_ids):
+                raise ValueError("product_ids must be a list of positive integers")
+            product_ids = list(dict.fromkeys(product_ids))
+            if not product_ids or len(product_ids) > config.BATCH_MAX_IDS:
+                raise ValueError(f"product_ids must list between 1 and {config.BATCH_MAX_IDS} ids")
+
+        # Guard against repricing the whole catalog by leaving out a filter
+        if product_ids is None and all(value is None for value in filters.values()) and data.get('all') is not True:
+            raise ValueError("Select products with category_id, product_ids, stock_status, min_price or max_price, or pass all=true")
+
+        profit_percentage = PricingService._optional_decimal(data, 'profit_percentage')
+        dry_run = bool(data.get('dry_run', False))
+        changes = Product.reprice(filters, product_ids, profit_percentage, dry_run)
+        return {'dry_run': dry_run, 'affected': len(changes), 'changes': changes}
+
+    @staticmethod
+    def _optional_int(data, name):
+        """Read an optional positive integer from the request body"""
+        value = data.get(name)
+        if value is None:
+            return None
+        if not isinstance(value, int) or isinstance(value, bool) or value <= 0:
+            raise ValueError(f"{name} must be a positive integer")
+        return value
+
+    @staticmethod
+    def _optional_decimal(data, name):
+        """Read an optional non-negative number from the request body"""
+        value = data.get(name)
+        if value is None:
+            return None
+        if isinstance(value, bool):
+            raise ValueError(f"{name} must be a number")
+        try:
+            value = Decimal(str(value))
+        except InvalidOperation:
+            raise ValueError(f"{name} must be a number")
+        if not value.is_finite() or value < 0:
+            raise ValueError(f"{name} must not be negative")
+        return value
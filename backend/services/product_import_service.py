@@ -0,0 +1,198 @@
+"""
+Bulk product import service for the Inventory Management System
+"""
+import csv
+import io
+import time
+from decimal import Decimal, InvalidOperation
+import config
+
+INSERT_PRODUCT = """
+    INSERT INTO product (name, category_id, price, base_price, quantity, reorder_level, profit_percentage)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+CENTS = Decimal('0.01')
+
+
+class ProductImportService:
+    """
+    Streaming CSV import of products and their opening stock
+
+    The CSV is read row by row and validated as it goes. Valid rows are inserted
+    with fast_executemany in batches of IMPORT_BATCH_SIZE, one transaction per
+    batch, so memory stays flat and each batch costs one round trip rather than
+    one INSERT plus @@IDENTITY per product.
+
+    Columns: name, category (name) or category_id, and optionally price,
+    quantity (opening stock), reorder_level and profit_percentage.
+    """
+
+    @staticmethod
+    def import_csv(conn, binary_stream, create_categories=False, batch_size=None):
+        """
+        Import products from a CSV byte stream
+
+        Args:
+            conn: pyodbc connection to write with
+            binary_stream: File-like object yielding the CSV bytes
+            create_categories: Create categories named in the file that do not exist yet
+            batch_size: Rows per insert batch and transaction (defaults to IMPORT_BATCH_SIZE)
+
+        Returns:
+            dict: total_rows, imported, failed, errors (row-level, capped at
+            IMPORT_MAX_ERRORS) and elapsed_ms
+        """
+        started = time.perf_counter()
+        batch_size = batch_size or config.IMPORT_BATCH_SIZE
+        report = {'total_rows': 0, 'imported': 0, 'failed': 0, 'errors': []}
+        categories = ProductImportService._load_categories(conn)
+
+        reader = csv.DictReader(io.TextIOWrapper(binary_stream, encoding='utf-8-sig', newline=''))
+        missing = {'name'} - set(reader.fieldnames or [])
+        if missing or not {'category', 'category_id'} & set(reader.fieldnames or []):
+            raise ValueError("CSV needs a 'name' column and a 'category' or 'category_id' column")
+
+        batch = []
+        # Line 1 is the header, so data rows start on line 2
+        for line_no, row in enumerate(reader, start=2):
+            report['total_rows'] += 1
+            try:
+                batch.append((line_no, ProductImportService._parse_row(conn, row, categories, create_categories)))
+            except ValueError as e:
+                ProductImportService._add_error(report, line_no, str(e))
+                continue
+            if len(batch) >= batch_size:
+                ProductImportService._insert_batch(conn, batch, report)
+                batch = []
+        if batch:
+            ProductImportService._insert_batch(conn, batch, report)
+
+        report['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        return report
+
+    @staticmethod
+    def _load_categories(conn):
+        """Load every category once: ids keyed by lower-cased name, plus the set of ids"""
+        cursor = conn.cursor()
+        try:
+            rows = cursor.execute("SELECT category_id, name FROM category").fetchall()
+        finally:
+            cursor.close()
+        return {
+            'by_name': {name.strip().lower(): category_id for category_id, name in rows},
+            'ids': {category_id for category_id, _ in rows}
+        }
+
+    @staticmethod
+    def _resolve_category(conn, row, categories, create_categories):
+        """Map a row's category name or id to a category_id"""
+        if row.get('category_id'):
+            category_id = ProductImportService._parse_int(row['category_id'], 'category_id')
+            if category_id not in categories['ids']:
+                raise ValueError(f"Unknown category_id {category_id}")
+            return category_id
+
+        name = (row.get('category') or '').strip()
+        if not name:
+            raise ValueError("category is required")
+        category_id = categories['by_name'].get(name.lower())
+        if category_id is None:
+            if not create_categories:
+                raise ValueError(f"Unknown category '{name}'")
+            cursor = conn.cursor()
+            try:
+                category_id = int(cursor.execute("""
+                    INSERT INTO category (name, description) OUTPUT inserted.category_id VALUES (?, NULL)
+                """, [name]).fetchval())
+            finally:
+                cursor.close()
+            categories['by_name'][name.lower()] = category_id
+            categories['ids'].add(category_id)
+        return category_id
+
+    @staticmethod
+    def _parse_int(text, field, default=None):
+        """Parse a non-negative integer field"""
+        text = (text or '').strip()
+        if not text:
+            if default is None:
+                raise ValueError(f"{field} is required")
+            return default
+        try:
+            value = int(text)
+        except ValueError:
+            raise ValueError(f"{field} must be a whole number")
+        if value < 0:
+            raise ValueError(f"{field} must not be negative")
+        return value
+
+    @staticmethod
+    def _parse_decimal(text, field, default):
+        """Parse a non-negative DECIMAL(10, 2) field"""
+        text = (text or '').strip()
+        if not text:
+            return default
+        try:
+            value = Decimal(text)
+        except InvalidOperation:
+            raise ValueError(f"{field} must be a number")
+        if not value.is_finite() or value < 0 or value >= Decimal('100000000'):
+            raise ValueError(f"{field} is out of range")
+        return value.quantize(CENTS)
+
+    @staticmethod
+    def _parse_row(conn, row, categories, create_categories):
+        """Validate one CSV row and build its insert parameters"""
+        name = (row.get('name') or '').strip()
+        if not name:
+            raise ValueError("name is required")
+        if len(name) > 100:
+            raise ValueError("name is longer than 100 characters")
+
+        category_id = ProductImportService._resolve_category(conn, row, categories, create_categories)
+        price = ProductImportService._parse_decimal(row.get('price'), 'price', Decimal('0.00'))
+        quantity = ProductImportService._parse_int(row.get('quantity'), 'quantity', 0)
+        reorder_level = ProductImportService._parse_int(row.get('reorder_level'), 'reorder_level', 10)
+        profit_percentage = ProductImportService._parse_decimal(
+            row.get('profit_percentage'), 'profit_percentage', Decimal('30.00')
+        )
+        # Same base price rule as Product.create: the price without the profit margin
+        base_price = (price / (1 + profit_percentage / 100)).quantize(CENTS) if price > 0 else Decimal('0.00')
+        return (name, category_id, price, base_price, quantity, reorder_level, profit_percentage)
+
+    @staticmethod
+    def _insert_batch(conn, batch, report):
+        """Insert a batch in one transaction, falling back to single rows to pinpoint failures"""
+        autocommit = conn.autocommit
+        conn.autocommit = False
+        cursor = conn.cursor()
+        cursor.fast_executemany = True
+        try:
+            try:
+                cursor.executemany(INSERT_PRODUCT, [params for _, params in batch])
+                conn.commit()
+                report['imported'] += len(batch)
+                return
+            except Exception:
+                conn.rollback()
+
+            # fast_executemany does not say which row failed: retry them one by one
+            for line_no, params in batch:
+                try:
+                    cursor.execute(INSERT_PRODUCT, params)
+                    conn.commit()
+                    report['imported'] += 1
+                except Exception as e:
+                    conn.rollback()
+                    ProductImportService._add_error(report, line_no, str(e))
+        finally:
+            cursor.close()
+            conn.autocommit = autocommit
+
+    @staticmethod
+    def _add_error(report, line_no, message):
+        """Count a failed row and keep its message while under IMPORT_MAX_ERRORS"""
+        report['failed'] += 1
+        if len(report['errors']) < config.IMPORT_MAX_ERRORS:
+            report['errors'].append({'line': line_no, 'error': message})
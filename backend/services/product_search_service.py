@@ -0,0 +1,121 @@
+"""
+Product search service for the Inventory Management System
+"""
+import threading
+import time
+from models import query_db
+from models.change_feed import ChangeFeed
+from models.product import Product
+from utils.search_index import SearchIndex
+from utils import metrics
+import config
+
+
+class ProductSearchService:
+    """
+    Ranked product search over an in-process index
+
+    The index is built from the product and category tables on the first
+    search. After that it catches up through the delta-sync change feed:
+    writes made in this process mark it stale, so the next search sees them,
+    and writes from other processes or bulk jobs are picked up at most
+    SEARCH_INDEX_SYNC_INTERVAL seconds later. Only the ranking comes from the
+    index; the returned page is read from the database, so stock and prices
+    are always current.
+    """
+    _lock = threading.Lock()
+    _index = None
+    _version = 0
+    _synced_at = 0.0
+    _stale = False
+
+    @staticmethod
+    def search(query, offset=0, limit=20):
+        """
+        Search products by name and category name
+
+        Args:
+            query: Free text; every word must match a name or category word,
+                by prefix or, for words of 3+ letters, approximately
+            offset: Ranked results to skip
+            limit: Results to return
+
+        Returns:
+            dict: total, offset, limit and the page of products, each with its score
+        """
+        with ProductSearchService._lock:
+            ProductSearchService._ensure_current()
+            started = time.perf_counter()
+            total, ranked = ProductSearchService._index.search(query, offset, limit)
+            metrics.observe('search_lookup_time', time.perf_counter() - started)
+
+        products = {product['product_id']: product for product in Product.get_by_ids([pid for pid, _ in ranked])}
+        page = []
+        for product_id, score in ranked:
+            # A product deleted since the last sync is simply left out
+            if product_id in products:
+                page.append(dict(products[product_id], score=score))
+        return {'total': total, 'offset': offset, 'limit': limit, 'products': page}
+
+    @staticmethod
+    def notify_changed():
+        """Make the next search catch up first (call after product or category writes)"""
+        ProductSearchService._stale = True
+
+    @staticmethod
+    def get_stats():
+        """Get the index size and sync position"""
+        index = ProductSearchService._index
+        return {
+            'products': len(index) if index is not None else 0,
+            'version': ProductSearchService._version,
+            'synced_at': ProductSearchService._synced_at
+        }
+
+    @staticmethod
+    def _ensure_current():
+        """Build the index on first use, then apply changes when stale or due (lock held)"""
+        now = time.monotonic()
+        if ProductSearchService._index is None:
+            ProductSearchService._build()
+        elif ProductSearchService._stale or now - ProductSearchService._synced_at >= config.SEARCH_INDEX_SYNC_INTERVAL:
+            ProductSearchService._sync()
+        ProductSearchService._synced_at = now
+
+    @staticmethod
+    def _build():
+        """Load every product and category into a new index"""
+        started = time.perf_counter()
+        ProductSearchService._stale = False
+        # Taken first: changes made while loading are replayed by the next sync
+        version = ChangeFeed.get_current_version()
+        index = SearchIndex(fuzzy_threshold=config.SEARCH_FUZZY_THRESHOLD)
+        categories = query_db("SELECT category_id, name FROM category", columnar=True)
+        for category_id, name in categories['rows']:
+            index.set_category(category_id, name)
+        products = query_db("SELECT product_id, name, category_id FROM product", columnar=True)
+        for product_id, name, category_id in products['rows']:
+            index.upsert_product(product_id, name, category_id)
+
+        ProductSearchService._index = index
+        ProductSearchService._version = version
+        metrics.observe('search_index_build_time', time.perf_counter() - started)
+
+    @staticmethod
+    def _sync():
+        """Apply product and category changes since the last sync"""
+        ProductSearchService._stale = False
+        index = ProductSearchService._index
+        has_more = True
+        while has_more:
+            changes = ChangeFeed.get_changes(ProductSearchService._version, config.SEARCH_SYNC_BATCH_SIZE)
+            for category in changes['categories']:
+                index.set_category(category['category_id'], category['name'])
+            for product in changes['products']:
+                index.upsert_product(product['product_id'], product['name'], product['category_id'])
+            for product_id in changes['deleted']['products']:
+                index.remove_product(product_id)
+            for category_id in changes['deleted']['categories']:
+                index.remove_category(category_id)
+            ProductSearchService._version = int(changes['next_token'])
+            has_more = changes['has_more']
@@ -0,0 +1,203 @@
+"""
+Batched sale ingestion service for the Inventory Management System
+"""
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from decimal import Decimal
+from utils.db_helper import get_db_connection
+from utils.db_retry import run_with_retry
+import config
+
+
+class SaleNotRecorded(Exception):
+    """Raised when a queued sale timed out and was withdrawn before any batch wrote it"""
+
+
+class SalePending(Exception):
+    """Raised when a sale timed out while its batch was already being written"""
+
+    def __init__(self, ingest_id):
+        super().__init__(f"Sale {ingest_id} is still being recorded")
+        self.ingest_id = ingest_id
+
+
+class SaleIngestionService:
+    """
+    Group-commit pipeline for high-rate sale ingestion
+
+    Validated sales are queued in process and written by one worker thread in
+    micro-batches through sp_make_sales_batch, so a burst of single-line sales
+    costs one transaction and log flush per batch instead of one per sale.
+    Each caller waits on a Future that resolves to its real sale_id. A caller
+    that gives up cancels its Future, and the worker skips cancelled sales, so
+    a sale is never written after its request has failed. A sale that is
+    already inside a batch cannot be withdrawn; its outcome is kept under its
+    ingest_id for the client to look up.
+    """
+    _queue = queue.Queue()
+    _worker = None
+    _lock = threading.Lock()
+    _conn = None
+    _outcomes = OrderedDict()
+
+    @staticmethod
+    def start():
+        """Start the background worker once per process"""
+        with SaleIngestionService._lock:
+            if SaleIngestionService._worker is not None:
+                return
+            SaleIngestionService._worker = threading.Thread(target=SaleIngestionService._run, daemon=True)
+            SaleIngestionService._worker.start()
+
+    @staticmethod
+    def submit(product_id, quantity, sale_price):
+        """
+        Queue a sale for the next batch
+
+        Args:
+            product_id: ID of the product
+            quantity: Quantity sold
+            sale_price: Price per unit
+
+        Returns:
+            Future: Resolves to the sale_id once the batch commits, or raises the
+            database error. Its ingest_id names the sale until then; cancel() it
+            to withdraw the sale while it is still queued.
+        """
+        SaleIngestionService.start()
+        future = Future()
+        future.ingest_id = uuid.uuid4().hex
+        SaleIngestionService._queue.put((int(product_id), int(quantity), Decimal(str(sale_price)), future))
+        return future
+
+    @staticmethod
+    def create_sale(product_id, quantity, sale_price):
+        """
+        Queue a sale and wait for its batch to commit
+
+        Raises:
+            SaleNotRecorded: The wait timed out and the sale was withdrawn; retrying is safe
+            SalePending: The wait timed out while the sale's batch was being written
+        """
+        future = SaleIngestionService.submit(product_id, quantity, sale_price)
+        try:
+            return future.result(timeout=config.SALE_BATCH_RESULT_TIMEOUT)
+        except FutureTimeoutError:
+            if future.cancel():
+                raise SaleNotRecorded("Sale was not recorded in time; it is safe to retry")
+            SaleIngestionService._remember(future.ingest_id, {'status': 'pending'})
+            future.add_done_callback(SaleIngestionService._keep_outcome)
+            raise SalePending(future.ingest_id)
+
+    @staticmethod
+    def get_outcome(ingest_id):
+        """
+        Get the outcome of a sale that was still being recorded when its request timed out
+
+        Returns:
+            dict or None: status ('pending', 'recorded' with sale_id, or 'failed'
+            with error), or None for an unknown or expired ingest_id
+        """
+        with SaleIngestionService._lock:
+            return SaleIngestionService._outcomes.get(ingest_id)
+
+    @staticmethod
+    def _keep_outcome(future):
+        """Record a pending sale's result once its batch has finished"""
+        if future.exception() is not None:
+            outcome = {'status': 'failed', 'error': str(future.exception())}
+        else:
+            outcome = {'status': 'recorded', 'sale_id': future.result()}
+        SaleIngestionService._remember(future.ingest_id, outcome)
+
+    @staticmethod
+    def _remember(ingest_id, outcome):
+        """Store an outcome, keeping the newest SALE_BATCH_OUTCOME_HISTORY"""
+        with SaleIngestionService._lock:
+            SaleIngestionService._outcomes[ingest_id] = outcome
+            SaleIngestionService._outcomes.move_to_end(ingest_id)
+            while len(SaleIngestionService._outcomes) > config.SALE_BATCH_OUTCOME_HISTORY:
+                SaleIngestionService._outcomes.popitem(last=False)
+
+    @staticmethod
+    def _collect_batch():
+        """Block for the first sale, then gather more until the batch is full or the wait expires"""
+        batch = [SaleIngestionService._queue.get()]
+        deadline = time.monotonic() + config.SALE_BATCH_MAX_WAIT_MS / 1000
+        while len(batch) < config.SALE_BATCH_MAX_SIZE:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(SaleIngestionService._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    @staticmethod
+    def _get_connection():
+        """Get the worker's own connection, reconnecting after failures"""
+        if SaleIngestionService._conn is None:
+            SaleIngestionService._conn = get_db_connection()
+        return SaleIngestionService._conn
+
+    @staticmethod
+    def _make_single_sale(cursor, product_id, quantity, sale_price):
+        """Record one sale through sp_make_sale, which reports the exact rejection reason"""
+        return int(run_with_retry(
+            lambda: cursor.execute("EXEC sp_make_sale ?, ?, ?", [product_id, quantity, sale_price]).fetchval()
+        ))
+
+    @staticmethod
+    def _write_batch(batch):
+        """Commit a batch and resolve every caller's future"""
+        # Sales whose callers already gave up are dropped; the rest can no longer be cancelled
+        batch[:] = [item for item in batch if item[3].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        conn = SaleIngestionService._get_connection()
+        cursor = conn.cursor()
+        try:
+            rows = [
+                (line_no, product_id, quantity, sale_price)
+                for line_no, (product_id, quantity, sale_price, _) in enumerate(batch)
+            ]
+            # A deadlocked batch is rolled back whole, so it is safe to resubmit
+            batch_rows = run_with_retry(lambda: cursor.execute("EXEC sp_make_sales_batch ?", [rows]).fetchall())
+            results = {line_no: sale_id for line_no, sale_id in batch_rows}
+
+            for line_no, (product_id, quantity, sale_price, future) in enumerate(batch):
+                sale_id = results.get(line_no)
+                if sale_id is not None:
+                    future.set_result(int(sale_id))
+                    continue
+                # Rejected in the batch (usually not enough stock); retry alone for an exact answer
+                try:
+                    future.set_result(SaleIngestionService._make_single_sale(cursor, product_id, quantity, sale_price))
+                except Exception as e:
+                    future.set_exception(e)
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _run():
+        """Background worker loop"""
+        while True:
+            batch = SaleIngestionService._collect_batch()
+            try:
+                SaleIngestionService._write_batch(batch)
+            except Exception as e:
+                print(f"Sale batch of {len(batch)} failed: {str(e)}")
+                for _, _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                # Drop the connection so the next batch starts on a fresh one
+                try:
+                    SaleIngestionService._conn.close()
+                except Exception:
+                    pass
+                SaleIngestionService._conn = None
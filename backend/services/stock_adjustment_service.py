@@ -0,0 +1,224 @@
+"""
+Bulk stock adjustment service for the Inventory Management System
+"""
+import csv
+import time
+import config
+
+
+class StockAdjustmentService:
+    """
+    Set-based stock adjustments through sp_batch_update_stock
+
+    Adjustments are resolved against one read of the product table, merged per
+    product, and sent as dbo.ProductStockUpdateType table-valued parameters in
+    chunks of STOCK_ADJUSTMENT_CHUNK_SIZE rows, so a full cycle count of tens of
+    thousands of SKUs takes a handful of round trips.
+
+    Two modes:
+        set    - the value is the counted quantity (cycle count); the
+                 procedure turns it into a change from the stock under the
+                 row lock, so sales made meanwhile do not skew the result
+        change - the value is added to the current stock (may be negative)
+    """
+
+    @staticmethod
+    def read_file(path):
+        """
+        Read adjustments from a CSV file
+
+        Columns: product_id or name; quantity (counted stock, set mode) or
+        quantity_change (change mode); optional reason.
+
+        Returns:
+            tuple: (mode, list of adjustment dicts)
+
+        Raises:
+            ValueError: The header does not name a product and a quantity column
+        """
+        with open(path, newline='', encoding='utf-8-sig') as csv_file:
+            reader = csv.DictReader(csv_file)
+            fields = set(reader.fieldnames or [])
+            if not {'product_id', 'name'} & fields:
+                raise ValueError("CSV needs a 'product_id' or 'name' column")
+            if 'quantity' in fields:
+                mode, value_field = 'set', 'quantity'
+            elif 'quantity_change' in fields:
+                mode, value_field = 'change', 'quantity_change'
+            else:
+                raise ValueError("CSV needs a 'quantity' or 'quantity_change' column")
+
+            adjustments = [
+                {
+                    'line': line_no,
+                    'product_id': (row.get('product_id') or '').strip() or None,
+                    'name': (row.get('name') or '').strip() or None,
+                    'value': (row.get(value_field) or '').strip(),
+                    'reason': (row.get('reason') or '').strip() or None
+                }
+                # Line 1 is the header
+                for line_no, row in enumerate(reader, start=2)
+            ]
+        return mode, adjustments
+
+    @staticmethod
+    def apply(conn, adjustments, mode='set', chunk_size=None, dry_run=False):
+        """
+        Apply stock adjustments in set-based chunks
+
+        Args:
+            conn: pyodbc connection (autocommit)
+            adjustments: Dicts with product_id or name, value and optional reason (and line)
+            mode: 'set' for counted quantities, 'change' for deltas
+            chunk_size: Products per sp_batch_update_stock call
+            dry_run: Validate and report without writing
+
+        Returns:
+            dict: total, applied, unchanged, failed, errors, calls, timings in ms
+            and, in set mode, moved_since_load: counted products whose stock
+            changed between the load and the write (their change was recomputed)
+        """
+        started = time.perf_counter()
+        chunk_size = chunk_size or config.STOCK_ADJUSTMENT_CHUNK_SIZE
+        report = {'total': len(adjustments), 'applied': 0, 'unchanged': 0, 'failed': 0, 'errors': [], 'calls': 0}
+        if mode == 'set':
+            report['moved_since_load'] = 0
+
+        cursor = conn.cursor()
+        try:
+            products = cursor.execute("SELECT product_id, name, quantity FROM product").fetchall()
+            report['load_ms'] = round((time.perf_counter() - started) * 1000, 1)
+
+            loaded = {product_id: quantity for product_id, _, quantity in products}
+            merged = StockAdjustmentService._merge(adjustments, products, mode, report)
+            # Rows follow dbo.ProductStockUpdateType: product_id, quantity_change, reason, counted_quantity
+            if mode == 'set':
+                # Every count is sent, even one that matched at load time: stock may move before the write
+                updates = [
+                    (product_id, None, reason[:255] if reason else None, value)
+                    for product_id, (value, reason, _) in merged.items()
+                ]
+            else:
+                updates = [
+                    (product_id, value, reason[:255] if reason else None, None)
+                    for product_id, (value, reason, _) in merged.items()
+                    if value != 0
+                ]
+                report['unchanged'] += len(merged) - len(updates)
+
+            write_started = time.perf_counter()
+            for start in range(0, len(updates), chunk_size):
+                chunk = updates[start:start + chunk_size]
+                if dry_run:
+                    StockAdjustmentService._count_applied(report, mode, [
+                        (product_id, change if counted is None else counted - loaded[product_id])
+                        for product_id, change, _, counted in chunk
+                    ], loaded, merged)
+                    continue
+                try:
+                    rows = cursor.execute("EXEC sp_batch_update_stock ?", [chunk]).fetchall()
+                    StockAdjustmentService._count_applied(
+                        report, mode, [(row.product_id, row.quantity_change) for row in rows], loaded, merged
+                    )
+                except Exception as e:
+                    # The procedure is all-or-nothing, so the whole chunk was rolled back
+                    for product_id, _, _, _ in chunk:
+                        for line in merged[product_id][2]:
+                            StockAdjustmentService._add_error(report, line, f"Chunk rejected: {str(e)}")
+                report['calls'] += 1
+            report['write_ms'] = round((time.perf_counter() - write_started) * 1000, 1)
+        finally:
+            cursor.close()
+
+        report['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+        return report
+
+    @staticmethod
+    def _count_applied(report, mode, changes, loaded, merged):
+        """Count applied and unchanged products from (product_id, applied change) pairs"""
+        for product_id, change in changes:
+            report['applied' if change != 0 else 'unchanged'] += 1
+            if mode == 'set' and change != merged[product_id][0] - loaded[product_id]:
+                report['moved_since_load'] += 1
+
+    @staticmethod
+    def _merge(adjustments, products, mode, report):
+        """
+        Resolve adjustments to product ids and merge them into one value per product
+
+        sp_batch_update_stock joins the TVP to product, so a product listed twice
+        would only be changed once; merging here keeps every line counted.
+
+        Returns:
+            dict: product_id -> (counted quantity in set mode or summed change
+            in change mode, reason, source lines)
+        """
+        by_id = {product_id: quantity for product_id, _, quantity in products}
+        by_name = {}
+        for product_id, name, _ in products:
+            by_name.setdefault(name.strip().lower(), []).append(product_id)
+
+        merged = {}
+        for adjustment in adjustments:
+            line = adjustment.get('line')
+            try:
+                product_id = StockAdjustmentService._resolve(adjustment, by_id, by_name)
+            except ValueError as e:
+                StockAdjustmentService._add_error(report, line, str(e))
+                continue
+            try:
+                value = int(adjustment['value'])
+            except (TypeError, ValueError):
+                StockAdjustmentService._add_error(report, line, "Quantity must be a whole number")
+                continue
+
+            total, reason, lines = merged.get(product_id, (0, None, []))
+            if mode == 'set':
+                if value < 0:
+                    StockAdjustmentService._add_error(report, line, "Counted quantity must not be negative")
+                    continue
+                # The last count for a product wins
+                total = value
+            else:
+                total += value
+            merged[product_id] = (total, adjustment.get('reason') or reason, lines + [line])
+
+        if mode == 'set':
+            return merged
+        # The procedure rejects the whole chunk if any product would go negative
+        for product_id, (change, _, lines) in list(merged.items()):
+            if by_id[product_id] + change < 0:
+                for line in lines:
+                    StockAdjustmentService._add_error(
+                        report, line, f"Not enough stock: {by_id[product_id]} on hand, change {change}"
+                    )
+                del merged[product_id]
+        return merged
+
+    @staticmethod
+    def _resolve(adjustment, by_id, by_name):
+        """Find the product an adjustment refers to"""
+        if adjustment.get('product_id') is not None:
+            try:
+                product_id = int(adjustment['product_id'])
+            except (TypeError, ValueError):
+                raise ValueError("product_id must be a whole number")
+            if product_id not in by_id:
+                raise ValueError(f"Unknown product_id {product_id}")
+            return product_id
+        name = adjustment.get('name')
+        if not name:
+            raise ValueError("product_id or name is required")
+        matches = by_name.get(name.lower(), [])
+        if not matches:
+            raise ValueError(f"Unknown product '{name}'")
+        if len(matches) > 1:
+            raise ValueError(f"Product name '{name}' is ambiguous; use product_id")
+        return matches[0]
+
+    @staticmethod
+    def _add_error(report, line, message):
+        """Count a failed adjustment and keep its message while under IMPORT_MAX_ERRORS"""
+        report['failed'] += 1
+        if len(report['errors']) < config.IMPORT_MAX_ERRORS:
+            report['errors'].append({'line': line, 'error': message})
@@ -30,7 +30,7 @@ class StockService:
             raise ValueError("Purchase price must be a positive number")
         
         # Check if product exists
-        product = Product.get_by_id(product_id)
+        product = Product.get_by_id(product_id, ('product_id',))
         if not product:
             raise ValueError(f"Product with ID {product_id} not found")
         
@@ -59,16 +59,8 @@ class StockService:
         if not isinstance(sale_price, (int, float)) or sale_price <= 0:
             raise ValueError("Sale price must be a positive number")
         
-        # Check if product exists
-        product = Product.get_by_id(product_id)
-        if not product:
-            raise ValueError(f"Product with ID {product_id} not found")
-        
-        # Check if there's enough stock
-        if product['quantity'] < quantity:
-            raise ValueError(f"Not enough stock available. Current stock: {product['quantity']}, Requested: {quantity}")
-        
-        # Create sale (the stored procedure will handle stock update)
+        # Create sale; the stored procedure checks existence and reserves stock
+        # atomically, so a Python-side pre-read would only add a racy round trip
         sale_id = Sale.create(product_id, quantity, sale_price)
         
         return sale_id
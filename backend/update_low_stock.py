@@ -1,47 +1,8 @@
 """
 Script to update some products to have low stock
 """
-import pyodbc
-import config
-
-def get_db_connection():
-    """Create a connection to the database"""
-    # Connect to SQL Server with Windows Authentication or credentials
-    if config.DB_TRUSTED_CONNECTION:
-        conn_str = (
-            f"DRIVER={{{config.DB_DRIVER}}};"
-            f"SERVER={config.DB_SERVER};"
-            f"DATABASE={config.DB_NAME};"
-            f"Trusted_Connection=yes;"
-        )
-    else:
-        conn_str = (
-            f"DRIVER={{{config.DB_DRIVER}}};"
-            f"SERVER={config.DB_SERVER};"
-            f"DATABASE={config.DB_NAME};"
-            f"UID={config.DB_USER};"
-            f"PWD={config.DB_PASSWORD};"
-        )
-    
-    try:
-        conn = pyodbc.connect(conn_str)
-        conn.autocommit = True
-        return conn
-    except pyodbc.Error as e:
-        print(f"Database connection error: {str(e)}")
-        raise
-
-def execute_query(conn, query, params=None):
-    """Execute SQL query and return affected rows"""
-    cursor = conn.cursor()
-    try:
-        if params:
-            cursor.execute(query, params)
-        else:
-            cursor.execute(query)
-        return cursor.rowcount
-    finally:
-        cursor.close()
+from utils.db_helper import get_db_connection
+from services.stock_adjustment_service import StockAdjustmentService
 
 def main():
     """Main function to update product quantities"""
@@ -59,14 +20,16 @@ def main():
             {"name": "Mini Projector", "quantity": 3}
         ]
         
-        # Update each product
-        for product in products_to_update:
-            rows = execute_query(
-                conn,
-                "UPDATE product SET quantity = ? WHERE name = ?",
-                [product["quantity"], product["name"]]
-            )
-            print(f"Updated {product['name']} to quantity {product['quantity']}: {rows} rows affected")
+        # Set the counted quantities in one sp_batch_update_stock call
+        report = StockAdjustmentService.apply(
+            conn,
+            [{"name": product["name"], "value": product["quantity"], "reason": "Low stock demo data"}
+             for product in products_to_update],
+            mode='set'
+        )
+        print(f"Updated {report['applied']} products ({report['unchanged']} unchanged) in {report['elapsed_ms']:.0f} ms")
+        for error in report['errors']:
+            print(f"  - {error['error']}")
         
         print("\nProducts updated successfully!")
         
@@ -0,0 +1,136 @@
+"""
+Admission control and load shedding for the Inventory Management System
+"""
+import threading
+import time
+from flask import g, jsonify, request
+from utils import metrics
+import config
+
+WRITE_METHODS = {'POST', 'PUT', 'PATCH', 'DELETE'}
+
+
+class _RouteClassLimiter:
+    """Concurrency limit with a bounded wait queue for one route class"""
+
+    def __init__(self, limit, queue_size):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.active = 0
+        self.waiting = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout):
+        """Take a slot, waiting in the queue for at most timeout seconds"""
+        with self._cond:
+            if self.active < self.limit:
+                self.active += 1
+                return True
+            if self.waiting >= self.queue_size:
+                return False
+            self.waiting += 1
+            try:
+                admitted = self._cond.wait_for(lambda: self.active < self.limit, timeout)
+                if admitted:
+                    self.active += 1
+                return admitted
+            finally:
+                self.waiting -= 1
+
+    def release(self):
+        """Give a slot back and wake the next queued request"""
+        with self._cond:
+            self.active -= 1
+            self._cond.notify()
+
+
+_limiters = {
+    'write': _RouteClassLimiter(config.ADMISSION_WRITE_LIMIT, config.ADMISSION_WRITE_QUEUE),
+    'read': _RouteClassLimiter(config.ADMISSION_READ_LIMIT, config.ADMISSION_READ_QUEUE),
+    'analytics': _RouteClassLimiter(config.ADMISSION_ANALYTICS_LIMIT, config.ADMISSION_ANALYTICS_QUEUE),
+    'export': _RouteClassLimiter(config.ADMISSION_EXPORT_LIMIT, config.ADMISSION_EXPORT_QUEUE),
+    'bulk': _RouteClassLimiter(config.ADMISSION_BULK_LIMIT, config.ADMISSION_BULK_QUEUE)
+}
+
+
+def admission_class(name):
+    """
+    Put a view in a specific route class instead of the one derived from the request
+
+    Args:
+        name: 'write', 'read', 'analytics', 'export', 'bulk' (long-running imports and jobs),
+            or None to exempt the view (e.g. long-lived streams)
+
+    Returns:
+        A decorator for Flask view functions
+    """
+    def decorator(view):
+        view.admission_class = name
+        return view
+    return decorator
+
+
+def get_route_class(app):
+    """Classify the current request into its route class"""
+    view = app.view_functions.get(request.endpoint)
+    if view is not None and hasattr(view, 'admission_class'):
+        return view.admission_class
+    if request.method in WRITE_METHODS:
+        return 'write'
+    if request.blueprint == 'dashboard':
+        return 'analytics'
+    return 'read'
+
+
+def get_admission_stats():
+    """Get the limit, in-flight and queued request counts for every route class"""
+    return {
+        name: {
+            'limit': limiter.limit,
+            'queue_size': limiter.queue_size,
+            'active': limiter.active,
+            'waiting': limiter.waiting
+        }
+        for name, limiter in _limiters.items()
+    }
+
+
+def setup_admission_control(app):
+    """
+    Setup admission control handlers for Flask app
+
+    Args:
+        app: Flask application instance
+    """
+    if not config.ADMISSION_CONTROL_ENABLED:
+        return
+
+    @app.before_request
+    def admit_request():
+        """Wait for a slot in the request's route class, or shed it with 503"""
+        if request.method == 'OPTIONS' or request.endpoint is None:
+            return None
+        route_class = get_route_class(app)
+        limiter = _limiters.get(route_class)
+        if limiter is None:
+            return None
+
+        started = time.perf_counter()
+        admitted = limiter.acquire(config.ADMISSION_QUEUE_TIMEOUT_MS / 1000)
+        metrics.observe('admission_queue_time', time.perf_counter() - started, route_class=route_class)
+        if not admitted:
+            metrics.increment('admission_rejected_total', route_class=route_class)
+            response = jsonify({"success": False, "error": "Server is busy, please retry later"})
+            response.status_code = 503
+            response.headers['Retry-After'] = str(config.ADMISSION_RETRY_AFTER)
+            return response
+
+        g.admission_limiter = limiter
+        return None
+
+    @app.teardown_request
+    def release_slot(exception):
+        """Free the request's slot once it has finished"""
+        limiter = g.pop('admission_limiter', None)
+        if limiter is not None:
+            limiter.release()
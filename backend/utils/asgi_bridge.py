@@ -0,0 +1,256 @@
+"""
+ASGI serving bridge for the Inventory Management System
+"""
+import asyncio
+import io
+import sys
+from concurrent.futures import ThreadPoolExecutor
+import config
+
+READ_METHODS = {'GET', 'HEAD', 'OPTIONS'}
+
+
+class _RequestBody(io.RawIOBase):
+    """
+    wsgi.input that pulls the rest of the request body from the ASGI receive channel
+
+    The first part of the body has already been read on the event loop. The
+    rest is received on demand from the worker thread running the view, so a
+    large upload such as a product import CSV is never held in memory whole.
+    """
+
+    def __init__(self, buffered, more_body, receive, loop):
+        super().__init__()
+        self._chunk = buffered
+        self._offset = 0
+        self._more_body = more_body
+        self._receive = receive
+        self._loop = loop
+
+    def readable(self):
+        return True
+
+    def readinto(self, target):
+        while self._offset >= len(self._chunk) and self._more_body:
+            message = asyncio.run_coroutine_threadsafe(self._receive(), self._loop).result()
+            if message['type'] == 'http.disconnect':
+                self._more_body = False
+                break
+            self._chunk, self._offset = message.get('body', b''), 0
+            self._more_body = message.get('more_body', False)
+        count = min(len(target), len(self._chunk) - self._offset)
+        target[:count] = self._chunk[self._offset:self._offset + count]
+        self._offset += count
+        return count
+
+
+class ExecutorASGIBridge:
+    """
+    Serve a WSGI (Flask) app from an asyncio event loop
+
+    Waiting requests are cheap coroutines on the event loop, and only the
+    blocking part (the Flask view and its pyodbc calls) runs on a bounded
+    thread pool. Each view still holds a pool thread from start to finish, so
+    the number of requests actually being served at once equals the pool
+    size; the rest wait in the pool's queue without a thread of their own.
+    Reads and writes use separate pools, so a pile-up of slow reads cannot take
+    the threads that sale ingestion needs. Chunks of streamed responses are
+    pulled on a third pool, and dashboard SSE streams, which each hold a thread
+    for as long as they are open, get a pool of their own so open dashboards
+    cannot starve exports. A streamed body stops as soon as the client
+    disconnects.
+    """
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+        self.read_executor = ThreadPoolExecutor(config.ASGI_READ_WORKERS, thread_name_prefix='asgi-read')
+        self.write_executor = ThreadPoolExecutor(config.ASGI_WRITE_WORKERS, thread_name_prefix='asgi-write')
+        self.stream_executor = ThreadPoolExecutor(config.ASGI_STREAM_WORKERS, thread_name_prefix='asgi-stream')
+        self.event_stream_executor = ThreadPoolExecutor(config.ASGI_SSE_WORKERS, thread_name_prefix='asgi-sse')
+        self.pending = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        if self.pending >= config.ASGI_MAX_PENDING:
+            await self._send_busy(send)
+            return
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            buffered, more_body = await self._read_body_start(receive)
+            environ = self._build_environ(scope, buffered, more_body, receive, loop)
+            executor = self.read_executor if scope['method'] in READ_METHODS else self.write_executor
+            status, headers, body = await loop.run_in_executor(executor, self._start, environ)
+            await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+            await self._send_body(loop, body, headers, receive, send)
+        finally:
+            self.pending -= 1
+
+    async def _lifespan(self, receive, send):
+        """Answer the ASGI server's startup and shutdown events"""
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                for executor in (self.read_executor, self.write_executor, self.stream_executor, self.event_stream_executor):
+                    executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    @staticmethod
+    async def _send_busy(send):
+        """Shed a request when too many are already waiting in this process"""
+        body = b'{"success": false, "error": "Server is busy, please retry later"}'
+        await send({
+            'type': 'http.response.start',
+            'status': 503,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode()),
+                (b'retry-after', str(config.ADMISSION_RETRY_AFTER).encode())
+            ]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+    @staticmethod
+    async def _read_body_start(receive):
+        """
+        Read the request body on the event loop, up to ASGI_BODY_BUFFER_BYTES
+
+        Returns:
+            tuple: (bytes read, whether more body is still to come)
+        """
+        parts = []
+        size = 0
+        while size < config.ASGI_BODY_BUFFER_BYTES:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return b''.join(parts), False
+            parts.append(message.get('body', b''))
+            size += len(parts[-1])
+            if not message.get('more_body', False):
+                return b''.join(parts), False
+        return b''.join(parts), True
+
+    @staticmethod
+    async def _wait_for_disconnect(receive):
+        """Return once the client has gone away"""
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+
+    @staticmethod
+    def _build_environ(scope, buffered, more_body, receive, loop):
+        """Translate an ASGI HTTP scope into a WSGI environ whose input streams the rest of the body"""
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': client[0],
+            'REMOTE_PORT': str(client[1]),
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': io.BufferedReader(_RequestBody(buffered, more_body, receive, loop)),
+            # The input ends at the end of the body, so chunked uploads need no Content-Length
+            'wsgi.input_terminated': True,
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False
+        }
+        for name, value in scope.get('headers', []):
+            name = name.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if name in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                environ[name] = value
+            else:
+                key = f"HTTP_{name}"
+                environ[key] = f"{environ[key]},{value}" if key in environ else value
+        if not more_body and 'CONTENT_LENGTH' not in environ:
+            environ['CONTENT_LENGTH'] = str(len(buffered))
+        return environ
+
+    def _start(self, environ):
+        """
+        Run the WSGI app on a worker thread
+
+        Returns:
+            tuple: (status, headers, body) where body is bytes for a buffered
+            response, or (closeable, iterator, first chunk) for a streamed one
+        """
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers]
+
+        chunks = self.wsgi_app(environ, start_response)
+        try:
+            iterator = iter(chunks)
+            first = next(iterator, None)
+            # A Content-Length means the body is already in memory: drain it on this thread
+            if any(name == b'content-length' for name, _ in started['headers']):
+                body = b''.join([first or b''] + list(iterator))
+                if hasattr(chunks, 'close'):
+                    chunks.close()
+                return started['status'], started['headers'], body
+        except Exception:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+            raise
+        return started['status'], started['headers'], (chunks, iterator, first)
+
+    async def _send_body(self, loop, body, headers, receive, send):
+        """Send the response body, pulling streamed chunks until the body ends or the client leaves"""
+        if isinstance(body, bytes):
+            await send({'type': 'http.response.body', 'body': body})
+            return
+
+        closeable, iterator, first = body
+        is_event_stream = any(
+            name == b'content-type' and value.startswith(b'text/event-stream') for name, value in headers
+        )
+        executor = self.event_stream_executor if is_event_stream else self.stream_executor
+        # ASGI servers drop sends after a disconnect without raising, so the
+        # generator would otherwise run (and hold its thread) forever
+        disconnected = asyncio.ensure_future(self._wait_for_disconnect(receive))
+        pending = None
+        try:
+            chunk = first
+            while chunk is not None:
+                pending = loop.run_in_executor(executor, next, iterator, None)
+                await asyncio.wait({pending, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+                if disconnected.done():
+                    return
+                following = pending.result()
+                pending = None
+                if chunk or following is None:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': following is not None})
+                chunk = following
+            if first is None:
+                await send({'type': 'http.response.body', 'body': b''})
+        finally:
+            disconnected.cancel()
+            if pending is not None:
+                # A generator cannot be closed while a thread is inside next();
+                # an SSE stream returns from it within one heartbeat
+                await asyncio.wait({pending})
+                if not pending.cancelled():
+                    pending.exception()
+            if hasattr(closeable, 'close'):
+                # Runs the generator's cleanup and the request teardown (closing g.db)
+                await loop.run_in_executor(executor, closeable.close)
@@ -0,0 +1,73 @@
+"""
+Response compression for the Inventory Management System API
+"""
+import gzip
+from flask import request
+import config
+
+# Brotli is optional; gzip is used when it is not installed
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = ('application/json', 'text/csv', 'text/plain', 'application/x-ndjson')
+
+
+def _choose_encoding(accept_encoding):
+    """Pick the best encoding the client accepts"""
+    accepted = {part.split(';')[0].strip().lower() for part in accept_encoding.split(',')}
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress_body(body, encoding):
+    """
+    Compress a response body
+
+    Args:
+        body: Raw response bytes
+        encoding: 'br' or 'gzip'
+
+    Returns:
+        bytes: The compressed body
+    """
+    if encoding == 'br':
+        # Brotli quality runs 0-11; map the gzip-style level onto it
+        return brotli.compress(body, quality=min(config.COMPRESSION_LEVEL + 1, 11))
+    return gzip.compress(body, compresslevel=config.COMPRESSION_LEVEL)
+
+
+def setup_response_compression(app):
+    """
+    Setup response compression for Flask app
+
+    Args:
+        app: Flask application instance
+    """
+    @app.after_request
+    def compress_response(response):
+        """Compress large text responses for clients that accept it"""
+        if not config.COMPRESSION_ENABLED:
+            return response
+        if (response.direct_passthrough or response.is_streamed
+                or response.status_code < 200 or response.status_code >= 300
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = _choose_encoding(request.headers.get('Accept-Encoding', ''))
+        if encoding is None:
+            return response
+
+        body = response.get_data()
+        if len(body) < config.COMPRESSION_MIN_SIZE:
+            return response
+
+        response.set_data(compress_body(body, encoding))
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,122 @@
+"""
+Cron schedule expressions for the Inventory Management System job scheduler
+"""
+from datetime import datetime, timedelta
+
+# Field name -> (lowest, highest) allowed value
+_FIELDS = (
+    ('minute', 0, 59),
+    ('hour', 0, 23),
+    ('day', 1, 31),
+    ('month', 1, 12),
+    ('weekday', 0, 7)
+)
+
+# next_after gives up after this many years without a match (e.g. "0 0 31 2 *")
+_SEARCH_YEARS = 5
+
+
+def _parse_field(text, name, low, high):
+    """
+    Parse one cron field into the set of values it matches
+
+    Supports *, single values, ranges (a-b), steps (*/n, a-b/n) and
+    comma-separated lists of these. Weekday 7 is accepted for Sunday.
+
+    Raises:
+        ValueError: The field is malformed or out of range
+    """
+    values = set()
+    for part in text.split(','):
+        spec, _, step_text = part.partition('/')
+        try:
+            step = int(step_text) if step_text else 1
+            if spec == '*':
+                start, end = low, high
+            elif '-' in spec:
+                start, end = (int(bound) for bound in spec.split('-', 1))
+            else:
+                start = int(spec)
+                end = high if step_text else start
+        except ValueError:
+            raise ValueError(f"Invalid cron {name} field '{text}'")
+        if step < 1 or start < low or end > high or start > end:
+            raise ValueError(f"Invalid cron {name} field '{text}'")
+        values.update(range(start, end + 1, step))
+    if name == 'weekday' and 7 in values:
+        # 7 is Sunday as well as 0
+        values.discard(7)
+        values.add(0)
+    return values
+
+
+class CronSchedule:
+    """
+    A standard five-field cron expression: minute hour day month weekday
+
+    As in cron, when both day and weekday are restricted a time matches if
+    either of them does.
+    """
+
+    def __init__(self, expression):
+        fields = expression.split()
+        if len(fields) != 5:
+            raise ValueError(f"Cron expression '{expression}' must have 5 fields")
+        self.expression = expression
+        self.minutes, self.hours, self.days, self.months, self.weekdays = (
+            _parse_field(text, name, low, high) for text, (name, low, high) in zip(fields, _FIELDS)
+        )
+        self._any_day = fields[2] == '*'
+        self._any_weekday = fields[4] == '*'
+
+    def __repr__(self):
+        return f"CronSchedule('{self.expression}')"
+
+    def _day_matches(self, moment):
+        """Check the day-of-month and day-of-week fields (Sunday is 0)"""
+        day_ok = moment.day in self.days
+        weekday_ok = (moment.weekday() + 1) % 7 in self.weekdays
+        if self._any_day or self._any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, moment):
+        """
+        First matching minute strictly after moment
+
+        Raises:
+            ValueError: Nothing matches within the next few years
+        """
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        give_up = candidate + timedelta(days=366 * _SEARCH_YEARS)
+        while candidate < give_up:
+            if candidate.month not in self.months:
+                # Jump to the first minute of the next month
+                year, month = divmod(candidate.year * 12 + candidate.month, 12)
+                candidate = datetime(year, month + 1, 1)
+            elif not self._day_matches(candidate):
+                candidate = (candidate + timedelta(days=1)).replace(hour=0, minute=0)
+            elif candidate.hour not in self.hours:
+                candidate = (candidate + timedelta(hours=1)).replace(minute=0)
+            elif candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+            else:
+                return candidate
+        raise ValueError(f"Cron expression '{self.expression}' never matches")
+
+    def latest_until(self, last, now):
+        """
+        Latest matching minute after last and at or before now, or None when there is none
+
+        Used to decide whether a job is due and which slot a catch-up run covers.
+        """
+        due = self.next_after(last)
+        if due > now:
+            return None
+        # Jump over the missed slots; past a day of them, the current minute stands in
+        for _ in range(1440):
+            following = self.next_after(due)
+            if following > now:
+                return due
+            due = following
+        return now.replace(second=0, microsecond=0)
@@ -5,29 +5,36 @@ import pyodbc
 from flask import g
 import config
 
-def get_db_connection():
+def get_db_connection(server=None, read_only=False):
     """
     Create a connection to the database
     
+    Args:
+        server: Server to connect to (defaults to the primary DB_SERVER)
+        read_only: Declare read-only intent, for readable secondary replicas
+    
     Returns:
         pyodbc.Connection: A connection to the database
     """
+    server = server or config.DB_SERVER
     # Connect to SQL Server with Windows Authentication or credentials
     if config.DB_TRUSTED_CONNECTION:
         conn_str = (
             f"DRIVER={{{config.DB_DRIVER}}};"
-            f"SERVER={config.DB_SERVER};"
+            f"SERVER={server};"
             f"DATABASE={config.DB_NAME};"
             f"Trusted_Connection=yes;"
         )
     else:
         conn_str = (
             f"DRIVER={{{config.DB_DRIVER}}};"
-            f"SERVER={config.DB_SERVER};"
+            f"SERVER={server};"
             f"DATABASE={config.DB_NAME};"
             f"UID={config.DB_USER};"
             f"PWD={config.DB_PASSWORD};"
         )
+    if read_only:
+        conn_str += "ApplicationIntent=ReadOnly;"
     
     try:
         conn = pyodbc.connect(conn_str)
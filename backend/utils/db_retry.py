@@ -0,0 +1,62 @@
+"""
+Deadlock and lock-timeout retry for database writes
+"""
+import random
+import time
+from utils import metrics
+import config
+
+# SQL Server error numbers that are safe to retry: the failed statement was rolled back
+RETRYABLE_ERRORS = {
+    1205: 'deadlock',
+    1222: 'lock_timeout',
+    3960: 'snapshot_conflict'
+}
+
+
+def get_retry_reason(error):
+    """
+    Classify a database error as retryable
+
+    Args:
+        error: Exception raised by pyodbc
+
+    Returns:
+        str or None: The retry reason, or None when the error should not be retried
+    """
+    message = str(error)
+    for number, reason in RETRYABLE_ERRORS.items():
+        if f"({number})" in message:
+            return reason
+    # SQLSTATE 40001 is the ODBC serialization failure class (deadlock victim)
+    if getattr(error, 'args', None) and error.args[0] == '40001':
+        return 'deadlock'
+    return None
+
+
+def run_with_retry(operation):
+    """
+    Run a database operation, retrying deadlocks and lock timeouts with jittered backoff
+
+    Args:
+        operation: Callable performing one self-contained statement or transaction
+
+    Returns:
+        The operation's return value
+    """
+    attempt = 0
+    while True:
+        try:
+            return operation()
+        except Exception as e:
+            reason = get_retry_reason(e)
+            if reason is None:
+                raise
+            if attempt >= config.DB_RETRY_ATTEMPTS:
+                metrics.increment('db_retry_exhausted_total', reason=reason)
+                raise
+            metrics.increment('db_retry_total', reason=reason)
+            # Full jitter keeps competing victims from colliding again in lockstep
+            ceiling = min(config.DB_RETRY_MAX_DELAY_MS, config.DB_RETRY_BASE_DELAY_MS * (2 ** attempt))
+            time.sleep(random.uniform(0, ceiling) / 1000)
+            attempt += 1
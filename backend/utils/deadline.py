@@ -0,0 +1,113 @@
+"""
+Request deadlines and statement timeouts for the Inventory Management System
+"""
+import math
+import time
+from flask import g, has_request_context, jsonify, request
+import config
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a request runs past its deadline"""
+
+
+def deadline(seconds):
+    """
+    Give a view its own request deadline instead of REQUEST_DEADLINE_SECONDS
+
+    Args:
+        seconds: Time budget for the whole request
+
+    Returns:
+        A decorator for Flask view functions
+    """
+    def decorator(view):
+        view.deadline_seconds = seconds
+        return view
+    return decorator
+
+
+def _parse_overrides(text):
+    """Parse REQUEST_DEADLINE_OVERRIDES ("endpoint=seconds,...") into a dict"""
+    overrides = {}
+    for item in filter(None, (part.strip() for part in text.split(','))):
+        endpoint, _, seconds = item.partition('=')
+        overrides[endpoint.strip()] = float(seconds)
+    return overrides
+
+_overrides = _parse_overrides(config.REQUEST_DEADLINE_OVERRIDES)
+
+
+def get_statement_timeout(timeout=None):
+    """
+    Compute the timeout for the next statement from the request deadline
+
+    Args:
+        timeout: Optional explicit per-statement timeout in seconds
+
+    Returns:
+        int: Whole seconds for the ODBC query timeout, 0 for no timeout
+
+    Raises:
+        DeadlineExceeded: The request has no time left
+    """
+    remaining = None
+    if has_request_context() and g.get('deadline') is not None:
+        remaining = g.deadline - time.monotonic()
+        if remaining <= 0:
+            g.deadline_exceeded = True
+            raise DeadlineExceeded("Request deadline exceeded before the query could run")
+    if timeout:
+        remaining = timeout if remaining is None else min(remaining, timeout)
+    if remaining is None:
+        return 0
+    # ODBC timeouts are whole seconds, and 0 would mean "no timeout"
+    return max(1, math.ceil(remaining))
+
+
+def is_timeout_error(error):
+    """Check whether a database error is an ODBC query timeout (SQLSTATE HYT00)"""
+    args = getattr(error, 'args', None)
+    return (bool(args) and args[0] == 'HYT00') or 'Query timeout expired' in str(error)
+
+
+def mark_deadline_exceeded():
+    """Flag the current request so it is answered with 504 whatever the view returns"""
+    if has_request_context():
+        g.deadline_exceeded = True
+
+
+def setup_request_deadlines(app):
+    """
+    Setup request deadline handlers for Flask app
+
+    Args:
+        app: Flask application instance
+    """
+    @app.before_request
+    def start_deadline():
+        """Start the clock for the request's deadline"""
+        view = app.view_functions.get(request.endpoint)
+        seconds = _overrides.get(
+            request.endpoint,
+            getattr(view, 'deadline_seconds', config.REQUEST_DEADLINE_SECONDS)
+        )
+        g.deadline = time.monotonic() + seconds if seconds else None
+        g.deadline_exceeded = False
+
+    @app.after_request
+    def answer_expired_deadline(response):
+        """Turn any response from a request that hit its deadline into a fast 504"""
+        if g.get('deadline_exceeded'):
+            response = jsonify({"success": False, "error": "Request deadline exceeded, please retry later"})
+            response.status_code = 504
+            response.headers['Retry-After'] = str(config.DEADLINE_RETRY_AFTER)
+        return response
+
+    @app.errorhandler(DeadlineExceeded)
+    def deadline_exceeded(error):
+        """Answer deadline errors that escaped the view with 504"""
+        response = jsonify({"success": False, "error": str(error)})
+        response.status_code = 504
+        response.headers['Retry-After'] = str(config.DEADLINE_RETRY_AFTER)
+        return response
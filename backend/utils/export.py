@@ -0,0 +1,85 @@
+"""
+Streaming CSV/NDJSON export for the Inventory Management System
+"""
+import csv
+import io
+from datetime import datetime, timedelta
+from flask import Response, stream_with_context
+from utils.json_provider import dumps_bytes
+
+EXPORT_MIMETYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson'
+}
+
+
+def parse_date_range(args):
+    """
+    Read start_date and end_date (YYYY-MM-DD, both inclusive) from query arguments
+
+    Args:
+        args: request.args
+
+    Returns:
+        tuple: (start, end) datetimes where end is exclusive (the day after end_date)
+
+    Raises:
+        ValueError: A date is missing or malformed, or the range is reversed
+    """
+    start_text, end_text = args.get('start_date'), args.get('end_date')
+    if not start_text or not end_text:
+        raise ValueError("start_date and end_date are required (YYYY-MM-DD)")
+    try:
+        start = datetime.strptime(start_text, '%Y-%m-%d')
+        end = datetime.strptime(end_text, '%Y-%m-%d') + timedelta(days=1)
+    except ValueError:
+        raise ValueError("Dates must use the YYYY-MM-DD format")
+    if end <= start:
+        raise ValueError("end_date must not be before start_date")
+    return start, end
+
+
+def _csv_chunks(columns, chunks):
+    """Encode a header and row chunks as CSV, one bytes block per chunk"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue().encode('utf-8')
+    for rows in chunks:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(rows)
+        yield buffer.getvalue().encode('utf-8')
+
+
+def _ndjson_chunks(columns, chunks):
+    """Encode row chunks as newline-delimited JSON objects, one bytes block per chunk"""
+    for rows in chunks:
+        yield b''.join(dumps_bytes(dict(zip(columns, row))) + b'\n' for row in rows)
+
+
+def stream_export(columns, chunks, fmt, filename):
+    """
+    Build a streamed download response from a stream_db result
+
+    The body is produced chunk by chunk while the client downloads it, so it is
+    sent with chunked transfer encoding and the first bytes leave immediately.
+
+    Args:
+        columns: Column names
+        chunks: Generator yielding lists of row tuples
+        fmt: 'csv' or 'ndjson'
+        filename: Download name without extension
+
+    Returns:
+        flask.Response: Streaming response
+    """
+    encode = _csv_chunks if fmt == 'csv' else _ndjson_chunks
+    return Response(
+        stream_with_context(encode(columns, chunks)),
+        mimetype=EXPORT_MIMETYPES[fmt],
+        headers={
+            "Content-Disposition": f"attachment; filename={filename}.{fmt}",
+            "X-Accel-Buffering": "no"
+        }
+    )
@@ -0,0 +1,52 @@
+"""
+Conditional GET (ETag / Last-Modified) support for the Inventory Management System API
+"""
+import hashlib
+from functools import wraps
+from flask import request, make_response
+
+
+def conditional_get(version_func):
+    """
+    Answer unchanged resources with 304 Not Modified before running the view
+
+    Args:
+        version_func: Callable returning (version_key, last_modified) for the resource,
+            where version_key is any string that changes whenever the data changes
+            and last_modified is a datetime or None
+
+    Returns:
+        A decorator for Flask view functions
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            version_key, last_modified = version_func()
+            # The query string is part of the tag so filtered/formatted variants never collide
+            digest = hashlib.sha1(f"{version_key}|{request.full_path}".encode('utf-8')).hexdigest()
+            etag = digest[:32]
+
+            if request.if_none_match:
+                not_modified = request.if_none_match.contains_weak(etag)
+            else:
+                not_modified = (
+                    last_modified is not None
+                    and request.if_modified_since is not None
+                    and last_modified.replace(microsecond=0) <= request.if_modified_since.replace(tzinfo=None)
+                )
+
+            if not_modified:
+                response = make_response('', 304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            # Clients may store the response but must revalidate it on every use
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,61 @@
+"""
+Fast JSON serialization for the Inventory Management System API
+"""
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from flask.json.provider import DefaultJSONProvider
+
+# orjson is optional; fall back to the standard library when it is not installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj):
+    """
+    Serialize the database types the standard encoders do not handle
+
+    Decimals are written as strings so prices keep their exact scale,
+    matching what the API has always returned for DECIMAL columns.
+    """
+    if isinstance(obj, Decimal):
+        return str(obj)
+    if isinstance(obj, (datetime, date, time)):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps_bytes(obj):
+    """
+    Serialize an object to compact UTF-8 JSON
+
+    Args:
+        obj: Object to serialize
+
+    Returns:
+        bytes: The JSON document
+    """
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, default=_default, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider that uses orjson when available and handles Decimal/datetime natively"""
+
+    def dumps(self, obj, **kwargs):
+        """Serialize an object to a JSON string"""
+        if kwargs:
+            # Callers asking for specific json.dumps options get the standard encoder
+            kwargs.setdefault('default', _default)
+            return json.dumps(obj, **kwargs)
+        return dumps_bytes(obj).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        """Serialize the given arguments as a JSON response without an intermediate string"""
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj), mimetype=self.mimetype)
@@ -0,0 +1,57 @@
+"""
+In-process metrics for the Inventory Management System
+"""
+import threading
+
+_counters = {}
+_timings = {}
+_lock = threading.Lock()
+
+
+def _key(name, labels):
+    """Build a stable metric key from a name and optional labels"""
+    if not labels:
+        return name
+    label_text = ','.join(f"{k}={v}" for k, v in sorted(labels.items()))
+    return f"{name}{{{label_text}}}"
+
+
+def increment(name, value=1, **labels):
+    """
+    Increase a counter
+
+    Args:
+        name: Metric name
+        value: Amount to add
+        labels: Optional labels distinguishing series of the same metric
+    """
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, seconds, **labels):
+    """
+    Record a duration
+
+    Args:
+        name: Metric name
+        seconds: Observed duration in seconds
+        labels: Optional labels distinguishing series of the same metric
+    """
+    key = _key(name, labels)
+    with _lock:
+        timing = _timings.setdefault(key, {'count': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+        timing['count'] += 1
+        timing['total_ms'] += seconds * 1000
+        timing['max_ms'] = max(timing['max_ms'], seconds * 1000)
+
+
+def get_metrics():
+    """Get a copy of all counters and timings"""
+    with _lock:
+        timings = {
+            key: dict(value, avg_ms=value['total_ms'] / value['count'] if value['count'] else 0.0)
+            for key, value in _timings.items()
+        }
+        return {'counters': dict(_counters), 'timings': timings}
@@ -0,0 +1,186 @@
+"""
+Query arguments for the Inventory Management System API: catalog filters,
+sorting, keyset pagination, batch id lists and sparse fieldsets
+"""
+import base64
+import json
+from decimal import Decimal, InvalidOperation
+import config
+
+# Sort key -> type of its cursor value
+CATALOG_SORT_KEYS = {
+    'name': str,
+    'price': Decimal,
+    'quantity': int,
+    'product_id': int
+}
+
+STOCK_STATUSES = ('in_stock', 'low_stock', 'out_of_stock')
+
+PAGING_ARGS = ('limit', 'cursor')
+
+
+def encode_cursor(payload):
+    """Encode a cursor payload as an opaque URL-safe token"""
+    raw = json.dumps(payload, separators=(',', ':'), default=str).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token):
+    """
+    Decode a token made by encode_cursor
+
+    Raises:
+        ValueError: The token is not a valid cursor
+    """
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw)
+    except (ValueError, TypeError):
+        raise ValueError("cursor is not valid")
+    if not isinstance(payload, dict):
+        raise ValueError("cursor is not valid")
+    return payload
+
+
+def _parse_decimal(args, name):
+    """Read an optional non-negative decimal query argument"""
+    text = args.get(name)
+    if text in (None, ''):
+        return None
+    try:
+        value = Decimal(text)
+    except InvalidOperation:
+        raise ValueError(f"{name} must be a number")
+    if not value.is_finite() or value < 0:
+        raise ValueError(f"{name} must not be negative")
+    return value
+
+
+def parse_catalog_query(args):
+    """
+    Read catalog filters, sort order and paging from query arguments
+
+    Filters: category_id, stock_status (in_stock, low_stock, out_of_stock),
+    min_price, max_price. Sort: sort (name, price, quantity, product_id) and
+    order (asc, desc). Paging: limit and cursor; without either the whole
+    filtered catalog is returned as before.
+
+    Args:
+        args: request.args
+
+    Returns:
+        dict: category_id, stock_status, min_price, max_price, sort, order,
+        limit (None when not paging) and after ((sort value, product_id) or None)
+
+    Raises:
+        ValueError: An argument is malformed, or the cursor belongs to another sort order
+    """
+    query = {
+        'category_id': args.get('category_id', type=int),
+        'stock_status': args.get('stock_status') or None,
+        'min_price': _parse_decimal(args, 'min_price'),
+        'max_price': _parse_decimal(args, 'max_price'),
+        'sort': args.get('sort', 'name'),
+        'order': args.get('order', 'asc').lower(),
+        'limit': None,
+        'after': None
+    }
+    if query['stock_status'] is not None and query['stock_status'] not in STOCK_STATUSES:
+        raise ValueError(f"stock_status must be one of {', '.join(STOCK_STATUSES)}")
+    if query['sort'] not in CATALOG_SORT_KEYS:
+        raise ValueError(f"sort must be one of {', '.join(CATALOG_SORT_KEYS)}")
+    if query['order'] not in ('asc', 'desc'):
+        raise ValueError("order must be asc or desc")
+
+    if any(name in args for name in PAGING_ARGS):
+        limit = args.get('limit', config.CATALOG_PAGE_SIZE, type=int)
+        query['limit'] = min(max(limit, 1), config.CATALOG_MAX_PAGE_SIZE)
+
+    if args.get('cursor'):
+        cursor = decode_cursor(args['cursor'])
+        if cursor.get('sort') != query['sort'] or cursor.get('order') != query['order']:
+            raise ValueError("cursor was issued for a different sort order")
+        try:
+            query['after'] = (CATALOG_SORT_KEYS[query['sort']](cursor['value']), int(cursor['id']))
+        except (KeyError, TypeError, ValueError, InvalidOperation):
+            raise ValueError("cursor is not valid")
+    return query
+
+
+def next_cursor(query, last_row):
+    """Build the cursor that continues after the last row of a page"""
+    return encode_cursor({
+        'sort': query['sort'],
+        'order': query['order'],
+        'value': last_row[query['sort']],
+        'id': last_row['product_id']
+    })
+
+
+def parse_id_list(args, name='ids'):
+    """
+    Read a comma-separated list of ids for a batch multi-get (?ids=3,7,12)
+
+    Args:
+        args: request.args
+        name: Argument name
+
+    Returns:
+        list: Distinct ids in request order
+
+    Raises:
+        ValueError: An id is not a positive integer, or there are more than BATCH_MAX_IDS
+    """
+    ids = []
+    for part in args.get(name, '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if not part.isdigit() or int(part) == 0:
+            raise ValueError(f"{name} must be a comma-separated list of positive integers")
+        ids.append(int(part))
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise ValueError(f"{name} must list at least one id")
+    if len(ids) > config.BATCH_MAX_IDS:
+        raise ValueError(f"{name} may list at most {config.BATCH_MAX_IDS} ids")
+    return ids
+
+
+def key_by_id(rows, key, ids):
+    """
+    Key batch rows by id and list the requested ids that were not found
+
+    Returns:
+        tuple: ({id: row}, [missing ids])
+    """
+    found = {row[key]: row for row in rows}
+    return found, [item for item in ids if item not in found]
+
+
+def parse_fields(args, available, default):
+    """
+    Read a sparse fieldset (?fields=name,price)
+
+    Args:
+        args: request.args
+        available: Selectable field names
+        default: Fields returned when the argument is absent
+
+    Returns:
+        tuple: Requested field names; '*' stands for all of them
+
+    Raises:
+        ValueError: A field name is not selectable
+    """
+    text = args.get('fields')
+    if text is None:
+        return tuple(default)
+    fields = tuple(dict.fromkeys(part.strip() for part in text.split(',') if part.strip()))
+    if fields == ('*',):
+        return tuple(available)
+    unknown = [name for name in fields if name not in available]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)} (available: {', '.join(available)})")
+    return fields
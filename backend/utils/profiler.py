@@ -0,0 +1,186 @@
+"""
+On-demand request profiling for the Inventory Management System
+"""
+import cProfile
+import io
+import itertools
+import pstats
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime
+from flask import g, request
+import config
+
+# Most recent profiles, newest last
+_profiles = deque(maxlen=config.PROFILE_HISTORY_SIZE)
+_profiles_lock = threading.Lock()
+_profile_ids = itertools.count(1)
+
+
+class StackSampler:
+    """Samples the call stack of one thread at a fixed interval"""
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.stacks[';'.join(reversed(stack))] += 1
+
+
+def should_profile():
+    """Check whether the current request was asked for or sampled for profiling"""
+    if not config.PROFILING_ENABLED:
+        return False
+    if request.headers.get(config.PROFILE_HEADER, '').lower() in ('1', 'true', 'yes'):
+        return True
+    return config.PROFILE_SAMPLE_RATE > 0 and random.random() < config.PROFILE_SAMPLE_RATE
+
+
+def record_db_time(sql_seconds, row_build_seconds=0.0):
+    """
+    Add database timings to the profile of the current request, if any
+
+    Args:
+        sql_seconds: Time spent executing the statement and fetching rows
+        row_build_seconds: Time spent turning fetched rows into dictionaries
+    """
+    profile = g.get('profile')
+    if profile is None:
+        return
+    profile['query_count'] += 1
+    profile['sql_time'] += sql_seconds
+    profile['row_build_time'] += row_build_seconds
+
+
+def setup_request_profiling(app):
+    """
+    Setup request profiling handlers for Flask app
+
+    Args:
+        app: Flask application instance
+    """
+    @app.before_request
+    def start_profile():
+        """Start the profilers when the request is selected for profiling"""
+        if not should_profile():
+            return
+        g.profile = {
+            'query_count': 0,
+            'sql_time': 0.0,
+            'row_build_time': 0.0,
+            'started': time.perf_counter()
+        }
+        g.profile_sampler = StackSampler(threading.get_ident(), config.PROFILE_SAMPLE_INTERVAL_MS / 1000)
+        g.profile_sampler.start()
+        g.profiler = cProfile.Profile()
+        g.profiler.enable()
+
+    @app.after_request
+    def finish_profile(response):
+        """Stop the profilers and store the collected profile"""
+        profile = g.get('profile')
+        if profile is None:
+            return response
+        g.profiler.disable()
+        g.profile_sampler.stop()
+        total_time = time.perf_counter() - profile['started']
+
+        stats_stream = io.StringIO()
+        stats = pstats.Stats(g.profiler, stream=stats_stream)
+        stats.sort_stats('cumulative').print_stats(40)
+
+        db_time = profile['sql_time'] + profile['row_build_time']
+        profile_id = next(_profile_ids)
+        entry = {
+            'profile_id': profile_id,
+            'method': request.method,
+            'path': request.full_path.rstrip('?'),
+            'endpoint': request.endpoint,
+            'status_code': response.status_code,
+            'created_at': datetime.now().isoformat(),
+            'total_time_ms': round(total_time * 1000, 3),
+            'db_time_ms': round(db_time * 1000, 3),
+            'sql_time_ms': round(profile['sql_time'] * 1000, 3),
+            'row_build_time_ms': round(profile['row_build_time'] * 1000, 3),
+            'python_time_ms': round(max(total_time - db_time, 0) * 1000, 3),
+            'query_count': profile['query_count'],
+            'stats': stats_stream.getvalue(),
+            'stacks': dict(g.profile_sampler.stacks)
+        }
+        with _profiles_lock:
+            _profiles.append(entry)
+
+        response.headers['X-Profile-Id'] = str(profile_id)
+        g.profile = None
+        return response
+
+    @app.teardown_request
+    def abandon_profile(exception):
+        """Stop the profilers if the request failed before they were collected"""
+        if g.get('profile') is not None:
+            g.profiler.disable()
+            g.profile_sampler.stop()
+            g.profile = None
+
+
+def get_profiles():
+    """Get a summary of the stored profiles, newest first"""
+    with _profiles_lock:
+        entries = list(_profiles)
+    return [
+        {k: v for k, v in entry.items() if k not in ('stats', 'stacks')}
+        for entry in reversed(entries)
+    ]
+
+
+def get_profile(profile_id):
+    """Get a stored profile by ID"""
+    with _profiles_lock:
+        for entry in _profiles:
+            if entry['profile_id'] == profile_id:
+                return entry
+    return None
+
+
+def to_collapsed_stacks(profile):
+    """
+    Render sampled stacks in the collapsed format used by flamegraph.pl and speedscope
+
+    Args:
+        profile: A stored profile
+
+    Returns:
+        str: One "frame;frame;frame count" line per distinct stack
+    """
+    return '\n'.join(
+        f"{stack} {count}" for stack, count in sorted(profile['stacks'].items())
+    ) + '\n'
+
+
+def clear_profiles():
+    """Remove all stored profiles"""
+    with _profiles_lock:
+        _profiles.clear()
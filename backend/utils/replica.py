@@ -0,0 +1,155 @@
+"""
+Read replica routing for the Inventory Management System
+"""
+import itertools
+import threading
+import time
+from flask import g, has_request_context
+from utils import metrics
+from utils.db_helper import get_db_connection
+import config
+
+# Lag of every availability-group secondary of this database, as seen from the primary
+LAG_QUERY = """
+    SELECT ar.replica_server_name, drs.secondary_lag_seconds
+    FROM sys.dm_hadr_database_replica_states drs
+    JOIN sys.availability_replicas ar ON ar.replica_id = drs.replica_id
+    WHERE drs.database_id = DB_ID() AND drs.is_local = 0
+"""
+
+_replicas = [server.strip() for server in config.REPLICA_SERVERS.split(',') if server.strip()]
+_next_replica = itertools.cycle(_replicas) if _replicas else None
+_state = {server: {'lag_seconds': None, 'down_until': 0.0} for server in _replicas}
+_lag_checked_at = float('-inf')
+_lock = threading.Lock()
+
+
+def _server_key(server):
+    """Normalise a server name so 'host.domain,1433' matches the replica name 'HOST'"""
+    host = server.split(',')[0].split('\\')
+    host[0] = host[0].split('.')[0]
+    return '\\'.join(host).upper()
+
+
+def _refresh_lag(primary):
+    """Reload replica lag from the primary at most once per REPLICA_LAG_CHECK_INTERVAL"""
+    global _lag_checked_at
+    now = time.monotonic()
+    with _lock:
+        if now - _lag_checked_at < config.REPLICA_LAG_CHECK_INTERVAL:
+            return
+        _lag_checked_at = now
+
+    lags = {}
+    cursor = primary.cursor()
+    try:
+        for name, lag in cursor.execute(LAG_QUERY).fetchall():
+            lags[_server_key(name)] = lag
+    except Exception:
+        # Not an availability group, or no VIEW SERVER STATE: lag stays unknown
+        pass
+    finally:
+        cursor.close()
+
+    with _lock:
+        for server, state in _state.items():
+            state['lag_seconds'] = lags.get(_server_key(server))
+
+
+def _is_usable(server):
+    """Check that a replica is up and close enough to the primary"""
+    state = _state[server]
+    if state['down_until'] > time.monotonic():
+        return False
+    if config.REPLICA_MAX_LAG_SECONDS <= 0:
+        return True
+    lag = state['lag_seconds']
+    return lag is not None and lag <= config.REPLICA_MAX_LAG_SECONDS
+
+
+def mark_primary_write():
+    """Pin the rest of the request to the primary so it reads its own writes"""
+    if has_request_context():
+        g.db_wrote = True
+
+
+def mark_replica_down(server):
+    """Stop routing to a replica whose connection failed until the next lag check"""
+    with _lock:
+        _state[server]['down_until'] = time.monotonic() + config.REPLICA_LAG_CHECK_INTERVAL
+    metrics.increment('db_replica_fallback_total', reason='unavailable')
+
+
+def drop_replica_connection(server):
+    """Mark a replica down and close the request's connection to it, so the rest of the request reads from the primary"""
+    mark_replica_down(server)
+    replica_db = g.pop('replica_db', None)
+    g.pop('replica_server', None)
+    if replica_db is not None:
+        try:
+            replica_db.close()
+        except Exception:
+            # The connection is already broken; closing only frees the handle
+            pass
+
+
+def get_read_connection():
+    """
+    Get the connection an analytics read should use
+
+    Returns:
+        tuple: (connection, replica server name or None for the primary)
+    """
+    if not _replicas or not has_request_context():
+        # Background workers stay on the primary: they react to writes that just happened
+        return g.db, None
+    if g.get('db_wrote'):
+        metrics.increment('db_replica_fallback_total', reason='read_your_writes')
+        return g.db, None
+    if g.get('replica_db') is not None:
+        return g.replica_db, g.replica_server
+
+    _refresh_lag(g.db)
+    for _ in range(len(_replicas)):
+        with _lock:
+            server = next(_next_replica)
+        if not _is_usable(server):
+            continue
+        try:
+            g.replica_db = get_db_connection(server, read_only=True)
+        except Exception:
+            mark_replica_down(server)
+            continue
+        g.replica_server = server
+        return g.replica_db, server
+
+    metrics.increment('db_replica_fallback_total', reason='lag')
+    return g.db, None
+
+
+def get_replica_status():
+    """Get the last known lag and availability of each configured replica"""
+    now = time.monotonic()
+    with _lock:
+        return {
+            server: {
+                'lag_seconds': state['lag_seconds'],
+                'available': state['down_until'] <= now
+            }
+            for server, state in _state.items()
+        }
+
+
+def setup_replica_routing(app):
+    """
+    Setup read replica connection handlers for Flask app
+
+    Args:
+        app: Flask application instance
+    """
+    @app.teardown_request
+    def close_replica_connection(exception):
+        """Close the request's replica connection, if one was opened"""
+        replica_db = g.pop('replica_db', None)
+        if replica_db is not None:
+            replica_db.close()
@@ -0,0 +1,218 @@
+"""
+In-memory product search index for the Inventory Management System
+"""
+import bisect
+import heapq
+import re
+import unicodedata
+from collections import Counter
+
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Score of a query token matching an indexed token
+EXACT_SCORE = 1.0
+PREFIX_SCORE = 0.7     # Plus up to 0.2 the more of the token the prefix covers
+FUZZY_SCORE = 0.6      # Times the trigram similarity
+CATEGORY_WEIGHT = 0.5  # Matches on the category name count half
+
+
+def tokenize(text):
+    """Lower-case, strip accents and split text into alphanumeric tokens"""
+    text = unicodedata.normalize('NFKD', text or '').encode('ascii', 'ignore').decode('ascii')
+    return _TOKEN_RE.findall(text.lower())
+
+
+def trigrams(token):
+    """Trigrams of a token padded at both ends, so short tokens and word starts count"""
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """
+    Prefix and trigram index over product and category names
+
+    Distinct tokens are kept in a sorted list for prefix lookups by bisection
+    and in trigram postings for typo-tolerant matching. Products point at their
+    category, so renaming a category touches one entry rather than every
+    product in it. Not thread-safe; callers hold their own lock.
+    """
+
+    def __init__(self, fuzzy_threshold=0.3, fuzzy_when_fewer=20, max_prefix_tokens=500):
+        self.fuzzy_threshold = fuzzy_threshold
+        self.fuzzy_when_fewer = fuzzy_when_fewer
+        self.max_prefix_tokens = max_prefix_tokens
+        self._products = {}           # product_id -> (name, name tokens, category_id)
+        self._sort_keys = {}          # product_id -> tie-break key within a score
+        self._categories = {}         # category_id -> category tokens
+        self._name_postings = {}      # token -> product ids
+        self._category_postings = {}  # token -> category ids
+        self._category_products = {}  # category_id -> product ids
+        self._token_refs = Counter()  # token -> postings referencing it
+        self._sorted_tokens = []
+        self._trigram_postings = {}   # trigram -> tokens
+
+    def __len__(self):
+        return len(self._products)
+
+    def upsert_product(self, product_id, name, category_id):
+        """Add a product or replace its indexed name and category"""
+        self.remove_product(product_id)
+        tokens = tuple(dict.fromkeys(tokenize(name)))
+        self._products[product_id] = (name, tokens, category_id)
+        self._sort_keys[product_id] = (len(name), name.lower(), product_id)
+        for token in tokens:
+            self._name_postings.setdefault(token, set()).add(product_id)
+            self._add_token(token)
+        self._category_products.setdefault(category_id, set()).add(product_id)
+
+    def remove_product(self, product_id):
+        """Drop a product from the index (no-op when absent)"""
+        entry = self._products.pop(product_id, None)
+        if entry is None:
+            return
+        del self._sort_keys[product_id]
+        _, tokens, category_id = entry
+        for token in tokens:
+            self._discard(self._name_postings, token, product_id)
+            self._remove_token(token)
+        self._discard(self._category_products, category_id, product_id)
+
+    def set_category(self, category_id, name):
+        """Add a category or replace its indexed name"""
+        self.remove_category(category_id)
+        tokens = tuple(dict.fromkeys(tokenize(name)))
+        self._categories[category_id] = tokens
+        for token in tokens:
+            self._category_postings.setdefault(token, set()).add(category_id)
+            self._add_token(token)
+
+    def remove_category(self, category_id):
+        """Drop a category name from the index; its products stay searchable by name"""
+        tokens = self._categories.pop(category_id, None)
+        for token in tokens or ():
+            self._discard(self._category_postings, token, category_id)
+            self._remove_token(token)
+
+    def search(self, query, offset=0, limit=20):
+        """
+        Rank products matching every query token
+
+        Args:
+            query: Free text
+            offset: Ranked results to skip
+            limit: Results to return
+
+        Returns:
+            tuple: (total matches, list of (product_id, score) for the page)
+        """
+        token_levels = [self._product_levels(token) for token in dict.fromkeys(tokenize(query))]
+        if not token_levels or not all(token_levels):
+            return 0, []
+
+        if len(token_levels) == 1:
+            levels = token_levels[0]
+        else:
+            # Several tokens: a product must match each one and scores add up.
+            # Intersect first so only the surviving candidates are scored.
+            candidates = set.intersection(*(
+                set().union(*(product_ids for _, product_ids in levels)) for levels in token_levels
+            ))
+            scores = dict.fromkeys(candidates, 0)
+            for levels in token_levels:
+                for score, product_ids in levels:
+                    for product_id in candidates & product_ids:
+                        scores[product_id] += score
+            by_score = {}
+            for product_id, score in scores.items():
+                by_score.setdefault(round(score, 3), []).append(product_id)
+            levels = sorted(by_score.items(), reverse=True)
+
+        # Walk the score levels from the top; within a level shorter names
+        # (closer matches) come first, then alphabetical order
+        wanted = offset + limit
+        page = []
+        for score, product_ids in levels:
+            if len(page) >= wanted:
+                break
+            for product_id in heapq.nsmallest(wanted - len(page), product_ids, key=self._sort_keys.__getitem__):
+                page.append((product_id, score))
+        return sum(len(product_ids) for _, product_ids in levels), page[offset:wanted]
+
+    def _product_levels(self, query_token):
+        """
+        Products matching one query token, grouped by score
+
+        Returns:
+            list: (score, product ids) pairs with disjoint sets, best score first
+        """
+        by_score = {}
+        for token, score in self._match_token(query_token).items():
+            name_products = self._name_postings.get(token)
+            if name_products:
+                by_score.setdefault(round(score, 3), []).append(name_products)
+            for category_id in self._category_postings.get(token, ()):
+                category_products = self._category_products.get(category_id)
+                if category_products:
+                    by_score.setdefault(round(score * CATEGORY_WEIGHT, 3), []).append(category_products)
+
+        levels, seen = [], set()
+        for score in sorted(by_score, reverse=True):
+            product_ids = set().union(*by_score[score]) - seen
+            if product_ids:
+                levels.append((score, product_ids))
+                seen |= product_ids
+        return levels
+
+    def _match_token(self, query_token):
+        """Score indexed tokens against one query token: exact, prefix, then fuzzy"""
+        matches = {}
+        start = bisect.bisect_left(self._sorted_tokens, query_token)
+        for token in self._sorted_tokens[start:start + self.max_prefix_tokens]:
+            if not token.startswith(query_token):
+                break
+            if token == query_token:
+                matches[token] = EXACT_SCORE
+            else:
+                matches[token] = PREFIX_SCORE + 0.2 * len(query_token) / len(token)
+
+        # Typo tolerance only when exact and prefix matches are scarce
+        if len(matches) < self.fuzzy_when_fewer and len(query_token) >= 3:
+            query_trigrams = trigrams(query_token)
+            shared = Counter()
+            for trigram in query_trigrams:
+                shared.update(self._trigram_postings.get(trigram, ()))
+            for token, count in shared.items():
+                if token in matches:
+                    continue
+                similarity = count / (len(query_trigrams) + len(token) + 1 - count)
+                if similarity >= self.fuzzy_threshold:
+                    matches[token] = FUZZY_SCORE * similarity
+        return matches
+
+    def _add_token(self, token):
+        """Count a reference to a token, adding it to the vocabulary on first use"""
+        self._token_refs[token] += 1
+        if self._token_refs[token] == 1:
+            bisect.insort(self._sorted_tokens, token)
+            for trigram in trigrams(token):
+                self._trigram_postings.setdefault(trigram, set()).add(token)
+
+    def _remove_token(self, token):
+        """Drop a reference to a token, removing it from the vocabulary when unused"""
+        self._token_refs[token] -= 1
+        if self._token_refs[token] > 0:
+            return
+        del self._token_refs[token]
+        del self._sorted_tokens[bisect.bisect_left(self._sorted_tokens, token)]
+        for trigram in trigrams(token):
+            self._discard(self._trigram_postings, trigram, token)
+
+    @staticmethod
+    def _discard(postings, key, value):
+        """Remove value from postings[key], dropping the key when it becomes empty"""
+        values = postings.get(key)
+        if values is not None:
+            values.discard(value)
+            if not values:
+                del postings[key]
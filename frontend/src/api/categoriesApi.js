@@ -7,6 +7,7 @@ const categoriesApi = {
   // Standard API methods
   getAllCategories: () => apiClient.get('/categories/'),
   getCategoryById: (id) => apiClient.get(`/categories/${id}/`),
+  getCategoriesByIds: (ids) => apiClient.get('/categories/', { params: { ids: ids.join(',') } }),
   createCategory: (categoryData) => apiClient.post('/categories/', categoryData),
   updateCategory: (id, categoryData) => apiClient.put(`/categories/${id}/`, categoryData),
   deleteCategory: (id) => apiClient.delete(`/categories/${id}/`),
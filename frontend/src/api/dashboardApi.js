@@ -6,6 +6,11 @@ const dashboardApi = {
   getTopSelling: () => apiClient.get('/dashboard/top-selling'),
   getInventorySummary: () => apiClient.get('/dashboard/inventory-summary'),
   getSalesByCategory: () => apiClient.get('/dashboard/sales-by-category'),
+  // Reports precomputed by the job scheduler
+  getReports: () => apiClient.get('/dashboard/reports'),
+  getReport: (name) => apiClient.get(`/dashboard/reports/${name}`),
+  // Server-Sent Events stream of live dashboard updates
+  openStream: () => new EventSource(`${apiClient.defaults.baseURL}/dashboard/stream`),
 };
 
 export default dashboardApi;
@@ -1,8 +1,13 @@
 import apiClient from './axiosConfig';
 
 const productsApi = {
-  getAllProducts: () => apiClient.get('/products/'),
+  // params: category_id, stock_status, min_price, max_price, sort, order, limit, cursor
+  getAllProducts: (params = {}) => apiClient.get('/products/', { params }),
+  searchProducts: (q, { offset = 0, limit = 20 } = {}) =>
+    apiClient.get('/products/search', { params: { q, offset, limit } }),
   getProductById: (id) => apiClient.get(`/products/${id}/`),
+  // One request for many products; data is keyed by product_id, unknown ids are listed in missing
+  getProductsByIds: (ids) => apiClient.get('/products/', { params: { ids: ids.join(',') } }),
   createProduct: (productData) => apiClient.post('/products/', productData),
   updateProduct: (id, productData) => apiClient.put(`/products/${id}/`, productData),
   deleteProduct: (id) => apiClient.delete(`/products/${id}/`),
@@ -3,6 +3,7 @@ import apiClient from './axiosConfig';
 const salesApi = {
   getAllSales: () => apiClient.get('/sales/'),
   getSaleById: (id) => apiClient.get(`/sales/${id}/`),
+  getSalesByIds: (ids) => apiClient.get('/sales/', { params: { ids: ids.join(',') } }),
   createSale: (saleData) => apiClient.post('/sales/', saleData),
   getSalesByProduct: (productId) => apiClient.get(`/sales/product/${productId}/`),
   getRecentSales: (limit = 10) => apiClient.get(`/sales/recent/?limit=${limit}`),
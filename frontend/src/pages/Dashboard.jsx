@@ -62,6 +62,53 @@ export default function Dashboard() {
     fetchDashboardData();
   }, []);
 
+  // Apply live updates pushed by the server instead of polling
+  useEffect(() => {
+    if (typeof EventSource === 'undefined') {
+      return undefined;
+    }
+    const stream = dashboardApi.openStream();
+
+    stream.addEventListener('snapshot', (event) => {
+      setDashboardData(JSON.parse(event.data));
+    });
+
+    stream.addEventListener('delta', (event) => {
+      const delta = JSON.parse(event.data);
+      setDashboardData((previous) => {
+        if (!previous) {
+          return previous;
+        }
+        const next = { ...previous };
+        if (delta.inventory_summary) {
+          next.inventory_summary = { ...previous.inventory_summary, ...delta.inventory_summary };
+        }
+        if (delta.low_stock) {
+          const { upserted = [], removed = [] } = delta.low_stock;
+          const replaced = new Set([...removed, ...upserted.map(item => item.product_id)]);
+          next.low_stock = [
+            ...(previous.low_stock || []).filter(item => !replaced.has(item.product_id)),
+            ...upserted
+          ].sort((a, b) => (b.reorder_level - b.quantity) - (a.reorder_level - a.quantity));
+        }
+        if (delta.top_selling) {
+          next.top_selling = delta.top_selling;
+        }
+        if (delta.sales_by_category) {
+          next.sales_by_category = delta.sales_by_category;
+        }
+        return next;
+      });
+    });
+
+    stream.onerror = (err) => {
+      // EventSource reconnects automatically; the server resends a snapshot
+      console.warn('Dashboard stream interrupted, reconnecting...', err);
+    };
+
+    return () => stream.close();
+  }, []);
+
   if (loading) {
     return (
       <div className="flex items-center justify-center h-full">
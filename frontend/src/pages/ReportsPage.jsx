@@ -40,6 +40,21 @@ export default function ReportsPage() {
         setLoading(true);
         setError(null);
         
+        // Use the dashboard report the job scheduler keeps precomputed
+        try {
+          const reportRes = await dashboardApi.getReport('dashboard');
+          if (reportRes.data?.success) {
+            const report = reportRes.data.data || {};
+            setSalesByCategory(report.sales_by_category || []);
+            setTopSellingProducts(report.top_selling || []);
+            setLowStockProducts(report.low_stock || []);
+            return;
+          }
+        } catch (err) {
+          console.error('Precomputed report fetch error:', err);
+          // Fall back to the live endpoints below
+        }
+        
         // Fetch each report separately instead of using Promise.all
         // This prevents one slow endpoint from affecting others
         try {